@@ -0,0 +1,93 @@
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from src.config.config import Config
+from src.common.http_client import HttpClient
+from src.common.rate_limiter import RateLimiter
+from src.common.resilience import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+
+class HunterQuotaExceeded(Exception):
+    """Raised when the configured per-run request quota for Hunter.io is used up."""
+
+
+class HunterClient:
+    """
+    Minimal Hunter.io API client for the domain-search endpoint.
+
+    Attributes:
+        api_key (str): Hunter.io API key.
+        base_url (str): API root, overridable to point at a local stub.
+        max_requests (int): Requests allowed per run (quota guard); see `start_run`.
+        requests_made (int): Requests issued so far in the current run.
+    """
+
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 base_url: str = Config.HUNTER_API_URL,
+                 requests_per_second: float = Config.HUNTER_REQUESTS_PER_SECOND,
+                 max_requests: int = Config.HUNTER_MAX_REQUESTS_PER_RUN,
+                 http: Optional[HttpClient] = None):
+        self.api_key = api_key or Config.HUNTER_API_KEY
+        if not self.api_key:
+            raise ValueError("HUNTER_API_KEY is not set.")
+        self.base_url = base_url.rstrip("/")
+        self.max_requests = max_requests
+        self.requests_made = 0
+        self.http = http or HttpClient(use_proxies=False)
+        self._limiter = RateLimiter(requests_per_second)
+        self._lock = threading.Lock()
+
+    def start_run(self) -> None:
+        """Start a new run: the request quota and the HTTP retry budget are renewed."""
+        with self._lock:
+            self.requests_made = 0
+            self.http.budget = RetryBudget(self.http.budget.max_retries)
+
+    def domain_search(self, domain: Optional[str] = None, company: Optional[str] = None,
+                      limit: int = 100) -> Dict[str, Any]:
+        """
+        Find the email addresses Hunter knows for a domain (or a company name).
+
+        Returns:
+            A dict with "domain", "pattern" (e.g. "{first}.{last}", may be None) and
+            "emails": a list of {"value", "type", "first_name", "last_name", "position",
+            "confidence"}, where "type" is "personal" or "generic" (a role address).
+
+        Raises:
+            HunterQuotaExceeded: If this client has used up `max_requests`.
+        """
+        with self._lock:
+            if self.requests_made >= self.max_requests:
+                raise HunterQuotaExceeded(f"Hunter quota of {self.max_requests} requests reached.")
+            self.requests_made += 1
+        self._limiter.acquire()
+
+        params = {"api_key": self.api_key, "limit": limit}
+        if domain:
+            params["domain"] = domain
+        else:
+            params["company"] = company
+        data = self.http.get(f"{self.base_url}/domain-search", params=params).json().get("data") or {}
+        return {
+            "domain": data.get("domain") or domain,
+            "pattern": data.get("pattern"),
+            "emails": [
+                {
+                    "value": email.get("value"),
+                    "type": email.get("type"),
+                    "first_name": email.get("first_name"),
+                    "last_name": email.get("last_name"),
+                    "position": email.get("position"),
+                    "confidence": email.get("confidence", 0),
+                }
+                for email in data.get("emails", [])
+                if email.get("value")
+            ],
+        }
+
+    def close(self) -> None:
+        self.http.close()
@@ -0,0 +1,160 @@
+"""
+An `asyncio` Playwright driver that runs several pages at once in a single browser.
+
+`PlaywrightDriver` gives one synchronous `Page` per browser process, so working on N
+personas at a time costs N browsers. `AsyncPlaywrightDriver` launches one browser and
+hands out pages (tabs) on demand; by default they share one context, and with it the
+logged-in session, cookies and cache. Pass `isolate_contexts=True` to give every page
+its own context instead.
+
+    async with AsyncPlaywrightDriver(storage_state=state) as driver:
+        async with driver.page() as page:
+            await goto_async(page, url)
+"""
+
+import time
+import random
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from playwright.async_api import async_playwright, Error as PlaywrightError
+from src.config.config import Config
+from src.common.resilience import RetryBudget, call_with_retry_async, host_of
+from src.common.proxy_manager import ProxyPool, get_proxy_pool, playwright_proxy
+from src.common.playwright_driver import PROXY_ERROR_MARKERS, ResponseCapture
+from src.common.profiling import active_profiler
+from src.common.job_stats import record_request
+from src.common.transport import RECORD, REPLAY, get_fixture_store, transport_mode
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncPlaywrightDriver:
+    """
+    An async context manager owning one browser that serves several concurrent pages.
+
+    Attributes:
+        proxy (str): Proxy server address. If omitted, one is leased from the shared
+            `ProxyPool` for the lifetime of the browser.
+        headless (bool): Whether to run the browser in headless mode.
+        storage_state (dict): Optional cookies/local storage snapshot for new contexts.
+        isolate_contexts (bool): Give each page its own context instead of sharing one.
+        har_name (str): HAR file recorded or replayed for the driver's contexts, as in
+            `PlaywrightDriver`. Isolated contexts share it, so record with one context.
+    """
+
+    def __init__(self, proxy: str = None, headless: bool = True, storage_state: dict = None,
+                 proxy_pool: ProxyPool = None, isolate_contexts: bool = False, har_name: str = "browser"):
+        self.proxy = proxy
+        self.headless = headless
+        self.storage_state = storage_state
+        self.isolate_contexts = isolate_contexts
+        self.har_name = har_name
+        self.proxy_pool = None if proxy or transport_mode() == REPLAY else (proxy_pool or get_proxy_pool())
+        self.pw = None
+        self.browser = None
+        self.context = None
+
+    async def __aenter__(self) -> "AsyncPlaywrightDriver":
+        try:
+            if self.proxy_pool is not None:
+                # acquire() may block until a proxy frees up; keep the event loop running.
+                self.proxy = await asyncio.to_thread(self.proxy_pool.acquire)
+            self.pw = await async_playwright().start()
+            browser_args = {"headless": self.headless}
+            if self.proxy:
+                browser_args["proxy"] = playwright_proxy(self.proxy)
+            self.browser = await self.pw.chromium.launch(**browser_args)
+            if not self.isolate_contexts:
+                self.context = await self.new_context()
+            logger.info("Async Playwright browser started successfully.")
+            return self
+        except Exception as e:
+            logger.error("Failed to start async Playwright session: %s", e)
+            await self.__aexit__(type(e), e, None)
+            raise
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            if self.context:
+                await self.close_context(self.context)
+            if self.browser:
+                await self.browser.close()
+            if self.pw:
+                await self.pw.stop()
+            logger.info("Async Playwright browser closed successfully.")
+        except Exception as e:
+            logger.error("Error closing async Playwright session: %s", e)
+        finally:
+            if self.proxy_pool is not None and self.proxy:
+                proxy_failed = isinstance(exc_val, PlaywrightError) and any(
+                    marker in str(exc_val) for marker in PROXY_ERROR_MARKERS)
+                self.proxy_pool.release(self.proxy, success=not proxy_failed)
+                self.proxy = None
+
+    async def new_context(self):
+        mode = transport_mode()
+        extra = {}
+        if mode == RECORD:
+            extra = {"record_har_path": get_fixture_store().har_path(self.har_name), "record_har_content": "embed"}
+        context = await self.browser.new_context(
+            user_agent=random.choice(Config.USER_AGENTS),
+            storage_state=self.storage_state,
+            **extra
+        )
+        if mode == REPLAY:
+            await context.route_from_har(get_fixture_store().har_path(self.har_name), not_found="abort")
+        return context
+
+    async def close_context(self, context) -> None:
+        """Close a context, which writes its HAR file in record mode, then scrub the HAR."""
+        await context.close()
+        if transport_mode() == RECORD:
+            get_fixture_store().scrub_har(self.har_name)
+
+    async def use_storage_state(self, storage_state: Optional[dict]) -> None:
+        """
+        Start contexts from a new cookies/local storage snapshot, e.g. after logging in
+        again. The shared context is replaced, so call this while it has no open pages.
+        """
+        self.storage_state = storage_state
+        if self.context is not None:
+            await self.close_context(self.context)
+            self.context = await self.new_context()
+
+    @asynccontextmanager
+    async def page(self, capture: Optional[ResponseCapture] = None) -> AsyncIterator:
+        """
+        Open a page (tab) for the duration of the `async with` block.
+
+        Args:
+            capture (ResponseCapture, optional): Attached to the page's responses.
+        """
+        context = await self.new_context() if self.isolate_contexts else self.context
+        page = await context.new_page()
+        if capture is not None:
+            capture.attach(page)
+        try:
+            yield page
+        finally:
+            await page.close()
+            if self.isolate_contexts:
+                await self.close_context(context)
+
+
+async def goto_async(page, url: str, budget: RetryBudget = None, **kwargs):
+    """
+    Async version of `playwright_driver.goto`: navigate with retries under the host's
+    circuit breaker. Page loads are timed for the profiler, when one is active, but not
+    traced: Playwright tracing is only wired into the sync driver.
+    """
+    record_request()
+    started = time.perf_counter()
+    try:
+        return await call_with_retry_async(lambda: page.goto(url, **kwargs), host_of(url), budget=budget)
+    finally:
+        profiler = active_profiler()
+        if profiler is not None:
+            profiler.record_untraced_page_load(time.perf_counter() - started, url)
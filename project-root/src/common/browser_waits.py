@@ -0,0 +1,212 @@
+"""
+Readiness-based waits for Playwright pages.
+
+Fixed sleeps are both slow (they always pay the worst case) and flaky (they are still
+too short when the site is slow). These helpers wait for a concrete condition instead,
+each bounded by a timeout:
+
+- `wait_for_count`: a selector matches at least N elements (or an "empty results"
+  marker appears).
+- `expect_json_response`: a specific XHR response arrives after an action.
+- `wait_for_dom_quiet`: the DOM has stopped mutating for a short quiet period.
+- `wait_for_change`: the elements matching a selector differ from an earlier
+  `content_signature`, e.g. the result list after clicking "next page".
+
+Each has an `_async` twin for pages driven through `playwright.async_api`.
+
+Deliberate human-like pacing is a separate concern, see
+`src.scrapers.linkedin.anti_detection.RateLimitManager.pace`.
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from playwright.sync_api import Page, Response, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+_COUNT_SCRIPT = """
+([selector, minCount, emptySelector]) =>
+    document.querySelectorAll(selector).length >= minCount
+    || (emptySelector !== null && document.querySelector(emptySelector) !== null)
+"""
+
+_SIGNATURE_SCRIPT = """
+selector => Array.from(document.querySelectorAll(selector), e => e.textContent).join("\\u0000")
+"""
+
+_CHANGED_SCRIPT = """
+([selector, previous, emptySelector]) => {
+    if (emptySelector !== null && document.querySelector(emptySelector) !== null) return true;
+    const items = document.querySelectorAll(selector);
+    return items.length > 0 && Array.from(items, e => e.textContent).join("\\u0000") !== previous;
+}
+"""
+
+_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let timer;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs, true);
+    });
+    const done = quiet => { observer.disconnect(); clearTimeout(deadline); resolve(quiet); };
+    const deadline = setTimeout(done, timeoutMs, false);
+    observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    timer = setTimeout(done, quietMs, true);
+})
+"""
+
+
+def wait_for_count(page: Page, selector: str, min_count: int = 1,
+                   empty_selector: Optional[str] = None, timeout: float = 15000) -> int:
+    """
+    Wait until `selector` matches at least `min_count` elements, or `empty_selector`
+    (e.g. a "no results" banner) appears.
+
+    Args:
+        page (Page): The page to watch.
+        selector (str): CSS selector of the items to count.
+        min_count (int): Number of items that makes the page ready.
+        empty_selector (str, optional): Selector that signals there will be no items.
+        timeout (float): Maximum wait in milliseconds.
+
+    Returns:
+        int: The number of matching elements when the wait ended (0 on timeout).
+    """
+    try:
+        page.wait_for_function(_COUNT_SCRIPT, arg=[selector, min_count, empty_selector], timeout=timeout)
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for %sx '%s'.", timeout, min_count, selector)
+    return len(page.query_selector_all(selector))
+
+
+def expect_json_response(page: Page, url_pattern: Union[str, Callable[[str], bool]],
+                         action: Callable[[], Any], timeout: float = 15000) -> Optional[Response]:
+    """
+    Run `action` and wait for the first successful response whose URL matches.
+
+    Args:
+        page (Page): The page the action runs on.
+        url_pattern: A glob (e.g. "**/sales-api/salesApiLeadSearch**") or a predicate on the URL.
+        action (callable): Triggers the request, e.g. pressing Enter in a search box.
+        timeout (float): Maximum wait in milliseconds.
+
+    Returns:
+        The matching response, or None if none arrived within the timeout (the action
+        itself has still run).
+    """
+    matches_url = url_pattern if callable(url_pattern) else None
+
+    def predicate(response: Response) -> bool:
+        if not response.ok:
+            return False
+        if matches_url is not None:
+            return matches_url(response.url)
+        return url_matches(url_pattern, response.url)
+
+    try:
+        with page.expect_response(predicate, timeout=timeout) as info:
+            action()
+        return info.value
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for a response matching %s.", timeout, url_pattern)
+        return None
+
+
+def wait_for_dom_quiet(page: Page, quiet: float = 500, timeout: float = 10000) -> bool:
+    """
+    Wait until the DOM has had no mutations for `quiet` milliseconds.
+
+    Returns:
+        bool: True if the page went quiet, False if it was still changing at `timeout`.
+    """
+    quiet_reached = page.evaluate(_QUIET_SCRIPT, [quiet, timeout])
+    if not quiet_reached:
+        logger.debug("DOM still changing after %.0fms.", timeout)
+    return quiet_reached
+
+
+def content_signature(page: Page, selector: str) -> str:
+    """The text of every element matching `selector`, for a later `wait_for_change`."""
+    return page.evaluate(_SIGNATURE_SCRIPT, selector)
+
+
+def wait_for_change(page: Page, selector: str, previous: str,
+                    empty_selector: Optional[str] = None, timeout: float = 15000) -> bool:
+    """
+    Wait until the elements matching `selector` differ from `previous` (a
+    `content_signature` taken earlier), or `empty_selector` appears.
+
+    Returns:
+        bool: True if the elements changed, False on timeout.
+    """
+    try:
+        page.wait_for_function(_CHANGED_SCRIPT, arg=[selector, previous, empty_selector], timeout=timeout)
+        return True
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for '%s' to change.", timeout, selector)
+        return False
+
+
+async def wait_for_count_async(page, selector: str, min_count: int = 1,
+                               empty_selector: Optional[str] = None, timeout: float = 15000) -> int:
+    """Async version of `wait_for_count`."""
+    try:
+        await page.wait_for_function(_COUNT_SCRIPT, arg=[selector, min_count, empty_selector], timeout=timeout)
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for %sx '%s'.", timeout, min_count, selector)
+    return len(await page.query_selector_all(selector))
+
+
+async def expect_json_response_async(page, url_pattern: Union[str, Callable[[str], bool]],
+                                     action: Callable[[], Awaitable[Any]], timeout: float = 15000):
+    """Async version of `expect_json_response`; `action` is a coroutine function."""
+    def predicate(response) -> bool:
+        if not response.ok:
+            return False
+        return url_pattern(response.url) if callable(url_pattern) else url_matches(url_pattern, response.url)
+
+    try:
+        async with page.expect_response(predicate, timeout=timeout) as info:
+            await action()
+        return await info.value
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for a response matching %s.", timeout, url_pattern)
+        return None
+
+
+async def wait_for_dom_quiet_async(page, quiet: float = 500, timeout: float = 10000) -> bool:
+    """Async version of `wait_for_dom_quiet`."""
+    quiet_reached = await page.evaluate(_QUIET_SCRIPT, [quiet, timeout])
+    if not quiet_reached:
+        logger.debug("DOM still changing after %.0fms.", timeout)
+    return quiet_reached
+
+
+async def content_signature_async(page, selector: str) -> str:
+    """Async version of `content_signature`."""
+    return await page.evaluate(_SIGNATURE_SCRIPT, selector)
+
+
+async def wait_for_change_async(page, selector: str, previous: str,
+                                empty_selector: Optional[str] = None, timeout: float = 15000) -> bool:
+    """Async version of `wait_for_change`."""
+    try:
+        await page.wait_for_function(_CHANGED_SCRIPT, arg=[selector, previous, empty_selector], timeout=timeout)
+        return True
+    except TimeoutError:
+        logger.warning("Timed out after %.0fms waiting for '%s' to change.", timeout, selector)
+        return False
+
+
+@lru_cache(maxsize=64)
+def _glob_regex(pattern: str) -> "re.Pattern":
+    return re.compile(re.escape(pattern).replace(r"\*\*", "\0").replace(r"\*", "[^/]*").replace("\0", ".*"))
+
+
+def url_matches(pattern: str, url: str) -> bool:
+    """Match a URL against a Playwright-style glob: "**" matches anything, "*" anything but "/"."""
+    return _glob_regex(pattern).fullmatch(url) is not None
@@ -1,6 +1,7 @@
-import requests
 import time
 from src.config.config import Config
+from src.common.http_client import HttpClient
+from src.common.transport import replaying
 
 def solve_captcha(site_key, url):
     # Example: 2Captcha Integration (ReCaptcha v2)
@@ -12,18 +13,20 @@ def solve_captcha(site_key, url):
         'pageurl': url,
         'json': 1
     }
-    resp = requests.post("http://2captcha.com/in.php", data=payload)
-    request_id = resp.json().get('request')
+    with HttpClient(use_proxies=False) as http:
+        resp = http.post("http://2captcha.com/in.php", data=payload)
+        request_id = resp.json().get('request')
 
-    # Poll for result
-    for i in range(20):
-        time.sleep(5)
-        check_resp = requests.get("http://2captcha.com/res.php", params={
-            'key': Config.CAPTCHA_API_KEY,
-            'action': 'get',
-            'id': request_id,
-            'json': 1
-        })
-        if check_resp.json().get('status') == 1:
-            return check_resp.json().get('request')
-    return None 
\ No newline at end of file
+        # Poll for result
+        for i in range(20):
+            if not replaying():
+                time.sleep(5)
+            check_resp = http.get("http://2captcha.com/res.php", params={
+                'key': Config.CAPTCHA_API_KEY,
+                'action': 'get',
+                'id': request_id,
+                'json': 1
+            })
+            if check_resp.json().get('status') == 1:
+                return check_resp.json().get('request')
+    return None 
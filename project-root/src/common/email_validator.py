@@ -1,13 +1,21 @@
-import requests
 from src.config.config import Config
+from src.common.http_client import HttpClient
 
-def validate_email(email):
+# Status of an email that is stored but not validated yet (see src.workflows.email_validation)
+EMAIL_PENDING = "pending"
+
+def validate_email(email, http=None):
     # Assuming Truemail is hosted and accessible via an API endpoint
-    url = f"http://your-truemail-instance/api/v1/validate?email={email}"
+    url = "http://your-truemail-instance/api/v1/validate"
     headers = {
         'Authorization': f'Bearer {Config.TRUEMAIL_API_KEY}'  # Assuming API key is used for authentication
     }
-    r = requests.get(url, headers=headers)
+    # Through HttpClient so validation is retried, and recorded/replayed like any other exchange
+    if http is None:
+        with HttpClient(use_proxies=False) as client:
+            r = client.get(url, params={"email": email}, headers=headers)
+    else:
+        r = http.get(url, params={"email": email}, headers=headers)
     data = r.json()
     if data.get("result"):
         return {
@@ -15,4 +23,4 @@ def validate_email(email):
             "status": data["result"].get("status"),
             "score": data["result"].get("score", 0)
         }
-    return {"email": email, "status":"unknown", "score":0} 
\ No newline at end of file
+    return {"email": email, "status":"unknown", "score":0} 
@@ -0,0 +1,112 @@
+import random
+import logging
+from typing import Optional
+
+import requests
+from src.config.config import Config
+from src.common.proxy_manager import ProxyPool, get_proxy_pool, requests_proxies
+from src.common.resilience import (
+    RETRYABLE_STATUS_CODES,
+    RetryableError,
+    RetryBudget,
+    RetryPolicy,
+    call_with_retry,
+    host_of,
+)
+from src.common.job_stats import record_request
+from src.common.transport import RECORD, REPLAY, get_fixture_store, transport_mode
+
+logger = logging.getLogger(__name__)
+
+
+def _retry_after(response: requests.Response) -> Optional[float]:
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class HttpClient:
+    """
+    A `requests` session wrapped with error classification, backoff with jitter,
+    a per-job retry budget and per-host circuit breakers. Each attempt goes through a
+    proxy leased from the shared `ProxyPool` (when proxies are configured).
+
+    Create one client per job (scraper run) so the retry budget is scoped to that job.
+
+    With `TRANSPORT_MODE=record` every successful exchange is saved to the fixture
+    store; with `TRANSPORT_MODE=replay` responses come from the store and nothing is
+    sent (see `src.common.transport`).
+
+    Attributes:
+        budget (RetryBudget): Retry budget shared by every call made through this client.
+        policy (RetryPolicy): Backoff policy applied to each call.
+        timeout (float): Per-request timeout in seconds.
+        proxy_pool (ProxyPool): Pool the per-attempt proxies are leased from. First-party
+            APIs (Hunter, Truemail) pass `use_proxies=False` to get an empty pool.
+    """
+
+    def __init__(self,
+                 budget: Optional[RetryBudget] = None,
+                 policy: Optional[RetryPolicy] = None,
+                 timeout: float = Config.HTTP_TIMEOUT,
+                 proxy_pool: Optional[ProxyPool] = None,
+                 use_proxies: bool = True):
+        self.budget = budget or RetryBudget()
+        self.policy = policy or RetryPolicy()
+        self.timeout = timeout
+        self.proxy_pool = (proxy_pool or get_proxy_pool()) if use_proxies else ProxyPool([])
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = random.choice(Config.USER_AGENTS)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Perform an HTTP request, retrying transient failures.
+
+        Raises:
+            CircuitOpenError: If the host's circuit breaker is open.
+            RetryBudgetExhausted: If the job ran out of retries.
+            requests.HTTPError: For non-retryable error responses (4xx).
+            FixtureMissing: In replay mode, if the request was never recorded.
+        """
+        record_request()
+        mode = transport_mode()
+        if mode == REPLAY:
+            return get_fixture_store().load(method, url, kwargs)
+        kwargs.setdefault("timeout", self.timeout)
+
+        def attempt() -> requests.Response:
+            with self.proxy_pool.lease() as lease:
+                try:
+                    response = self.session.request(method, url, proxies=requests_proxies(lease.proxy), **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    # Blame the proxy only when one was in use.
+                    if lease.proxy:
+                        lease.fail()
+                    raise
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                raise RetryableError(f"{method} {url} returned {response.status_code}",
+                                     retry_after=_retry_after(response))
+            response.raise_for_status()
+            return response
+
+        response = call_with_retry(attempt, host_of(url), budget=self.budget, policy=self.policy)
+        if mode == RECORD:
+            get_fixture_store().save(method, url, kwargs, response)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
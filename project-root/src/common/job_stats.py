@@ -0,0 +1,72 @@
+"""
+Per-job accounting of requests and spooled leads, for yield-aware scheduling.
+
+While a `JobRecorder` is active (see `src.workflows.scheduler`), `HttpClient` requests and
+Playwright page navigations are counted against it, and every batch passed to
+`spool_leads` is kept so the scheduler can tell how many of the job's leads were new.
+Nothing is recorded when no job is active.
+"""
+
+import time
+import threading
+from typing import List, Optional
+
+from src.common.lead_batch import LeadBatch
+
+_active: Optional["JobRecorder"] = None
+
+
+def active_job() -> Optional["JobRecorder"]:
+    """Return the recorder of the running job, or None outside scheduled jobs."""
+    return _active
+
+
+def record_request() -> None:
+    """Count one HTTP request or page navigation against the running job."""
+    recorder = _active
+    if recorder is not None:
+        with recorder._lock:
+            recorder.requests += 1
+
+
+def record_leads(batch: LeadBatch) -> None:
+    """Keep a batch of leads spooled by the running job."""
+    recorder = _active
+    if recorder is not None:
+        with recorder._lock:
+            recorder.batches.append(batch)
+
+
+class JobRecorder:
+    """
+    Context manager collecting what one job run cost and produced.
+
+    Attributes:
+        job (str): Name of the job.
+        requests (int): HTTP requests and page navigations made.
+        batches (list): Lead batches spooled.
+        duration (float): Wall-clock seconds, set when the block exits.
+    """
+
+    def __init__(self, job: str):
+        self.job = job
+        self.requests = 0
+        self.batches: List[LeadBatch] = []
+        self.duration = 0.0
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "JobRecorder":
+        global _active
+        self._started = time.perf_counter()
+        _active = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active
+        _active = None
+        self.duration = time.perf_counter() - self._started
+
+    @property
+    def leads(self) -> int:
+        return sum(len(batch) for batch in self.batches)
@@ -0,0 +1,214 @@
+"""
+A compact, columnar container for scraped leads.
+
+Instead of one `dict` per lead (plus an ORM `Lead` per row at write time), a `LeadBatch`
+keeps one list per field. Values that repeat across a run (platform, persona, cta, ...)
+are interned so every row shares a single string object, and numeric fields live in
+`array` buffers. Rows are exposed through a lightweight `__slots__` view, so code that
+reads `lead["job_title"]`, `lead.get("email")` or `lead.job_title` keeps working.
+"""
+
+import sys
+import math
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+FIELDS: Tuple[str, ...] = (
+    "platform",
+    "persona",
+    "cta",
+    "first_name",
+    "last_name",
+    "job_title",
+    "company_name",
+    "linkedin_url",
+    "email",
+    "email_status",
+    "company_website",
+    "industry",
+    "location",
+    "rating",
+    "source_url",
+    "persona_tags",
+)
+
+# Low-cardinality fields whose values are interned.
+INTERNED_FIELDS = frozenset({
+    "platform", "persona", "cta", "email_status", "industry", "location", "persona_tags",
+})
+
+# Numeric fields stored in a typed array, with NaN standing in for None.
+FLOAT_FIELDS = frozenset({"rating"})
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class LeadRow:
+    """A read/write view of one row in a `LeadBatch`. Holds no field data itself."""
+
+    __slots__ = ("_batch", "_index")
+
+    def __init__(self, batch: "LeadBatch", index: int):
+        self._batch = batch
+        self._index = index
+
+    def __getitem__(self, field: str) -> Any:
+        if field not in self._batch._columns:
+            raise KeyError(field)
+        return self._batch._get(field, self._index)
+
+    def __setitem__(self, field: str, value: Any) -> None:
+        self._batch._set(field, self._index, value)
+
+    def __getattr__(self, field: str) -> Any:
+        if field.startswith("_"):
+            # Private and dunder lookups (copy, pickle) run before `_batch` is set
+            raise AttributeError(field)
+        try:
+            return self[field]
+        except KeyError:
+            raise AttributeError(field) from None
+
+    def __contains__(self, field: str) -> bool:
+        return field in self._batch._columns
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field not in self._batch._columns:
+            return default
+        return self._batch._get(field, self._index)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._batch.fields
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: self._batch._get(field, self._index) for field in self._batch.fields}
+
+    def __repr__(self) -> str:
+        return f"LeadRow({self.to_dict()!r})"
+
+
+class LeadBatch:
+    """
+    Column-oriented storage for a batch of leads.
+
+    Attributes:
+        fields (tuple): Field names, in column order.
+    """
+
+    __slots__ = ("fields", "_columns", "_size")
+
+    def __init__(self, leads: Iterable[Union[Dict[str, Any], LeadRow]] = (), fields: Tuple[str, ...] = FIELDS):
+        self.fields = tuple(fields)
+        self._columns: Dict[str, Union[List[Any], array]] = {
+            field: array("d") if field in FLOAT_FIELDS else [] for field in self.fields
+        }
+        self._size = 0
+        for lead in leads:
+            self.append(lead)
+
+    # -- construction ---------------------------------------------------------------
+
+    @classmethod
+    def from_rows(cls, fields: Iterable[str], rows: Iterable[Iterable[Any]]) -> "LeadBatch":
+        """Build a batch from row tuples in `fields` order, e.g. as produced by `rows()`."""
+        batch = cls(fields=tuple(fields))
+        rows = list(rows)
+        columns = zip(*rows) if rows else ([] for _ in batch.fields)
+        for field, values in zip(batch.fields, columns):
+            batch._columns[field].extend(batch._encode(field, value) for value in values)
+        batch._size = len(rows)
+        return batch
+
+    def append(self, lead: Optional[Union[Dict[str, Any], LeadRow]] = None, **values: Any) -> None:
+        """Append one lead, given as a mapping and/or keyword arguments. Unknown keys are ignored."""
+        if lead is not None:
+            values = {**{field: lead.get(field) for field in self.fields}, **values}
+        for field, column in self._columns.items():
+            column.append(self._encode(field, values.get(field)))
+        self._size += 1
+
+    def extend(self, other: Iterable[Union[Dict[str, Any], LeadRow]]) -> None:
+        """Append every lead from another batch or iterable of mappings."""
+        if isinstance(other, LeadBatch) and other.fields == self.fields:
+            for field, column in self._columns.items():
+                column.extend(other._columns[field])
+            self._size += len(other)
+            return
+        for lead in other:
+            self.append(lead)
+
+    def set_column(self, field: str, values: Iterable[Any]) -> None:
+        """Replace (or add) a whole column. `values` must have one entry per row."""
+        column = array("d") if field in FLOAT_FIELDS else []
+        column.extend(self._encode(field, value) for value in values)
+        if len(column) != self._size:
+            raise ValueError(f"Column '{field}' has {len(column)} values for {self._size} rows.")
+        if field not in self._columns:
+            self.fields += (field,)
+        self._columns[field] = column
+
+    # -- access ---------------------------------------------------------------------
+
+    def column(self, field: str) -> List[Any]:
+        """Return a copy of the values of one field for every row."""
+        return list(self._values(field))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[LeadRow]:
+        for index in range(self._size):
+            yield LeadRow(self, index)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[LeadRow, "LeadBatch"]:
+        if isinstance(key, slice):
+            sliced = LeadBatch(fields=self.fields)
+            for field, column in self._columns.items():
+                sliced._columns[field] = column[key]
+            sliced._size = len(range(*key.indices(self._size)))
+            return sliced
+        if key < 0:
+            key += self._size
+        if not 0 <= key < self._size:
+            raise IndexError(key)
+        return LeadRow(self, key)
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        """Yield each row as a tuple of values in `fields` order (e.g. for CSV export)."""
+        return zip(*(self._values(field) for field in self.fields))
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Materialise every row as a dictionary. Prefer iterating rows on large batches."""
+        return [dict(zip(self.fields, row)) for row in self.rows()]
+
+    def __repr__(self) -> str:
+        return f"LeadBatch({self._size} leads)"
+
+    # -- internals ------------------------------------------------------------------
+
+    def _encode(self, field: str, value: Any) -> Any:
+        if field in FLOAT_FIELDS:
+            return math.nan if value is None else float(value)
+        if field in INTERNED_FIELDS:
+            return _intern(value)
+        return value
+
+    def _values(self, field: str) -> Iterable[Any]:
+        """The decoded values of one field, without copying object columns."""
+        column = self._columns[field]
+        if field in FLOAT_FIELDS:
+            return [None if math.isnan(value) else value for value in column]
+        return column
+
+    def _get(self, field: str, index: int) -> Any:
+        value = self._columns[field][index]
+        if field in FLOAT_FIELDS and math.isnan(value):
+            return None
+        return value
+
+    def _set(self, field: str, index: int, value: Any) -> None:
+        if field not in self._columns:
+            self.set_column(field, [None] * self._size)
+        self._columns[field][index] = self._encode(field, value)
@@ -0,0 +1,198 @@
+"""
+One non-blocking logging setup for the whole pipeline.
+
+`setup_logging()` puts a single `QueueHandler` on the root logger. A logging call on a
+scraping thread then only builds the `LogRecord` and puts it on an in-memory queue.
+Formatting the message (lazily, from `%`-style arguments), rendering tracebacks,
+encoding JSON and writing to stderr all happen in a background `QueueListener` thread.
+
+Output is one JSON object per line by default (`LOG_FORMAT=json`), with the timestamp,
+level, logger, message, source location and thread, plus any `extra=` fields.
+`LOG_FORMAT=text` gives plain lines for local runs.
+
+Repeated warnings are sampled on the producing side, before they are queued: the same
+call site (logger, file and line) logs at most `LOG_RATE_LIMIT` warnings per
+`LOG_RATE_WINDOW` seconds. The next warning that gets through carries a
+`suppressed` count. Other levels, including progress lines at INFO, are never dropped.
+
+Process pools pass `worker_logging()` as their initializer, so records logged in worker
+processes are sent back over a `multiprocessing.Queue` to the same writer.
+
+Entry points call `setup_logging()`; library modules only create their module logger.
+Log hot paths with `%`-style arguments, e.g. `logger.debug("Parsed %d cards", n)`, so
+that nothing is formatted when the level is disabled.
+"""
+
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import traceback
+import multiprocessing
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.config.config import Config
+
+# Attributes every LogRecord has; anything else was passed through `extra=`.
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_worker_queue: Any = None  # multiprocessing.Queue fed by worker processes
+_worker_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        document = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "where": f"{record.module}:{record.lineno}",
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                document[key] = value
+        if record.exc_info:
+            document["exc"] = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+        if record.stack_info:
+            document["stack"] = record.stack_info
+        return json.dumps(document, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `limit` records of `level` per call site through per `window` seconds;
+    records of other levels always pass. Dropped records are counted, and the count is
+    attached as `suppressed` to the next record that gets through.
+    """
+
+    def __init__(self, limit: int = 10, window: float = 60.0, level: int = logging.WARNING):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self.level = level
+        self._sites: Dict[Tuple[str, str, int], list] = {}  # site -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno != self.level or self.limit <= 0:
+            return True
+        site = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            state = self._sites.get(site)
+            if state is None or now - state[0] >= self.window:
+                suppressed = state[2] if state else 0
+                self._sites[site] = [now, 1, 0]
+            elif state[1] < self.limit:
+                state[1] += 1
+                suppressed, state[2] = state[2], 0
+            else:
+                state[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _EnqueueHandler(QueueHandler):
+    """A QueueHandler that defers all formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare() formats the message on the calling thread; the queue is
+        # in-process, so the record can travel as it is.
+        return record
+
+
+def setup_logging(level: Optional[str] = None, fmt: Optional[str] = None,
+                  stream=None) -> QueueListener:
+    """
+    Route all logging through a background writer. Safe to call more than once; later
+    calls only adjust the level.
+
+    Args:
+        level (str, optional): Root level, defaults to `LOG_LEVEL`.
+        fmt (str, optional): "json" or "text", defaults to `LOG_FORMAT`.
+        stream: Output stream, defaults to stderr.
+
+    Returns:
+        QueueListener: The running listener, stopped by `shutdown_logging()` at exit.
+    """
+    global _listener
+    root = logging.getLogger()
+    root.setLevel((level or Config.LOG_LEVEL).upper())
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        output = logging.StreamHandler(stream or sys.stderr)
+        if (fmt or Config.LOG_FORMAT).lower() == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        handler = _EnqueueHandler(records)
+        if Config.LOG_RATE_LIMIT > 0:
+            handler.addFilter(RateLimitFilter(Config.LOG_RATE_LIMIT, Config.LOG_RATE_WINDOW))
+        for existing in root.handlers[:]:
+            root.removeHandler(existing)
+        root.addHandler(handler)
+
+        _listener = QueueListener(records, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _listener
+
+
+def _init_worker(records, level: int) -> None:
+    # Forked workers inherit the parent's in-process queue handler, which nothing drains
+    # in the child; send records to the parent's listener instead.
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        root.removeHandler(existing)
+    handler = QueueHandler(records)  # The stock prepare() makes records picklable
+    if Config.LOG_RATE_LIMIT > 0:
+        handler.addFilter(RateLimitFilter(Config.LOG_RATE_LIMIT, Config.LOG_RATE_WINDOW))
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def worker_logging() -> Tuple[Optional[Callable[..., None]], tuple]:
+    """
+    Initializer for process pools that routes worker records to the background writer.
+
+    Returns:
+        tuple: `(initializer, initargs)` for `ProcessPoolExecutor`; `(None, ())` when
+        `setup_logging()` has not been called, so workers keep the inherited handlers.
+    """
+    global _worker_queue, _worker_listener
+    with _lock:
+        if _listener is None:
+            return None, ()
+        if _worker_queue is None:
+            _worker_queue = multiprocessing.Queue()
+            _worker_listener = QueueListener(_worker_queue, *_listener.handlers, respect_handler_level=True)
+            _worker_listener.start()
+        return _init_worker, (_worker_queue, logging.getLogger().level)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writers."""
+    global _listener, _worker_listener, _worker_queue
+    with _lock:
+        listeners = [_worker_listener, _listener]
+        _listener = _worker_listener = _worker_queue = None
+    for listener in listeners:
+        if listener is not None:
+            listener.stop()
@@ -1,25 +1,153 @@
-from playwright.sync_api import sync_playwright, Browser, Page
+from playwright.sync_api import sync_playwright, Browser, Page, Error as PlaywrightError
+import json
+import time
+import base64
 import random
 import logging
+from typing import Any, Callable, Dict, List, Tuple
 from src.config.config import Config
+from src.common.browser_waits import url_matches
+from src.common.lead_batch import LeadBatch
+from src.common.resilience import RetryBudget, call_with_retry, host_of
+from src.common.proxy_manager import ProxyPool, get_proxy_pool, playwright_proxy
+from src.common.profiling import active_profiler
+from src.common.job_stats import record_request
+from src.common.transport import RECORD, REPLAY, get_fixture_store, transport_mode
 
 logger = logging.getLogger(__name__)
 
+# Navigation errors that point at the proxy rather than the target site.
+PROXY_ERROR_MARKERS = ("ERR_PROXY", "ERR_TUNNEL", "ERR_SOCKS", "ERR_TIMED_OUT", "ERR_CONNECTION")
+
+
+class ResponseCapture:
+    """
+    Captures structured data from the JSON responses a page receives, so records can be
+    built from the API payloads instead of scraping the rendered DOM.
+
+    Responses are matched by URL against the configured glob patterns as they arrive
+    (`page.on("response")`), and their bodies are read and parsed on `collect()`.
+    Recorded responses (a HAR file or url/payload pairs) can be fed in instead of a live
+    page, which makes the parsers testable offline.
+
+    Attributes:
+        parsers (dict): URL glob -> `parser(payload) -> LeadBatch`.
+        failures (int): Matched responses whose body could not be read or parsed.
+    """
+
+    def __init__(self, parsers: Dict[str, Callable[[Any], LeadBatch]]):
+        self.parsers = parsers
+        self.failures = 0
+        self._pending: List[Tuple[str, Callable[[Any], LeadBatch], Any]] = []
+
+    def _parser_for(self, url: str):
+        for pattern, parser in self.parsers.items():
+            if url_matches(pattern, url):
+                return parser
+        return None
+
+    def attach(self, page: Page) -> None:
+        page.on("response", self.on_response)
+
+    def on_response(self, response) -> None:
+        parser = self._parser_for(response.url)
+        if parser is not None and response.ok:
+            # Only keep a reference here; the body is read in collect(), outside the event.
+            self._pending.append((response.url, parser, response))
+
+    def feed(self, url: str, payload: Any) -> bool:
+        """Queue an already-decoded payload as if it had been received from `url`."""
+        parser = self._parser_for(url)
+        if parser is not None:
+            self._pending.append((url, parser, payload))
+        return parser is not None
+
+    def replay_har(self, path: str) -> int:
+        """
+        Queue the matching JSON responses recorded in a HAR file
+        (e.g. from `browser.new_context(record_har_path=...)`).
+
+        Returns:
+            int: The number of responses queued.
+        """
+        with open(path) as f:
+            entries = json.load(f).get("log", {}).get("entries", [])
+        queued = 0
+        for entry in entries:
+            content = entry.get("response", {}).get("content", {})
+            text = content.get("text")
+            if not text or entry.get("response", {}).get("status", 0) >= 400:
+                continue
+            if content.get("encoding") == "base64":
+                text = base64.b64decode(text).decode("utf-8")
+            try:
+                queued += self.feed(entry["request"]["url"], json.loads(text))
+            except ValueError:
+                continue
+        return queued
+
+    def collect(self) -> LeadBatch:
+        """
+        Parse every response captured since the last call into one batch.
+
+        Returns:
+            LeadBatch: The parsed records (empty if nothing matched).
+        """
+        pending, self._pending = self._pending, []
+        leads = LeadBatch()
+        for url, parser, source in pending:
+            try:
+                payload = source if not hasattr(source, "json") else source.json()
+                leads.extend(parser(payload))
+            except Exception as e:
+                self._parse_failed(url, e)
+        return leads
+
+    async def collect_async(self) -> LeadBatch:
+        """`collect()` for pages driven through `playwright.async_api`."""
+        pending, self._pending = self._pending, []
+        leads = LeadBatch()
+        for url, parser, source in pending:
+            try:
+                payload = source if not hasattr(source, "json") else await source.json()
+                leads.extend(parser(payload))
+            except Exception as e:
+                self._parse_failed(url, e)
+        return leads
+
+    def _parse_failed(self, url: str, error: Exception) -> None:
+        self.failures += 1
+        logger.warning("Could not parse captured response from %s: %s", url, error)
+
+
 class PlaywrightDriver:
     """
     A context manager for managing a Playwright browser session.
 
     Attributes:
-        proxy (str): Proxy server address.
+        proxy (str): Proxy server address. If omitted, a proxy is leased from the shared
+            `ProxyPool` for the lifetime of the session and returned with its outcome.
         headless (bool): Whether to run the browser in headless mode.
+        storage_state (dict): Optional cookies/local storage snapshot to start the context with.
+        capture (ResponseCapture): Optional capture attached to the page for the session.
+        har_name (str): Name of the session's HAR file in the fixture store. It is written
+            in record mode and the context is served from it in replay mode, where no
+            proxy is used either.
     """
 
-    def __init__(self, proxy: str = None, headless: bool = True):
+    def __init__(self, proxy: str = None, headless: bool = True, storage_state: dict = None,
+                 proxy_pool: ProxyPool = None, capture: ResponseCapture = None, har_name: str = "browser"):
         self.proxy = proxy
+        self.capture = capture
         self.headless = headless
+        self.storage_state = storage_state
+        self.har_name = har_name
+        self.proxy_pool = None if proxy or transport_mode() == REPLAY else (proxy_pool or get_proxy_pool())
+        self.pw = None
         self.browser: Browser = None
         self.context = None
         self.page: Page = None
+        self.tracing = False
 
     def __enter__(self) -> Page:
         """
@@ -29,22 +157,30 @@ class PlaywrightDriver:
             Page: A new page instance.
         """
         try:
+            if self.proxy_pool is not None:
+                self.proxy = self.proxy_pool.acquire()
             self.pw = sync_playwright().start()
             browser_args = {
                 "headless": self.headless
             }
             if self.proxy:
-                browser_args["proxy"] = {"server": self.proxy}
+                browser_args["proxy"] = playwright_proxy(self.proxy)
             self.browser = self.pw.chromium.launch(**browser_args)
-            self.context = self.browser.new_context(
-                user_agent=random.choice(Config.USER_AGENTS)
-            )
+            self.context = new_recorded_context(self.browser, self.har_name,
+                                                user_agent=random.choice(Config.USER_AGENTS),
+                                                storage_state=self.storage_state)
+            profiler = active_profiler()
+            if profiler and profiler.trace_slowest:
+                self.context.tracing.start(screenshots=True, snapshots=True)
+                self.tracing = True
             self.page = self.context.new_page()
+            if self.capture is not None:
+                self.capture.attach(self.page)
             logger.info("Playwright session started successfully.")
             return self.page
         except Exception as e:
-            logger.error(f"Failed to start Playwright session: {e}")
-            self.__exit__(None, None, None)
+            logger.error("Failed to start Playwright session: %s", e)
+            self.__exit__(type(e), e, None)
             raise
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -53,11 +189,77 @@ class PlaywrightDriver:
         """
         try:
             if self.context:
+                if self.tracing:
+                    self.context.tracing.stop()
                 self.context.close()
+                if transport_mode() == RECORD:
+                    get_fixture_store().scrub_har(self.har_name)
             if self.browser:
                 self.browser.close()
             if self.pw:
                 self.pw.stop()
             logger.info("Playwright session closed successfully.")
         except Exception as e:
-            logger.error(f"Error closing Playwright session: {e}") 
\ No newline at end of file
+            logger.error("Error closing Playwright session: %s", e)
+        finally:
+            if self.proxy_pool is not None and self.proxy:
+                proxy_failed = isinstance(exc_val, PlaywrightError) and any(
+                    marker in str(exc_val) for marker in PROXY_ERROR_MARKERS)
+                self.proxy_pool.release(self.proxy, success=not proxy_failed)
+                self.proxy = None
+
+
+def new_recorded_context(browser: Browser, har_name: str, **kwargs):
+    """
+    Create a browser context that follows the transport mode: recorded to the fixture
+    store's `har_name` HAR file in record mode, routed from it in replay mode (requests
+    missing from the HAR are aborted, never sent), and plain otherwise.
+    """
+    mode = transport_mode()
+    if mode == RECORD:
+        kwargs.update(record_har_path=get_fixture_store().har_path(har_name), record_har_content="embed")
+    context = browser.new_context(**kwargs)
+    if mode == REPLAY:
+        context.route_from_har(get_fixture_store().har_path(har_name), not_found="abort")
+    return context
+
+
+def goto(page: Page, url: str, budget: RetryBudget = None, **kwargs):
+    """
+    Navigate `page` to `url`, retrying transient failures (timeouts, net::ERR_*) with
+    backoff under the circuit breaker for the URL's host.
+
+    Args:
+        page (Page): The Playwright page to navigate.
+        url (str): Destination URL.
+        budget (RetryBudget, optional): Retry budget of the current job.
+        **kwargs: Passed through to `page.goto`.
+
+    Returns:
+        The navigation response, as returned by `page.goto`.
+
+    Raises:
+        CircuitOpenError: If the host's circuit breaker is open.
+    """
+    record_request()
+
+    def navigate():
+        return call_with_retry(lambda: page.goto(url, **kwargs), host_of(url), budget=budget)
+
+    profiler = active_profiler()
+    if profiler is None:
+        return navigate()
+
+    # Profiling: time the load and record a trace chunk, kept only if among the slowest N.
+    tracing = bool(profiler.trace_slowest)
+    if tracing:
+        page.context.tracing.start_chunk(title=url)
+    started = time.perf_counter()
+    try:
+        return navigate()
+    finally:
+        trace_path = None
+        if tracing:
+            trace_path = profiler.new_trace_path()
+            page.context.tracing.stop_chunk(path=trace_path)
+        profiler.record_page_load(time.perf_counter() - started, url, trace_path)
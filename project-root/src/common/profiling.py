@@ -0,0 +1,180 @@
+"""
+Opt-in profiling for scraper runs (`python -m src.main --profile`).
+
+When a `RunProfiler` is active:
+- Each scraper's `run()` is executed under cProfile; the raw stats are saved as
+  `<scraper>.prof` (open with `snakeviz` or `pstats`).
+- `tracemalloc` snapshots are taken around each run and around lead extraction, and the
+  biggest allocation growth sites are reported.
+- `PlaywrightDriver` records a Playwright trace chunk per page load and keeps only the
+  slowest N (`trace-<n>.zip`, open with `playwright show-trace`).
+
+Limits: cProfile only sees the thread that calls `run()`. Fetch threads and parse worker
+processes of the async pipeline (`workflows.pipeline`) do not show up in the CPU stats,
+only their wait time in the caller does. Async page loads (`goto_async`) are timed but
+never traced, so `--trace-slowest` only applies to the sync `PlaywrightDriver`.
+
+Everything goes to a per-run directory, and `report.txt` there summarises the top-N
+hot spots. Nothing is collected unless profiling was enabled.
+"""
+
+import os
+import io
+import time
+import pstats
+import cProfile
+import logging
+import threading
+import itertools
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_active: Optional["RunProfiler"] = None
+
+
+def active_profiler() -> Optional["RunProfiler"]:
+    """Return the profiler of the current run, or None when profiling is off."""
+    return _active
+
+
+@contextmanager
+def profile_memory(label: str) -> Iterator[None]:
+    """Report allocation growth over the `with` block when profiling is on; no-op otherwise."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+    profiler.snapshot(f"{label}:before")
+    try:
+        yield
+    finally:
+        profiler.snapshot(f"{label}:after")
+        profiler.compare(f"{label}:before", f"{label}:after", title=f"Memory growth over {label}")
+
+
+class RunProfiler:
+    """
+    Collects profiling artifacts for one pipeline run.
+
+    Attributes:
+        run_dir (str): Directory all artifacts are written to.
+        top_n (int): Number of hot spots listed per section of the report.
+        trace_slowest (int): Number of slowest page loads to keep Playwright traces for.
+    """
+
+    def __init__(self, base_dir: str = "profiles", top_n: int = 25, trace_slowest: int = 0):
+        self.run_dir = os.path.join(base_dir, datetime.now().strftime("%Y%m%d-%H%M%S"))
+        self.top_n = top_n
+        self.trace_slowest = trace_slowest
+        os.makedirs(self.run_dir, exist_ok=True)
+        self._sections: List[str] = []
+        self._snapshots: Dict[str, tracemalloc.Snapshot] = {}
+        self._page_loads: List[Tuple[float, str, Optional[str]]] = []
+        self._trace_seq = itertools.count(1)
+        self._lock = threading.Lock()
+        self._warned_untraced = False
+
+    def __enter__(self) -> "RunProfiler":
+        global _active
+        tracemalloc.start(10)
+        _active = self
+        logger.info("Profiling enabled, writing artifacts to %s.", self.run_dir)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        global _active
+        _active = None
+        tracemalloc.stop()
+        self.write_report()
+
+    # -- CPU ------------------------------------------------------------------------
+
+    def profile_call(self, name: str, func: Callable[[], Any]) -> Any:
+        """Run `func` under cProfile, with memory snapshots before and after."""
+        self.snapshot(f"{name}:start")
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            return profiler.runcall(func)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.snapshot(f"{name}:end")
+            profiler.dump_stats(os.path.join(self.run_dir, f"{name}.prof"))
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(self.top_n)
+            self._add_section(f"CPU: {name} ({elapsed:.2f}s wall)", stream.getvalue())
+            self.compare(f"{name}:start", f"{name}:end", title=f"Memory growth over {name}")
+
+    # -- Memory ---------------------------------------------------------------------
+
+    def snapshot(self, label: str) -> None:
+        """Take a tracemalloc snapshot under `label`."""
+        if tracemalloc.is_tracing():
+            self._snapshots[label] = tracemalloc.take_snapshot().filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+            ])
+
+    def compare(self, before: str, after: str, title: Optional[str] = None) -> None:
+        """Add the top allocation growth sites between two snapshots to the report."""
+        if before not in self._snapshots or after not in self._snapshots:
+            return
+        stats = self._snapshots[after].compare_to(self._snapshots[before], "lineno")
+        lines = [str(stat) for stat in stats[:self.top_n]]
+        current, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        lines.append(f"Traced memory now {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB")
+        self._add_section(title or f"Memory: {before} -> {after}", "\n".join(lines))
+        self._snapshots.pop(before, None)
+        self._snapshots.pop(after, None)
+
+    # -- Page loads -----------------------------------------------------------------
+
+    def record_page_load(self, duration: float, url: str, trace_path: Optional[str]) -> None:
+        """
+        Record a page load and keep its trace only if it is among the slowest N.
+        """
+        with self._lock:
+            self._page_loads.append((duration, url, trace_path))
+            self._page_loads.sort(key=lambda load: -load[0])
+            for _, _, dropped in self._page_loads[self.trace_slowest:]:
+                if dropped and os.path.exists(dropped):
+                    os.remove(dropped)
+            self._page_loads = [
+                (d, u, p if i < self.trace_slowest else None) for i, (d, u, p) in enumerate(self._page_loads)
+            ]
+
+    def record_untraced_page_load(self, duration: float, url: str) -> None:
+        """Record an async page load, which has no trace; warns once if traces were asked for."""
+        with self._lock:
+            warn, self._warned_untraced = self.trace_slowest and not self._warned_untraced, True
+        if warn:
+            logger.warning("--trace-slowest has no effect on async page loads; they are timed but not traced.")
+        self.record_page_load(duration, url, None)
+
+    def new_trace_path(self) -> str:
+        return os.path.join(self.run_dir, f"trace-{next(self._trace_seq):05d}.zip")
+
+    # -- Report ---------------------------------------------------------------------
+
+    def _add_section(self, title: str, body: str) -> None:
+        with self._lock:
+            self._sections.append(f"== {title} ==\n{body.rstrip()}\n")
+
+    def write_report(self) -> str:
+        """Write `report.txt` to the run directory and return its path."""
+        sections = ["== Scope ==\n"
+                    "CPU stats cover the thread calling each scraper's run() only: pipeline fetch threads\n"
+                    "and parse worker processes are not profiled. Async page loads are timed, not traced.\n"]
+        sections += self._sections
+        if self._page_loads:
+            loads = [f"{d:8.2f}s  {u}" + (f"  [{os.path.basename(p)}]" if p else "")
+                     for d, u, p in self._page_loads[:self.top_n]]
+            sections.append("== Slowest page loads ==\n" + "\n".join(loads) + "\n")
+        path = os.path.join(self.run_dir, "report.txt")
+        with open(path, "w") as f:
+            f.write("\n".join(sections))
+        logger.info("Profiling report written to %s.", path)
+        return path
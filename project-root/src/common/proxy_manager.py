@@ -1,9 +1,281 @@
+"""
+Latency-aware proxy pool shared by `PlaywrightDriver` and `HttpClient`.
+
+Each proxy tracks its TCP connect time and an error rate (both exponentially weighted).
+Proxies are picked at random, weighted towards the lowest latency and error rate. A proxy
+that fails repeatedly is quarantined, and each further quarantine is twice as long as the
+last. Concurrent leases per proxy are capped so one fast proxy is not overloaded.
+"""
+
+import time
 import random
+import socket
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+
 from src.config.config import Config
 
+logger = logging.getLogger(__name__)
+
+
+def _normalize(proxy: str) -> str:
+    return proxy if "://" in proxy else f"http://{proxy}"
+
+
+def requests_proxies(proxy: Optional[str]) -> Optional[Dict[str, str]]:
+    """Return the `proxies` mapping `requests` expects for `proxy`, or None."""
+    if not proxy:
+        return None
+    url = _normalize(proxy)
+    return {"http": url, "https": url}
+
+
+def playwright_proxy(proxy: Optional[str]) -> Optional[Dict[str, str]]:
+    """Return the `proxy` settings Playwright expects for `proxy`, or None."""
+    if not proxy:
+        return None
+    parsed = urlparse(_normalize(proxy))
+    settings = {"server": f"{parsed.scheme}://{parsed.hostname}:{parsed.port}"}
+    if parsed.username:
+        settings["username"] = parsed.username
+        settings["password"] = parsed.password or ""
+    return settings
+
+
+class ProxyStats:
+    """
+    Health statistics of a single proxy.
+
+    Attributes:
+        proxy (str): The proxy address, as configured.
+        latency (float): Exponentially weighted TCP connect time in seconds, None until measured.
+        error_rate (float): Exponentially weighted share of failed uses, between 0 and 1.
+        consecutive_failures (int): Failures since the last success.
+        quarantines (int): Number of times the proxy has been quarantined in a row.
+        quarantined_until (float): Monotonic time until which the proxy is not handed out.
+        leases (int): Number of leases currently held.
+        measured_at (float): Monotonic time of the last latency measurement.
+    """
+
+    def __init__(self, proxy: str):
+        self.proxy = proxy
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.quarantines = 0
+        self.quarantined_until = 0.0
+        self.leases = 0
+        self.measured_at = 0.0
+
+    def record_latency(self, latency: float, alpha: float) -> None:
+        self.latency = latency if self.latency is None else alpha * latency + (1 - alpha) * self.latency
+        self.measured_at = time.monotonic()
+
+    def weight(self, default_latency: float) -> float:
+        latency = self.latency if self.latency is not None else default_latency
+        return 1.0 / (max(latency, 0.001) * (1.0 + 10.0 * self.error_rate))
+
+
+class ProxyPool:
+    """
+    A pool of proxies handed out as leases.
+
+    Attributes:
+        max_leases (int): Maximum concurrent leases per proxy.
+        failure_threshold (int): Consecutive failures before a proxy is quarantined.
+        quarantine_base (float): Length (in seconds) of the first quarantine.
+        quarantine_max (float): Upper bound (in seconds) on a single quarantine.
+    """
+
+    def __init__(self,
+                 proxies: List[str],
+                 max_leases: int = Config.PROXY_MAX_LEASES,
+                 failure_threshold: int = Config.PROXY_FAILURE_THRESHOLD,
+                 quarantine_base: float = Config.PROXY_QUARANTINE_BASE,
+                 quarantine_max: float = Config.PROXY_QUARANTINE_MAX,
+                 probe_interval: float = Config.PROXY_PROBE_INTERVAL,
+                 alpha: float = 0.3):
+        self.max_leases = max_leases
+        self.failure_threshold = failure_threshold
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = quarantine_max
+        self.probe_interval = probe_interval
+        self.alpha = alpha
+        self._stats: Dict[str, ProxyStats] = {p: ProxyStats(p) for p in dict.fromkeys(proxies) if p}
+        self._cond = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def stats(self) -> List[ProxyStats]:
+        """Return the health statistics of every proxy in the pool."""
+        return list(self._stats.values())
+
+    def _candidates(self, now: float, respect_leases: bool = True) -> List[ProxyStats]:
+        return [
+            s for s in self._stats.values()
+            if s.quarantined_until <= now and (not respect_leases or s.leases < self.max_leases)
+        ]
+
+    def _choose(self, candidates: List[ProxyStats]) -> ProxyStats:
+        measured = sorted(s.latency for s in candidates if s.latency is not None)
+        # Unmeasured proxies are assumed to be as fast as the median so they get tried.
+        default_latency = measured[len(measured) // 2] if measured else 1.0
+        weights = [s.weight(default_latency) for s in candidates]
+        return random.choices(candidates, weights=weights, k=1)[0]
+
+    def pick(self) -> Optional[str]:
+        """
+        Return a proxy chosen by weighted lowest latency, without taking a lease.
+
+        Returns None if the pool is empty. If every proxy is quarantined, the one that
+        leaves quarantine soonest is returned rather than none at all.
+        """
+        with self._cond:
+            if not self._stats:
+                return None
+            candidates = self._candidates(time.monotonic(), respect_leases=False)
+            if not candidates:
+                return min(self._stats.values(), key=lambda s: s.quarantined_until).proxy
+            return self._choose(candidates).proxy
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Lease a proxy, waiting while every healthy proxy is at its lease cap.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. Waits indefinitely if None.
+
+        Returns:
+            The leased proxy, or None if the pool is empty or the wait timed out.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if not self._stats:
+                return None
+            while True:
+                now = time.monotonic()
+                candidates = self._candidates(now)
+                if candidates:
+                    stats = self._choose(candidates)
+                    stats.leases += 1
+                    break
+                if deadline is not None and now >= deadline:
+                    logger.warning("Timed out waiting for a healthy proxy.")
+                    return None
+                # Wake up when a lease is released or the earliest quarantine ends.
+                wake_at = min([s.quarantined_until for s in self._stats.values() if s.quarantined_until > now]
+                              + ([deadline] if deadline is not None else []), default=now + 1.0)
+                self._cond.wait(max(min(wake_at - now, 1.0), 0.01))
+        if stats.latency is None or time.monotonic() - stats.measured_at > self.probe_interval:
+            self.probe(stats.proxy)
+        return stats.proxy
+
+    def release(self, proxy: Optional[str], success: bool = True, latency: Optional[float] = None) -> None:
+        """
+        Return a leased proxy to the pool and record the outcome of its use.
+
+        Args:
+            proxy (str): The proxy returned by `acquire`.
+            success (bool): False if the failure was attributable to the proxy
+                (connection refused, timeout, tunnel error).
+            latency (float, optional): An observed connect time, in seconds.
+        """
+        if not proxy:
+            return
+        with self._cond:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            stats.leases = max(stats.leases - 1, 0)
+            self._record(stats, success, latency)
+            self._cond.notify_all()
+
+    def _record(self, stats: ProxyStats, success: bool, latency: Optional[float]) -> None:
+        if latency is not None:
+            stats.record_latency(latency, self.alpha)
+        stats.error_rate = (1 - self.alpha) * stats.error_rate + self.alpha * (0.0 if success else 1.0)
+        if success:
+            stats.consecutive_failures = 0
+            stats.quarantines = 0
+            return
+        stats.consecutive_failures += 1
+        if stats.consecutive_failures >= self.failure_threshold:
+            duration = min(self.quarantine_base * (2 ** stats.quarantines), self.quarantine_max)
+            stats.quarantines += 1
+            stats.consecutive_failures = 0
+            stats.quarantined_until = time.monotonic() + duration
+            logger.warning("Quarantining proxy %s for %.0fs (error rate %.0f%%).",
+                           stats.proxy, duration, stats.error_rate * 100)
+
+    def probe(self, proxy: str, timeout: float = 5.0) -> Optional[float]:
+        """
+        Measure the TCP connect time to `proxy` and record it.
+
+        Returns:
+            The connect time in seconds, or None if the connection failed.
+        """
+        parsed = urlparse(_normalize(proxy))
+        started = time.perf_counter()
+        try:
+            with socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout):
+                pass
+        except OSError as e:
+            logger.debug("Probe of proxy %s failed: %s", proxy, e)
+            with self._cond:
+                if proxy in self._stats:
+                    self._record(self._stats[proxy], False, None)
+            return None
+        latency = time.perf_counter() - started
+        with self._cond:
+            if proxy in self._stats:
+                self._stats[proxy].record_latency(latency, self.alpha)
+        return latency
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator["ProxyLease"]:
+        """
+        Lease a proxy for the duration of a `with` block.
+
+        The lease counts as a success unless `ProxyLease.fail()` was called.
+        """
+        lease = ProxyLease(self.acquire(timeout))
+        try:
+            yield lease
+        finally:
+            self.release(lease.proxy, success=lease.ok, latency=lease.latency)
+
+
+class ProxyLease:
+    """A proxy held from a `ProxyPool`, plus the outcome to report when it is returned."""
+
+    def __init__(self, proxy: Optional[str]):
+        self.proxy = proxy
+        self.ok = True
+        self.latency: Optional[float] = None
+
+    def fail(self) -> None:
+        """Mark this use of the proxy as failed because of the proxy itself."""
+        self.ok = False
+
+
+_pool: Optional[ProxyPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_proxy_pool() -> ProxyPool:
+    """Return the process-wide proxy pool built from `Config.PROXY_LIST`."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProxyPool(Config.PROXY_LIST)
+        return _pool
+
+
 class ProxyManager:
     @staticmethod
     def get_random_proxy():
-        if Config.PROXY_LIST:
-            return random.choice(Config.PROXY_LIST)
-        return None 
\ No newline at end of file
+        return get_proxy_pool().pick()
@@ -0,0 +1,45 @@
+import time
+import threading
+
+from src.common.transport import replaying
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum burst size.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them. Never blocks in replay mode."""
+        if replaying():
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def pause_until(self, resume_at: float) -> None:
+        """Drain the bucket so no tokens are handed out before monotonic time `resume_at`."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -(resume_at - time.monotonic()) * self.rate)
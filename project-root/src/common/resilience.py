@@ -0,0 +1,333 @@
+"""
+Resilience primitives shared by the HTTP client and the Playwright navigations:
+
+- Error classification into retryable (timeouts, connection resets, 429, 5xx) and fatal.
+- Exponential backoff with full jitter.
+- A retry budget per job, so one run cannot spend unbounded time retrying.
+- Per-host circuit breakers that shed load while an upstream is down, letting workers
+  move on to healthy platforms instead of sleeping.
+"""
+
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from playwright.sync_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """Raised for failures worth retrying, e.g. a 503 response from an upstream."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class FatalError(Exception):
+    """Raised for failures that will not succeed on retry, e.g. a 401 or 404 response."""
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is shed because the circuit breaker for its host is open."""
+
+    def __init__(self, host: str, retry_at: float):
+        super().__init__(f"Circuit open for {host}, retry in {max(retry_at - time.monotonic(), 0):.1f}s")
+        self.host = host
+        self.retry_at = retry_at
+
+
+class RetryBudgetExhausted(Exception):
+    """Raised when a job has used up its retry budget."""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify an exception as retryable (transient) or fatal.
+
+    Args:
+        error (BaseException): The exception raised by an HTTP call or a navigation.
+
+    Returns:
+        bool: True if retrying the same call may succeed.
+    """
+    if isinstance(error, (FatalError, CircuitOpenError, RetryBudgetExhausted)):
+        return False
+    if isinstance(error, RetryableError):
+        return True
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    if isinstance(error, (requests.ConnectionError, requests.Timeout, PlaywrightTimeoutError)):
+        return True
+    if isinstance(error, PlaywrightError):
+        # Network-level navigation failures surface as net::ERR_* messages.
+        return "net::ERR_" in str(error)
+    return False
+
+
+def host_of(url: str) -> str:
+    """Return the host part of a URL, used as the circuit breaker key."""
+    return urlparse(url).netloc.lower()
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+
+    Attributes:
+        max_attempts (int): Total attempts per call, including the first one.
+        base_delay (float): Delay (in seconds) before the first retry, before jitter.
+        max_delay (float): Upper bound (in seconds) on a single backoff delay.
+    """
+
+    def __init__(self,
+                 max_attempts: int = Config.RETRY_MAX_ATTEMPTS,
+                 base_delay: float = Config.RETRY_BASE_DELAY,
+                 max_delay: float = Config.RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before retry number `attempt` (starting at 0).
+
+        A server-provided `Retry-After` is honoured as a lower bound.
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+class RetryBudget:
+    """
+    Caps the number of retries a single job (one scraper run) may spend across all calls.
+
+    Attributes:
+        max_retries (int): Total retries allowed for the job.
+        used (int): Retries spent so far.
+    """
+
+    def __init__(self, max_retries: int = Config.RETRY_BUDGET_PER_JOB):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_spend(self) -> bool:
+        """Consume one retry if any are left. Returns False when the budget is exhausted."""
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+    @property
+    def remaining(self) -> int:
+        return self.max_retries - self.used
+
+
+class CircuitBreaker:
+    """
+    A per-host circuit breaker.
+
+    The breaker is CLOSED while calls succeed. After `failure_threshold` consecutive
+    retryable failures it OPENs and rejects calls immediately for `reset_timeout` seconds.
+    It then goes HALF_OPEN and lets a single trial call through: success closes it, failure
+    re-opens it with the reset timeout doubled (up to `max_reset_timeout`).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self,
+                 host: str,
+                 failure_threshold: int = Config.CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = Config.CIRCUIT_RESET_TIMEOUT,
+                 max_reset_timeout: float = Config.CIRCUIT_MAX_RESET_TIMEOUT):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def retry_at(self) -> float:
+        """Monotonic time at which the breaker will let a trial call through."""
+        return self.opened_at + self.reset_timeout
+
+    def available(self) -> bool:
+        """Return True if a call would currently be let through, without reserving it."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() >= self.retry_at
+            if self.state == self.HALF_OPEN:
+                return not self._trial_in_flight
+            return True
+
+    def before_call(self) -> None:
+        """
+        Reserve permission for a call.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a trial in flight.
+        """
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() < self.retry_at:
+                    raise CircuitOpenError(self.host, self.retry_at)
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    raise CircuitOpenError(self.host, time.monotonic() + self.base_reset_timeout)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit for %s closed again.", self.host)
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_reset_timeout
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """
+        End a call that says nothing about host health (e.g. a 404 or a parse error):
+        free a half-open trial slot, leaving state and failure count as they are.
+        """
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+                self._open()
+            elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self) -> None:
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+        logger.warning("Circuit for %s opened for %.0fs after %d consecutive failures.",
+                       self.host, self.reset_timeout, self.failures)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(host: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for `host`, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(host)
+        return breaker
+
+
+def host_available(host: str) -> bool:
+    """Return True unless the circuit breaker for `host` is currently shedding load."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+    return breaker is None or breaker.available()
+
+
+def call_with_retry(func: Callable[[], Any],
+                    host: str,
+                    budget: Optional[RetryBudget] = None,
+                    policy: Optional[RetryPolicy] = None,
+                    sleep: Callable[[float], None] = time.sleep) -> Any:
+    """
+    Call `func` under the circuit breaker for `host`, retrying transient failures.
+
+    Args:
+        func (callable): Zero-argument callable performing one attempt.
+        host (str): Host the call talks to, selecting the circuit breaker.
+        budget (RetryBudget, optional): Job-wide retry budget. Unlimited when omitted.
+        policy (RetryPolicy, optional): Backoff policy. Defaults to `RetryPolicy()`.
+        sleep (callable): Sleep function, injectable for tests.
+
+    Returns:
+        Whatever `func` returns on the first successful attempt.
+
+    Raises:
+        CircuitOpenError: If the breaker for `host` is open; the caller should move on.
+        RetryBudgetExhausted: If the job's retry budget ran out.
+        Exception: The last error, if it was fatal or all attempts were used.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_circuit_breaker(host)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            delay = _retry_delay(e, host, attempt, breaker, budget, policy)
+            attempt += 1
+            sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+async def call_with_retry_async(func: Callable[[], Awaitable[Any]],
+                                host: str,
+                                budget: Optional[RetryBudget] = None,
+                                policy: Optional[RetryPolicy] = None) -> Any:
+    """
+    Async counterpart of `call_with_retry`: awaits `func()` per attempt and backs off
+    with `asyncio.sleep`, so other tasks keep running while this one waits.
+    """
+    policy = policy or RetryPolicy()
+    breaker = get_circuit_breaker(host)
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = await func()
+        except Exception as e:
+            delay = _retry_delay(e, host, attempt, breaker, budget, policy)
+            attempt += 1
+            await asyncio.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
+
+
+def _retry_delay(error: Exception, host: str, attempt: int, breaker: CircuitBreaker,
+                 budget: Optional[RetryBudget], policy: RetryPolicy) -> float:
+    """Record a failed attempt and return the backoff before the next one, or re-raise."""
+    if not is_retryable(error):
+        # Fatal errors (bad request, auth, parse errors) say nothing about host health.
+        breaker.release()
+        raise error
+    breaker.record_failure()
+    if attempt + 1 >= policy.max_attempts:
+        raise error
+    if budget is not None and not budget.try_spend():
+        raise RetryBudgetExhausted(f"Retry budget exhausted after {budget.used} retries: {error}") from error
+    delay = policy.backoff(attempt, getattr(error, "retry_after", None))
+    logger.debug("Retryable error from %s (attempt %d/%d): %s. Retrying in %.2fs.",
+                 host, attempt + 1, policy.max_attempts, error, delay)
+    return delay
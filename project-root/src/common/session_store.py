@@ -0,0 +1,112 @@
+"""
+Encrypted on-disk store for Playwright `storage_state` snapshots (cookies + local storage),
+so an authenticated session can be reused by new browser contexts and shared by parallel
+workers instead of each one going through the login form.
+
+The snapshot is encrypted with Fernet (AES-128-CBC + HMAC) using `Config.SESSION_STORE_KEY`.
+Refreshes are serialised with an exclusive file lock, so only one worker logs in at a time
+and the others pick up its result.
+"""
+
+import os
+import json
+import fcntl
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from cryptography.fernet import Fernet, InvalidToken
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """
+    Persists one storage state snapshot, encrypted, at `path`.
+
+    Attributes:
+        path (str): Location of the encrypted snapshot.
+        lock_path (str): Location of the lock file used to serialise refreshes.
+    """
+
+    _thread_locks: Dict[str, threading.Lock] = {}
+    _thread_locks_guard = threading.Lock()
+
+    def __init__(self, name: str, key: Optional[str] = None, directory: Optional[str] = None):
+        """
+        Args:
+            name (str): Snapshot name, e.g. "linkedin".
+            key (str, optional): Fernet key. Defaults to `Config.SESSION_STORE_KEY`.
+            directory (str, optional): Store directory. Defaults to `Config.SESSION_STORE_DIR`.
+
+        Raises:
+            ValueError: If no encryption key is configured.
+        """
+        key = key or Config.SESSION_STORE_KEY
+        if not key:
+            raise ValueError("SESSION_STORE_KEY is not set. Generate one with "
+                             "`python -c 'from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())'`.")
+        directory = directory or Config.SESSION_STORE_DIR
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.path = os.path.join(directory, f"{name}.state")
+        self.lock_path = self.path + ".lock"
+        self._fernet = Fernet(key.encode() if isinstance(key, str) else key)
+        with self._thread_locks_guard:
+            self._thread_lock = self._thread_locks.setdefault(self.path, threading.Lock())
+
+    def version(self) -> float:
+        """Return the modification time of the snapshot, or 0 if none is stored."""
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return 0.0
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load and decrypt the stored snapshot.
+
+        Returns:
+            The storage state dictionary, or None if nothing usable is stored.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                token = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            return json.loads(self._fernet.decrypt(token))
+        except (InvalidToken, ValueError) as e:
+            logger.warning("Discarding unreadable session snapshot %s: %s", self.path, e)
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Encrypt and atomically write a storage state snapshot."""
+        token = self._fernet.encrypt(json.dumps(state).encode("utf-8"))
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(token)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        logger.info("Saved session snapshot to %s.", self.path)
+
+    def clear(self) -> None:
+        """Remove the stored snapshot."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold an exclusive lock across threads and processes while refreshing the session."""
+        with self._thread_lock:
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
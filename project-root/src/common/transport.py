@@ -0,0 +1,212 @@
+"""
+Record/replay transport for deterministic, offline runs.
+
+`TRANSPORT_MODE` selects how scrapers reach the network:
+
+- "live" (default): normal requests.
+- "record": requests go out as usual, and every successful `HttpClient` exchange is
+  also saved to the fixture store. `PlaywrightDriver` sessions are recorded as HAR files.
+- "replay": nothing touches the network. `HttpClient` answers from the stored exchanges,
+  browser contexts are routed from the HAR files, and pacing and rate-limit delays are
+  skipped, so a full pipeline run takes seconds and gives the same result every time.
+
+Fixtures live under `FIXTURE_DIR/FIXTURE_VERSION/`, with `http/<host>/<key>.json` per
+exchange and `har/<name>.har` per browser flow. Bump `FIXTURE_VERSION` to re-record
+without losing the previous set. API keys and tokens are stripped from stored URLs and
+form bodies and never part of a fixture key, and HAR files are scrubbed of cookies,
+authorization headers and credential parameters (URLs and posted forms, e.g. the login
+password) once their browser context closes (sessions are restored from the session
+store, not the HAR).
+"""
+
+import os
+import re
+import json
+import base64
+import hashlib
+import logging
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from src.config.config import Config
+from src.common.resilience import FatalError
+
+logger = logging.getLogger(__name__)
+
+LIVE = "live"
+RECORD = "record"
+REPLAY = "replay"
+MODES = (LIVE, RECORD, REPLAY)
+
+# Query parameters and form fields that carry credentials; they never reach a fixture.
+SECRET_PARAMS = frozenset({"api_key", "apikey", "key", "token", "access_token",
+                           "password", "session_password", "session_key"})
+
+# HAR headers that carry session credentials; removed from recorded HAR files.
+SECRET_HEADERS = frozenset({"cookie", "set-cookie", "authorization", "csrf-token", "x-li-identity"})
+
+
+class FixtureMissing(FatalError):
+    """Raised in replay mode when no recorded exchange matches a request."""
+
+
+def transport_mode() -> str:
+    """Return the current transport mode ("live", "record" or "replay")."""
+    mode = (Config.TRANSPORT_MODE or LIVE).lower()
+    if mode not in MODES:
+        raise ValueError(f"Unknown TRANSPORT_MODE '{mode}', expected one of {MODES}.")
+    return mode
+
+
+def replaying() -> bool:
+    return transport_mode() == REPLAY
+
+
+def redact_url(url: str) -> str:
+    """Drop credential query parameters and sort the rest, giving a stable URL."""
+    parts = urlsplit(url)
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if k.lower() not in SECRET_PARAMS)
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def _is_secret(name: str) -> bool:
+    return name.lower() in SECRET_PARAMS
+
+
+def _scrub_har_request(request: Dict[str, Any]) -> None:
+    """Drop credential parameters from a HAR request's URL, query string and posted form."""
+    parts = urlsplit(request.get("url", ""))
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if any(_is_secret(k) for k, _ in query):
+        # Other parameters keep their order, so the URL still matches on replay
+        query = urlencode([(k, v) for k, v in query if not _is_secret(k)])
+        request["url"] = urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+    request["queryString"] = [p for p in request.get("queryString", []) if not _is_secret(p.get("name", ""))]
+    post = request.get("postData")
+    if not post:
+        return
+    post["params"] = [p for p in post.get("params", []) if not _is_secret(p.get("name", ""))]
+    text, mime = post.get("text"), post.get("mimeType", "")
+    if not text:
+        return
+    if "application/x-www-form-urlencoded" in mime:
+        fields = parse_qsl(text, keep_blank_values=True)
+        post["text"] = urlencode([(k, v) for k, v in fields if not _is_secret(k)])
+    elif "json" in mime:
+        try:
+            body = json.loads(text)
+        except ValueError:
+            return
+        if isinstance(body, dict):
+            post["text"] = json.dumps({k: v for k, v in body.items() if not _is_secret(k)})
+
+
+def fixture_name(*parts: str) -> str:
+    """Build a file-safe fixture name, e.g. ("linkedin", "VP Sales") -> "linkedin-vp-sales"."""
+    return "-".join(re.sub(r"[^a-z0-9]+", "-", str(part).lower()).strip("-") for part in parts if part)
+
+
+class FixtureStore:
+    """
+    Versioned on-disk store of recorded HTTP exchanges and HAR files.
+
+    Attributes:
+        directory (str): Root of this fixture version.
+    """
+
+    def __init__(self, root: str = Config.FIXTURE_DIR, version: str = Config.FIXTURE_VERSION):
+        self.directory = os.path.join(root, version)
+
+    def _request_url(self, method: str, url: str, kwargs: Dict[str, Any]) -> str:
+        prepared = requests.Request(method, url, params=kwargs.get("params")).prepare()
+        return redact_url(prepared.url)
+
+    def key(self, method: str, url: str, kwargs: Dict[str, Any]) -> str:
+        """Return the fixture key of a request: a hash of method, redacted URL and body."""
+        body = kwargs.get("json")
+        body = json.dumps(body, sort_keys=True, default=str) if body is not None else kwargs.get("data") or ""
+        if isinstance(body, dict):
+            body = urlencode(sorted((k, v) for k, v in body.items() if k.lower() not in SECRET_PARAMS))
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        digest = hashlib.sha1(method.upper().encode() + b" " + self._request_url(method, url, kwargs).encode() + b"\n" + body)
+        return digest.hexdigest()
+
+    def _path(self, method: str, url: str, kwargs: Dict[str, Any]) -> str:
+        host = urlsplit(url).hostname or "unknown"
+        return os.path.join(self.directory, "http", host, self.key(method, url, kwargs) + ".json")
+
+    def save(self, method: str, url: str, kwargs: Dict[str, Any], response: requests.Response) -> None:
+        path = self._path(method, url, kwargs)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        document = {
+            "method": method.upper(),
+            "url": self._request_url(method, url, kwargs),
+            "status": response.status_code,
+            "headers": dict(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(document, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def load(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        """
+        Rebuild the recorded response for a request.
+
+        Raises:
+            FixtureMissing: If the request was never recorded.
+        """
+        path = self._path(method, url, kwargs)
+        try:
+            with open(path) as f:
+                document = json.load(f)
+        except FileNotFoundError:
+            raise FixtureMissing(f"No recorded response for {method.upper()} {self._request_url(method, url, kwargs)} "
+                                 f"in {self.directory}.") from None
+        response = requests.Response()
+        response.status_code = document["status"]
+        response.headers = CaseInsensitiveDict(document["headers"])
+        response._content = base64.b64decode(document["body"])
+        response.url = document["url"]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        return response
+
+    def har_path(self, name: str) -> str:
+        """Return the HAR file for a browser flow, creating its directory."""
+        path = os.path.join(self.directory, "har", f"{name}.har")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def scrub_har(self, name: str) -> None:
+        """Strip cookies, credential headers and credential parameters from a HAR file, in place."""
+        path = os.path.join(self.directory, "har", f"{name}.har")
+        try:
+            with open(path) as f:
+                har = json.load(f)
+        except FileNotFoundError:
+            return
+        for entry in har.get("log", {}).get("entries", []):
+            for message in (entry.get("request", {}), entry.get("response", {})):
+                message["cookies"] = []
+                message["headers"] = [header for header in message.get("headers", [])
+                                      if header.get("name", "").lower() not in SECRET_HEADERS]
+            _scrub_har_request(entry.get("request", {}))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(har, f)
+        os.replace(tmp_path, path)
+
+
+_store: Optional[FixtureStore] = None
+
+
+def get_fixture_store() -> FixtureStore:
+    global _store
+    if _store is None:
+        _store = FixtureStore()
+    return _store
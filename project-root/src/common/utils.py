@@ -3,10 +3,14 @@ import time
 import json
 import csv
 from src.config.config import Config
+from src.common.lead_batch import LeadBatch
+from src.common.transport import replaying
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
 def random_delay():
+    if replaying():
+        return
     time.sleep(random.uniform(Config.REQUEST_DELAY_MIN, Config.REQUEST_DELAY_MAX))
 
 def random_user_agent():
@@ -28,6 +32,12 @@ def deduplicate_records(records, unique_key):
 def export_to_csv(data, filename):
     if not data:
         return
+    if isinstance(data, LeadBatch):
+        with open(filename, 'w', newline='') as output_file:
+            writer = csv.writer(output_file)
+            writer.writerow(data.fields)
+            writer.writerows(data.rows())
+        return
     keys = data[0].keys()
     with open(filename, 'w', newline='') as output_file:
         dict_writer = csv.DictWriter(output_file, fieldnames=keys)
@@ -62,5 +72,6 @@ def export_to_google_sheets(data, spreadsheet_name, worksheet_name):
     # Prepare data for insertion
     keys = data[0].keys()
     worksheet.append_row(list(keys))  # Add header
-    for row in data:
-        worksheet.append_row([row[key] for key in keys])
\ No newline at end of file
+    rows = data.rows() if isinstance(data, LeadBatch) else ([row[key] for key in keys] for row in data)
+    for row in rows:
+        worksheet.append_row(list(row))
\ No newline at end of file
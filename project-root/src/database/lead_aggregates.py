@@ -0,0 +1,198 @@
+"""
+Incrementally maintained lead aggregates for dashboards.
+
+`lead_aggregates` holds, per first-seen day, platform and persona tag, the number of
+leads, of leads with an email, and of those whose email is valid. Every writer that
+changes one of those inputs applies the difference it made, in the same transaction:
+- `save_leads` for new and changed leads,
+- `PendingEmailValidator` for validation results.
+Dashboard questions such as "leads per persona per platform per day" or "valid-email
+rate per persona" then read a few hundred small rows instead of scanning `leads`.
+
+A lead tagged with several personas counts once under each of them. Untagged leads
+are counted under the persona "".
+
+To populate the table for existing data, or to repair it, run once:
+
+    python -m src.database.lead_aggregates --rebuild
+"""
+
+import sys
+import logging
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.db_manager import engine, get_db_session
+from src.database.models import Lead, LeadAggregate
+
+logger = logging.getLogger(__name__)
+
+VALID = "valid"
+COUNTERS = ("leads", "emails", "valid_emails")
+
+# Lead columns the aggregates depend on
+SOURCE_COLUMNS = ("platform", "persona_tags", "email", "email_status", "first_seen")
+
+GroupKey = Tuple[date, str, str]
+
+
+def _personas(persona_tags: Optional[str]) -> List[str]:
+    return [tag.strip() for tag in (persona_tags or "").split(",") if tag.strip()] or [""]
+
+
+class AggregateDelta:
+    """
+    Accumulates the change a batch of writes makes to `lead_aggregates`.
+
+    Call `add(row)` for each lead as it is after the write and `add(row, -1)` for each
+    overwritten state, then `apply(session)` inside the writer's transaction.
+    """
+
+    def __init__(self):
+        self.counts: Dict[GroupKey, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def add(self, row: Dict[str, Any], sign: int = 1) -> None:
+        first_seen = row.get("first_seen")
+        day = first_seen.date() if isinstance(first_seen, datetime) else first_seen
+        has_email = 1 if row.get("email") else 0
+        valid = 1 if has_email and row.get("email_status") == VALID else 0
+        for persona in _personas(row.get("persona_tags")):
+            counts = self.counts[(day, row.get("platform") or "", persona)]
+            counts[0] += sign
+            counts[1] += sign * has_email
+            counts[2] += sign * valid
+
+    def __bool__(self) -> bool:
+        return any(any(counts) for counts in self.counts.values())
+
+    def apply(self, session) -> None:
+        """Add the accumulated counts to `lead_aggregates`, in key order to avoid deadlocks."""
+        values = [
+            {"day": day, "platform": platform, "persona": persona, **dict(zip(COUNTERS, counts))}
+            for (day, platform, persona), counts in sorted(self.counts.items())
+            if any(counts)
+        ]
+        if not values:
+            return
+        dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(LeadAggregate.__table__).values(values)
+        table = LeadAggregate.__table__
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.day, table.c.platform, table.c.persona],
+            set_={counter: table.c[counter] + statement.excluded[counter] for counter in COUNTERS},
+        )
+        session.execute(statement)
+
+
+def current_rows(session, keys: List[str], columns: Sequence[str] = SOURCE_COLUMNS) -> Dict[str, Dict[str, Any]]:
+    """
+    Load (and lock, where supported) existing leads by `lead_key`. Loads the aggregate
+    inputs by default; writers that need more of the stored row pass their `columns`.
+    """
+    rows: Dict[str, Dict[str, Any]] = {}
+    selected = [getattr(Lead, column) for column in columns]
+    for start in range(0, len(keys), 1000):
+        chunk = keys[start:start + 1000]
+        query = session.query(Lead.lead_key, *selected).filter(Lead.lead_key.in_(chunk)).with_for_update()
+        for key, *values in query:
+            rows[key] = dict(zip(columns, values))
+    return rows
+
+
+def rebuild() -> int:
+    """Recompute `lead_aggregates` from `leads` with one scan. Returns the group count."""
+    session = get_db_session()
+    try:
+        delta = AggregateDelta()
+        query = session.query(*(getattr(Lead, column) for column in SOURCE_COLUMNS))
+        for values in query.yield_per(10000):
+            delta.add(dict(zip(SOURCE_COLUMNS, values)))
+        session.query(LeadAggregate).delete()
+        delta.apply(session)
+        session.commit()
+        return len(delta.counts)
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+# -- queries ----------------------------------------------------------------------------
+
+def leads_per_day(since: Optional[date] = None, until: Optional[date] = None,
+                  platform: Optional[str] = None, persona: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    New leads per day, platform and persona.
+
+    Args:
+        since (date, optional): First day included.
+        until (date, optional): Last day included.
+        platform (str, optional): Only this platform.
+        persona (str, optional): Only this persona tag.
+
+    Returns:
+        Rows of {"day", "platform", "persona", "leads", "emails", "valid_emails"}, by day.
+    """
+    session = get_db_session()
+    try:
+        query = session.query(LeadAggregate)
+        if since is not None:
+            query = query.filter(LeadAggregate.day >= since)
+        if until is not None:
+            query = query.filter(LeadAggregate.day <= until)
+        if platform is not None:
+            query = query.filter(LeadAggregate.platform == platform)
+        if persona is not None:
+            query = query.filter(LeadAggregate.persona == persona)
+        order = (LeadAggregate.day, LeadAggregate.platform, LeadAggregate.persona)
+        return [
+            {"day": row.day, "platform": row.platform, "persona": row.persona,
+             **{counter: getattr(row, counter) for counter in COUNTERS}}
+            for row in query.order_by(*order)
+        ]
+    finally:
+        session.close()
+
+
+def email_rates(since: Optional[date] = None, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Email coverage and valid-email rate per persona.
+
+    Returns:
+        Rows of {"persona", "leads", "emails", "valid_emails", "email_rate", "valid_rate"},
+        where `valid_rate` is valid emails over leads with an email.
+    """
+    session = get_db_session()
+    try:
+        query = session.query(LeadAggregate.persona,
+                              *(func.sum(getattr(LeadAggregate, counter)) for counter in COUNTERS))
+        if since is not None:
+            query = query.filter(LeadAggregate.day >= since)
+        if platform is not None:
+            query = query.filter(LeadAggregate.platform == platform)
+        rows = []
+        for persona, leads, emails, valid in query.group_by(LeadAggregate.persona).order_by(LeadAggregate.persona):
+            leads, emails, valid = int(leads or 0), int(emails or 0), int(valid or 0)
+            rows.append({
+                "persona": persona, "leads": leads, "emails": emails, "valid_emails": valid,
+                "email_rate": emails / leads if leads else 0.0,
+                "valid_rate": valid / emails if emails else 0.0,
+            })
+        return rows
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    from src.common.logging_setup import setup_logging
+    setup_logging()
+    if "--rebuild" in sys.argv[1:]:
+        logger.info("Rebuilt lead aggregates: %d groups.", rebuild())
+    else:
+        for row in email_rates():
+            print(row)
@@ -0,0 +1,336 @@
+"""
+Crash-safe, append-only lead spool that decouples scraping from the database.
+
+Scrapers append each `LeadBatch` to a local spool segment instead of committing to
+Postgres, so a slow or restarting database never blocks scraping or drops a page of
+leads. A separate `SpoolLoader` reads the segments through `mmap` and bulk-loads them
+with `save_enriched_leads` (email enrichment, then `save_leads`), checkpointing the
+offset it has committed up to.
+
+Segment format: a sequence of records, each one
+
+    [4-byte little-endian payload length][4-byte CRC32 of payload][payload]
+
+where the payload is a UTF-8 JSON document `{"fields": [...], "rows": [[...], ...]}`.
+A record cut short by a crash (short header, short payload or bad CRC) marks the end of
+the readable data; everything before it is loaded.
+
+Each writer process appends to its own `<host>-<pid>-<time>-<seq>.spool.open` segment and
+renames it to `.spool` when it is sealed (rotated or closed). Writes are fsynced in
+groups, after `SPOOL_FSYNC_BYTES` bytes or `SPOOL_FSYNC_INTERVAL` seconds, whichever
+comes first, and always on `flush()`/`close()`.
+
+Loading is at-least-once: a crash between a DB commit and the checkpoint write replays
+a few records, which the lead_key upsert in `save_leads` makes harmless.
+"""
+
+import os
+import json
+import mmap
+import glob
+import time
+import zlib
+import atexit
+import socket
+import struct
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config.config import Config
+from src.common.lead_batch import LeadBatch
+from src.common.job_stats import record_leads
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct("<II")
+OPEN_SUFFIX = ".spool.open"
+SEALED_SUFFIX = ".spool"
+CHECKPOINT_FILE = "checkpoint.json"
+
+
+def encode_record(batch: LeadBatch) -> bytes:
+    payload = json.dumps({"fields": batch.fields, "rows": list(batch.rows())},
+                         separators=(",", ":"), default=str).encode("utf-8")
+    return HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def iter_records(buffer, offset: int = 0) -> Iterator[Tuple[int, LeadBatch]]:
+    """
+    Yield `(end_offset, batch)` for every complete record in `buffer` from `offset` on.
+
+    Stops silently at the first incomplete or corrupt record (a torn tail after a crash).
+    """
+    size = len(buffer)
+    while offset + HEADER.size <= size:
+        length, crc = HEADER.unpack_from(buffer, offset)
+        start, end = offset + HEADER.size, offset + HEADER.size + length
+        if end > size:
+            return
+        payload = buffer[start:end]
+        if zlib.crc32(payload) != crc:
+            logger.warning("Corrupt spool record at offset %d; stopping there.", offset)
+            return
+        document = json.loads(payload)
+        yield end, LeadBatch.from_rows(document["fields"], document["rows"])
+        offset = end
+
+
+class LeadSpool:
+    """
+    Appends lead batches to this process's spool segment.
+
+    Attributes:
+        directory (str): Spool directory, shared with the loader.
+        fsync_bytes (int): Unsynced bytes that trigger an fsync.
+        fsync_interval (float): Seconds after which pending writes are fsynced.
+        segment_bytes (int): Segment size at which the segment is sealed and a new one started.
+    """
+
+    def __init__(self,
+                 directory: str = Config.SPOOL_DIR,
+                 fsync_bytes: int = Config.SPOOL_FSYNC_BYTES,
+                 fsync_interval: float = Config.SPOOL_FSYNC_INTERVAL,
+                 segment_bytes: int = Config.SPOOL_SEGMENT_BYTES):
+        self.directory = directory
+        self.fsync_bytes = fsync_bytes
+        self.fsync_interval = fsync_interval
+        self.segment_bytes = segment_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[str] = None
+        self._seq = 0
+        self._written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _open_segment(self) -> None:
+        self._seq += 1
+        name = f"{socket.gethostname()}-{os.getpid()}-{int(time.time())}-{self._seq:06d}"
+        self._path = os.path.join(self.directory, name + OPEN_SUFFIX)
+        self._file = open(self._path, "ab")
+        self._written = 0
+
+    def _seal_segment(self) -> None:
+        if self._file is None:
+            return
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._path, self._path[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX)
+        self._file = None
+        self._unsynced = 0
+
+    def append(self, batch: LeadBatch) -> None:
+        """Append one batch as a single record. An empty batch is ignored."""
+        if not len(batch):
+            return
+        record = encode_record(batch)
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(record)
+            self._file.flush()  # Survives a process crash; fsync below covers power loss.
+            self._written += len(record)
+            self._unsynced += len(record)
+            if (self._unsynced >= self.fsync_bytes
+                    or time.monotonic() - self._last_sync >= self.fsync_interval):
+                self._sync()
+            if self._written >= self.segment_bytes:
+                self._seal_segment()
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self) -> None:
+        """Fsync everything appended so far."""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Fsync and seal the current segment."""
+        with self._lock:
+            self._seal_segment()
+
+
+_spool: Optional[LeadSpool] = None
+_spool_lock = threading.Lock()
+
+
+def get_lead_spool() -> LeadSpool:
+    """Return this process's spool, sealing its segment at interpreter exit."""
+    global _spool
+    with _spool_lock:
+        if _spool is None:
+            _spool = LeadSpool()
+            atexit.register(_spool.close)
+        return _spool
+
+
+def spool_leads(batch: LeadBatch) -> int:
+    """
+    Append a batch of leads to the local spool for the loader to write to the DB.
+
+    Returns:
+        The number of leads spooled.
+    """
+    get_lead_spool().append(batch)
+    record_leads(batch)
+    return len(batch)
+
+
+def _segment_id(path: str) -> str:
+    name = os.path.basename(path)
+    return name[:-len(OPEN_SUFFIX)] if name.endswith(OPEN_SUFFIX) else name[:-len(SEALED_SUFFIX)]
+
+
+def _writer_alive(segment_id: str) -> bool:
+    parts = segment_id.split("-")
+    host, pid = "-".join(parts[:-3]), parts[-3]
+    if host != socket.gethostname():
+        return True  # Can't tell; leave it to its own host.
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, ValueError):
+        return True
+    return True
+
+
+class SpoolLoader:
+    """
+    Bulk-loads spooled leads into the database, resuming from checkpointed offsets.
+    Run a single loader per spool directory.
+
+    Attributes:
+        directory (str): Spool directory.
+        write (callable): Writes one `LeadBatch` to the database. Defaults to
+            `save_enriched_leads` (email enrichment, then `save_leads`).
+        start_run (callable): Called at the start of every `run_once`, e.g. to renew
+            per-run quotas. Defaults to `start_enrichment_run` with the default `write`.
+        max_batch_rows (int): Records are merged into DB batches of up to this many rows.
+    """
+
+    def __init__(self,
+                 directory: str = Config.SPOOL_DIR,
+                 write: Optional[Callable[[LeadBatch], Any]] = None,
+                 max_batch_rows: int = 1000,
+                 start_run: Optional[Callable[[], Any]] = None):
+        if write is None:
+            # Imported here so scrapers can spool without a database driver installed.
+            from src.workflows.email_enrichment import save_enriched_leads, start_enrichment_run
+            write = save_enriched_leads
+            start_run = start_run or start_enrichment_run
+        self.directory = directory
+        self.write = write
+        self.start_run = start_run
+        self.max_batch_rows = max_batch_rows
+        self.checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+    def _load_checkpoint(self) -> Dict[str, int]:
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_checkpoint(self, offsets: Dict[str, int]) -> None:
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(offsets, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _segments(self) -> List[str]:
+        paths = glob.glob(os.path.join(self.directory, "*" + SEALED_SUFFIX))
+        paths += glob.glob(os.path.join(self.directory, "*" + OPEN_SUFFIX))
+        return sorted(paths, key=lambda p: (os.path.getmtime(p), p))
+
+    def run_once(self) -> int:
+        """
+        Load every complete record not yet checkpointed.
+
+        Returns:
+            The number of leads loaded.
+
+        Raises:
+            Exception: Whatever the DB write raised. Offsets loaded before the failure
+                stay checkpointed, so the next run resumes from there.
+        """
+        if self.start_run is not None:
+            self.start_run()
+        offsets = self._load_checkpoint()
+        loaded = 0
+        for path in self._segments():
+            segment_id = _segment_id(path)
+            sealed = path.endswith(SEALED_SUFFIX)
+            if not sealed and not _writer_alive(segment_id):
+                # The writer crashed without sealing; its complete records are still good.
+                sealed_path = path[:-len(OPEN_SUFFIX)] + SEALED_SUFFIX
+                os.replace(path, sealed_path)
+                path, sealed = sealed_path, True
+            offset = offsets.get(segment_id, 0)
+            loaded += self._load_segment(path, segment_id, offset, offsets)
+            if sealed and offsets.get(segment_id, 0) >= os.path.getsize(path):
+                os.remove(path)
+                offsets.pop(segment_id, None)
+                self._save_checkpoint(offsets)
+        return loaded
+
+    def _load_segment(self, path: str, segment_id: str, offset: int, offsets: Dict[str, int]) -> int:
+        size = os.path.getsize(path)
+        if size <= offset:
+            return 0
+        loaded = 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as buffer:
+            pending: Optional[LeadBatch] = None
+            pending_end = offset
+            for end, batch in iter_records(buffer, offset):
+                if pending is None:
+                    pending = batch
+                else:
+                    pending.extend(batch)
+                pending_end = end
+                if len(pending) >= self.max_batch_rows:
+                    loaded += self._commit(pending, segment_id, pending_end, offsets)
+                    pending = None
+            if pending is not None:
+                loaded += self._commit(pending, segment_id, pending_end, offsets)
+            # Skip a torn tail in a sealed segment so it can be removed.
+            if path.endswith(SEALED_SUFFIX) and offsets.get(segment_id, 0) < size:
+                logger.warning("Discarding %d unreadable bytes at end of %s.", size - offsets.get(segment_id, 0), path)
+                offsets[segment_id] = size
+                self._save_checkpoint(offsets)
+        return loaded
+
+    def _commit(self, batch: LeadBatch, segment_id: str, end: int, offsets: Dict[str, int]) -> int:
+        self.write(batch)
+        offsets[segment_id] = end
+        self._save_checkpoint(offsets)
+        return len(batch)
+
+    def run_forever(self, poll_interval: float = 5.0, max_backoff: float = 60.0) -> None:
+        """Keep loading new records, backing off while the database is unavailable."""
+        backoff = poll_interval
+        while True:
+            try:
+                loaded = self.run_once()
+                if loaded:
+                    logger.info("Loaded %d spooled leads into the database.", loaded)
+                backoff = poll_interval
+            except Exception as e:
+                logger.warning("Spool load failed, retrying in %.0fs: %s", backoff, e)
+                backoff = min(backoff * 2, max_backoff)
+            time.sleep(backoff)
+
+
+if __name__ == "__main__":
+    from src.common.logging_setup import setup_logging
+    setup_logging()
+    SpoolLoader().run_forever()
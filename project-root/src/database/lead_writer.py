@@ -0,0 +1,272 @@
+"""
+Change-detecting lead writer.
+
+Every lead gets a stable `lead_key` (its identity) and a `content_hash` over its content
+fields. Incoming hashes are checked against a cached key -> hash index, and only new or
+changed leads are written (as an upsert). Unchanged leads only have `last_seen` bumped in
+one batched UPDATE. A steady-state re-run of a persona or query then writes almost nothing.
+
+A missing (None) value never overwrites a stored one: a re-scrape without the email,
+website or rating keeps what enrichment or an earlier scrape stored. The stored hash is
+taken over the merged row, so such a re-scrape counts as unchanged. `email_status` is
+owned by the validation stage and is not part of the hash.
+
+A company stored before its scraper sent a `source_url` keeps its name-and-location key
+(see `adopt_company_keys`), so adding profile links to a scraper does not duplicate it.
+"""
+
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.config.config import Config
+from src.common.lead_batch import LeadBatch
+from src.common.email_validator import EMAIL_PENDING
+from src.database.db_manager import engine, get_db_session
+from src.database.models import Lead, WebhookOutbox
+from src.database.lead_aggregates import AggregateDelta, current_rows
+
+logger = logging.getLogger(__name__)
+
+LEAD_COLUMNS = frozenset(column.key for column in Lead.__table__.columns)
+BOOKKEEPING_COLUMNS = frozenset({"id", "lead_key", "content_hash", "first_seen", "last_seen"})
+CONTENT_COLUMNS = tuple(sorted(LEAD_COLUMNS - BOOKKEEPING_COLUMNS))
+HASH_COLUMNS = tuple(column for column in CONTENT_COLUMNS if column != "email_status")
+
+# Fields that identify a lead, most specific first.
+IDENTITY_FIELDS = ("linkedin_url", "email", "source_url")
+
+
+def _normalize(value: Any) -> str:
+    return " ".join(str(value).lower().split()) if value is not None else ""
+
+
+def lead_key(lead: Dict[str, Any]) -> str:
+    """
+    Return the stable identity of a lead.
+
+    People are identified by profile URL or email; companies without either fall back
+    to name and location. The platform is part of the key, so the same company found on
+    Yelp and on Clutch is tracked separately.
+    """
+    platform = _normalize(lead.get("platform"))
+    for field in IDENTITY_FIELDS:
+        if lead.get(field):
+            return f"{platform}:{field}:{_normalize(lead[field]).rstrip('/')}"
+    return f"{platform}:company:{_normalize(lead.get('company_name'))}|{_normalize(lead.get('location'))}"
+
+
+def content_hash(lead: Dict[str, Any]) -> str:
+    """Return a 128-bit hex digest of the lead's content columns (`email_status` excluded)."""
+    payload = json.dumps([lead.get(column) for column in HASH_COLUMNS], default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LeadHashIndex:
+    """
+    A bounded, thread-safe LRU cache of lead_key -> content_hash.
+
+    Keys missing from the cache are looked up in the database in one query per batch,
+    so the cache never has to hold the whole table.
+    """
+
+    def __init__(self, capacity: int = Config.LEAD_HASH_CACHE_SIZE):
+        self.capacity = capacity
+        self._hashes: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, session, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the known hash for each key that exists, loading cache misses from the DB."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, str] = {}
+        with self._lock:
+            for key in keys:
+                if key in self._hashes:
+                    self._hashes.move_to_end(key)
+                    found[key] = self._hashes[key]
+        missing = [key for key in keys if key not in found]
+        for start in range(0, len(missing), 1000):
+            chunk = missing[start:start + 1000]
+            rows = session.query(Lead.lead_key, Lead.content_hash).filter(Lead.lead_key.in_(chunk)).all()
+            found.update({key: value for key, value in rows})
+        self.put_many({key: found[key] for key in missing if key in found})
+        return found
+
+    def put_many(self, hashes: Dict[str, str]) -> None:
+        with self._lock:
+            for key, value in hashes.items():
+                self._hashes[key] = value
+                self._hashes.move_to_end(key)
+            while len(self._hashes) > self.capacity:
+                self._hashes.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hashes.clear()
+
+
+_index = LeadHashIndex()
+
+
+def _insert():
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(Lead.__table__)
+
+
+def adopt_company_keys(session, rows: Dict[str, Dict[str, Any]], known: Dict[str, str],
+                       index: LeadHashIndex) -> None:
+    """
+    Re-key new source_url-keyed rows in place to the company key they had before the
+    lead had a `source_url`, when a lead is stored under that key, and add its hash to
+    `known`.
+    """
+    legacy = {}
+    for key, row in rows.items():
+        if key not in known and key.startswith(f"{_normalize(row.get('platform'))}:source_url:"):
+            legacy[key] = lead_key(dict(row, source_url=None))
+    stored = index.get_many(session, legacy.values()) if legacy else {}
+    for key, old_key in legacy.items():
+        if old_key in stored and old_key not in rows:
+            row = rows.pop(key)
+            row["lead_key"] = old_key
+            rows[old_key] = row
+            known[old_key] = stored[old_key]
+
+
+def merge_stored(row: Dict[str, Any], old: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return `row` as it is stored over the existing `old` row: missing values keep the
+    stored ones, and a "pending" or missing `email_status` keeps the status of the same
+    email. Mirrors the upsert's SET clause.
+    """
+    merged = dict(row)
+    for column in CONTENT_COLUMNS:
+        if merged.get(column) is None:
+            merged[column] = old.get(column)
+    if row.get("email_status") in (None, EMAIL_PENDING) and merged["email"] == old.get("email"):
+        merged["email_status"] = old.get("email_status")
+    merged["content_hash"] = content_hash(merged)
+    merged["first_seen"] = old.get("first_seen")
+    return merged
+
+
+def queue_webhooks(session, rows: List[Dict[str, Any]], now: datetime) -> None:
+    """Queue leads, as stored, in `webhook_outbox` for every configured webhook."""
+    if not Config.WEBHOOK_URLS or not rows:
+        return
+    session.execute(WebhookOutbox.__table__.insert(), [
+        {"webhook": url, "lead_key": row["lead_key"], "payload": json.dumps(row, default=str),
+         "created_at": now, "next_attempt_at": now, "attempts": 0}
+        for url in Config.WEBHOOK_URLS for row in rows
+    ])
+
+
+def save_leads(leads: Iterable[Any], index: Optional[LeadHashIndex] = None) -> Tuple[int, int]:
+    """
+    Write a batch of lead dictionaries, skipping leads whose content has not changed.
+
+    Keys that are not `Lead` columns (e.g. "persona", "cta") are ignored. New and changed
+    leads are upserted on `lead_key`, where missing columns keep their stored values (see
+    `merge_stored`); unchanged ones only get `last_seen` updated. `lead_aggregates` is
+    adjusted for the new and changed leads in the same transaction, and they are queued
+    in `webhook_outbox` for every configured webhook.
+
+    Args:
+        leads: A `LeadBatch` or lead dictionaries.
+        index (LeadHashIndex, optional): Hash cache to use. Defaults to the shared one.
+
+    Returns:
+        A (written, unchanged) tuple of counts.
+    """
+    leads = leads if isinstance(leads, LeadBatch) else list(leads)
+    if not leads:
+        return 0, 0
+    index = index or _index
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    # Collapse duplicates within the batch; the last occurrence wins.
+    rows: Dict[str, Dict[str, Any]] = {}
+    for lead in leads:
+        row = {column: lead.get(column) for column in CONTENT_COLUMNS}
+        row["lead_key"] = lead_key(row)
+        row["content_hash"] = content_hash(row)
+        rows[row["lead_key"]] = row
+
+    session = get_db_session()
+    try:
+        known = index.get_many(session, rows)
+        adopt_company_keys(session, rows, known, index)
+        changed = [row for key, row in rows.items() if known.get(key) != row["content_hash"]]
+        unchanged = [key for key, row in rows.items() if known.get(key) == row["content_hash"]]
+
+        written = []
+        if changed:
+            # Rows as they will be stored, and their net effect on the dashboard aggregates
+            # (remove each overwritten state, add the new one)
+            delta = AggregateDelta()
+            previous = current_rows(session, [row["lead_key"] for row in changed],
+                                    CONTENT_COLUMNS + ("first_seen", "content_hash"))
+            for row in changed:
+                old = previous.get(row["lead_key"])
+                if old is None:
+                    new = dict(row, first_seen=now)
+                else:
+                    new = merge_stored(row, old)
+                    if new["content_hash"] == old["content_hash"]:
+                        # Only values missing from this scrape differed
+                        unchanged.append(row["lead_key"])
+                        continue
+                    delta.add(old, -1)
+                delta.add(new)
+                written.append(new)
+
+        if written:
+            statement = _insert().values([dict(row, last_seen=now) for row in written])
+            table = Lead.__table__
+            excluded = statement.excluded
+            statement = statement.on_conflict_do_update(
+                index_elements=[Lead.lead_key],
+                set_={
+                    # Same rules as merge_stored, for rows inserted concurrently since they were read
+                    **{column: func.coalesce(excluded[column], table.c[column]) for column in CONTENT_COLUMNS},
+                    "email_status": case(
+                        (and_(or_(excluded.email_status.is_(None), excluded.email_status == EMAIL_PENDING),
+                              table.c.email == func.coalesce(excluded.email, table.c.email)), table.c.email_status),
+                        else_=excluded.email_status,
+                    ),
+                    "content_hash": excluded.content_hash,
+                    "last_seen": excluded.last_seen,
+                },
+            )
+            session.execute(statement)
+            delta.apply(session)
+            queue_webhooks(session, written, now)
+        if unchanged:
+            session.execute(update(Lead).where(Lead.lead_key.in_(unchanged)).values(last_seen=now))
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    index.put_many({row["lead_key"]: row["content_hash"] for row in written})
+    logger.debug("Lead batch: %d new or changed, %d unchanged.", len(written), len(unchanged))
+    return len(written), len(unchanged)
+
+
+def known_lead_keys(keys: Iterable[str], index: Optional[LeadHashIndex] = None) -> set:
+    """Return the subset of `keys` already stored, using the hash cache before the database."""
+    index = index or _index
+    session = get_db_session()
+    try:
+        return set(index.get_many(session, keys))
+    finally:
+        session.close()
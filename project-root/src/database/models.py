@@ -1,5 +1,5 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, Text
 
 Base = declarative_base()
 
@@ -19,4 +19,52 @@ class Lead(Base):
     industry = Column(String)
     location = Column(String)
     rating = Column(Float)
-    source_url = Column(String) 
\ No newline at end of file
+    source_url = Column(String)
+    persona_tags = Column(String)  # Comma-separated names of matching personas
+
+    # Change detection: stable identity, hash of the content fields, and sighting times
+    lead_key = Column(String, unique=True, index=True)
+    content_hash = Column(String(32))
+    first_seen = Column(DateTime)
+    last_seen = Column(DateTime) 
+
+class JobStat(Base):
+    """One scheduled job run: what it cost and how many new leads it found."""
+    __tablename__ = 'job_stats'
+
+    id = Column(Integer, primary_key=True, index=True)
+    job = Column(String, index=True)  # e.g. "ApolloScraper:AI Solutions"
+    platform = Column(String, index=True)  # Host the job's budget is charged to
+    started_at = Column(DateTime, index=True)
+    duration = Column(Float)  # Wall-clock seconds
+    requests = Column(Integer)  # HTTP requests and page navigations
+    leads = Column(Integer)  # Leads spooled
+    new_leads = Column(Integer)  # Spooled leads not stored before and not seen earlier in the run
+
+
+class LeadAggregate(Base):
+    """Lead counts per first-seen day, platform and persona, kept current by the writers."""
+    __tablename__ = 'lead_aggregates'
+
+    day = Column(Date, primary_key=True)  # UTC date of the lead's first_seen
+    platform = Column(String, primary_key=True)
+    persona = Column(String, primary_key=True)  # One row per persona tag; "" for untagged leads
+    leads = Column(Integer, nullable=False, default=0)
+    emails = Column(Integer, nullable=False, default=0)  # Leads with an email
+    valid_emails = Column(Integer, nullable=False, default=0)  # ... whose email_status is "valid"
+
+
+class WebhookOutbox(Base):
+    """A lead waiting to be (or already) delivered to a webhook, written with the lead itself."""
+    __tablename__ = 'webhook_outbox'
+
+    id = Column(Integer, primary_key=True, index=True)
+    webhook = Column(String, nullable=False)  # Destination URL
+    lead_key = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON of the lead as written
+    created_at = Column(DateTime, nullable=False)
+    batch_id = Column(String, index=True)  # Idempotency key, fixed once the lead joins a batch
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, index=True)
+    delivered_at = Column(DateTime, index=True)
+    last_error = Column(String)
@@ -1,6 +1,28 @@
+import argparse
 from src.workflows.orchestrator import run_full_pipeline
 from src.database.db_manager import init_db
+from src.common.profiling import RunProfiler
+from src.common.logging_setup import setup_logging
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the lead generation pipeline.")
+    parser.add_argument("--profile", nargs="?", const="profiles", metavar="DIR",
+                        help="Profile each scraper run (cProfile, tracemalloc) into a per-run directory under DIR.")
+    parser.add_argument("--profile-top", type=int, default=25, metavar="N",
+                        help="Number of hot spots to list per section of the profiling report.")
+    parser.add_argument("--trace-slowest", type=int, default=0, metavar="N",
+                        help="Keep Playwright traces for the N slowest sync page loads (requires --profile; "
+                             "async runs are timed but not traced).")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
+    args = parse_args()
+    setup_logging()
     init_db()
-    run_full_pipeline() 
\ No newline at end of file
+    if args.profile:
+        with RunProfiler(args.profile, top_n=args.profile_top, trace_slowest=args.trace_slowest):
+            run_full_pipeline()
+    else:
+        run_full_pipeline()
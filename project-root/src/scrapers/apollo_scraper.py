@@ -1,42 +1,106 @@
-import requests
+import time
 import logging
 from src.config.config import Config
-from src.common.email_validator import validate_email
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
+from src.common.email_validator import EMAIL_PENDING
+from src.common.http_client import HttpClient
+from src.common.rate_limiter import RateLimiter
+from src.common.resilience import CircuitOpenError
+from src.database.lead_spool import spool_leads
+from src.scrapers.linkedin.persona_classifier import tag_leads
+from src.workflows.pipeline import Pipeline
+from src.common.lead_batch import LeadBatch
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SEARCH_URL = "https://api.apollo.io/api/v1/mixed_people/search"
+PER_PAGE = 100  # Largest page Apollo serves
+MAX_PAGES = 500  # Apollo stops paginating people search after 500 pages
+
+
+def parse_people_page(data):
+    # Runs in a parse worker process, so it must stay a module-level function
+    leads = LeadBatch()
+    for person in data.get("people", []):
+        company = person.get("organization") or person.get("company") or {}
+        email = person.get("email") or None
+        leads.append(
+            platform="apollo",
+            first_name=person.get("first_name"),
+            last_name=person.get("last_name"),
+            job_title=person.get("title"),
+            company_name=company.get("name"),
+            linkedin_url=person.get("linkedin_url"),
+            email=email,
+            # Validated later by src.workflows.email_validation, off the ingest path
+            email_status=EMAIL_PENDING if email else None,
+            company_website=company.get("website_url"),
+            industry=company.get("industry"),
+            location=company.get("location")
+        )
+    return leads
+
+
 class ApolloScraper:
-    def __init__(self, query):
+    HOST = "api.apollo.io"
+
+    def __init__(self, query, max_pages=MAX_PAGES, concurrency=Config.APOLLO_CONCURRENCY):
         self.query = query
+        self.max_pages = max_pages
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(Config.APOLLO_REQUESTS_PER_MINUTE / 60)
+        self._exhausted = False
+
+    def _honor_rate_limits(self, headers):
+        """Adjust pacing from Apollo's x-*-requests-left / x-rate-limit-* response headers."""
+        limit = headers.get("x-rate-limit-minute")
+        if limit and limit.isdigit() and int(limit) > 0:
+            self.limiter.rate = int(limit) / 60
+        minute_left = headers.get("x-minute-requests-left")
+        if minute_left is not None and minute_left.isdigit() and int(minute_left) <= 0:
+            logger.info("Apollo per-minute quota used up, pausing until the window resets.")
+            self.limiter.pause_until(time.monotonic() + 60)
+        for window in ("hourly", "24-hour"):
+            left = headers.get(f"x-{window}-requests-left")
+            if left is not None and left.isdigit() and int(left) <= 0:
+                logger.warning("Apollo %s quota used up, not fetching further pages.", window)
+                self._exhausted = True
+
+    def fetch_page(self, http, page):
+        if self._exhausted:
+            return {}
+        self.limiter.acquire()
+        r = http.post(
+            SEARCH_URL,
+            json={"q_keywords": self.query, "page": page, "per_page": PER_PAGE},
+            headers={"X-Api-Key": Config.APOLLO_API_KEY, "Cache-Control": "no-cache"}
+        )
+        self._honor_rate_limits(r.headers)
+        return r.json()
+
+    def write(self, leads):
+        spool_leads(tag_leads(leads))
 
     def run(self):
         try:
-            url = f"https://api.apollo.io/v1/mixed_people/search?query={self.query}"
-            r = requests.get(url) # Authentication, cookies, headers needed
-            data = r.json()
-
-            session = get_db_session()
-            for person in data.get("people", []):
-                email_info = validate_email(person["email"]) if person.get("email") else {"email":"", "status":"unknown"}
-                lead = Lead(
-                    platform="apollo",
-                    first_name=person["first_name"],
-                    last_name=person["last_name"],
-                    job_title=person["title"],
-                    company_name=person["company"]["name"],
-                    linkedin_url=person.get("linkedin_url"),
-                    email=email_info["email"],
-                    email_status=email_info["status"],
-                    company_website=person["company"].get("website_url"),
-                    industry=person["company"].get("industry"),
-                    location=person["company"].get("location")
+            with HttpClient() as http:
+                # The first page tells us how many there are
+                first = self.fetch_page(http, 1)
+                self.write(parse_people_page(first))
+                total_pages = (first.get("pagination") or {}).get("total_pages") or 1
+                pages = range(2, min(total_pages, self.max_pages) + 1)
+
+                pipeline = Pipeline(
+                    fetch=lambda page: self.fetch_page(http, page),
+                    parse=parse_people_page,
+                    write=self.write,
+                    fetch_concurrency=self.concurrency,
+                    write_batch_size=PER_PAGE  # Hand each page to the writer as soon as it is parsed
                 )
-                session.add(lead)
-            session.commit()
-            session.close()
+                stats = pipeline.run(pages)
+            logger.info("Apollo '%s': %s people from %s of %s pages.",
+                        self.query, stats.written + len(first.get('people', [])), stats.fetched + 1, total_pages)
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.error(f"Error in ApolloScraper: {e}") 
\ No newline at end of file
+            logger.error("Error in ApolloScraper: %s", e)
@@ -1,39 +1,179 @@
-import requests
+from urllib.parse import urljoin
+
 from bs4 import BeautifulSoup
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
+from src.config.config import Config
+from src.common.http_client import HttpClient
+from src.common.resilience import CircuitOpenError
+from src.database.lead_spool import spool_leads
+from src.scrapers.linkedin.persona_classifier import tag_leads
+from src.workflows.pipeline import Pipeline
+from src.common.lead_batch import LeadBatch
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://clutch.co"
+
+# Lead field -> (selector, attribute or None for the text) on a company profile page.
+# Each field is read on its own, so a layout change only loses that field.
+PROFILE_FIELDS = {
+    "company_website": (".website-link__item", "href"),
+    "rating": (".sg-rating__number", None),
+    "industry": (".profile-summary__service-focus", None),
+    "location": (".profile-summary__location", None),
+}
+
+
+def _text(node, selector):
+    element = node.select_one(selector)
+    text = element.get_text(" ", strip=True) if element else ""
+    return text or None
+
+
+def _attr(node, selector, attribute):
+    element = node.select_one(selector)
+    return element.get(attribute) if element else None
+
+
+def _rating(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_card(card):
+    """Read one search result card; every field but the name is optional."""
+    name = _text(card, '.company-name')
+    if not name:
+        return None
+    profile = _attr(card, '.company-name a', 'href')
+    return {
+        "platform": "clutch",
+        "company_name": name,
+        "company_website": _attr(card, '.website-link', 'href'),
+        "industry": _text(card, '.industry'),
+        "location": _text(card, '.location'),
+        "source_url": urljoin(BASE_URL, profile) if profile else None,
+    }
+
+
+def parse_search_page(html):
+    # Runs in a parse worker process, so it must stay a module-level function
+    soup = BeautifulSoup(html, 'html.parser')
+    leads = LeadBatch()
+    for idx, card in enumerate(soup.select('.search-result')):
+        try:
+            lead = parse_card(card)
+        except Exception as e:
+            logger.warning("Failed to parse Clutch result card #%d: %s", idx + 1, e)
+            continue
+        if lead is None:
+            logger.warning("Clutch result card #%d has no company name.", idx + 1)
+            continue
+        leads.append(**lead)
+    return leads
+
+
+def parse_profile_page(item):
+    """
+    Merge a company's profile page into its search card lead.
+
+    Runs in a parse worker process. `item` is `(lead, html)`, with `html` None when the
+    profile could not be fetched; the card's own values are then kept as they are.
+    """
+    lead, html = item
+    if html:
+        soup = BeautifulSoup(html, 'html.parser')
+        for field, (selector, attribute) in PROFILE_FIELDS.items():
+            try:
+                value = _attr(soup, selector, attribute) if attribute else _text(soup, selector)
+                if field == "rating":
+                    value = _rating(value)
+            except Exception as e:
+                logger.warning("Failed to parse %s from %s: %s", field, lead.get("source_url"), e)
+                continue
+            if value is not None:
+                lead[field] = value
+    return LeadBatch([lead])
+
+
 class ClutchScraper:
-    def __init__(self, query):
+    """
+    Scrapes Clutch search results, optionally enriched from each company's profile page.
+
+    With `enrich=True` the profile pages of all result cards are fetched concurrently
+    (at most `profile_concurrency` at a time) once the search pages are in. A profile
+    that fails to load or parse leaves only its own lead with the card's values.
+    """
+
+    HOST = "clutch.co"
+
+    def __init__(self, query, pages=1, enrich=Config.CLUTCH_ENRICH,
+                 profile_concurrency=Config.CLUTCH_PROFILE_CONCURRENCY):
         self.query = query
+        self.pages = pages
+        self.enrich = enrich
+        self.profile_concurrency = profile_concurrency
+        self.cards = []
+        self.circuit_error = None
+
+    def page_urls(self):
+        return [f"https://clutch.co/search?query={self.query}&page={page}" for page in range(self.pages)]
+
+    def write(self, leads):
+        spool_leads(tag_leads(leads))
+
+    def collect(self, leads):
+        self.cards.extend(lead.to_dict() for lead in leads)
+
+    def fetch_profile(self, http, lead):
+        """Fetch a profile page, returning `(lead, html)` with html None on failure."""
+        if not lead.get("source_url") or self.circuit_error:
+            return lead, None
+        try:
+            return lead, http.get(lead["source_url"]).text
+        except CircuitOpenError as e:
+            self.circuit_error = e
+        except Exception as e:
+            logger.warning("Could not fetch Clutch profile %s: %s", lead["source_url"], e)
+        return lead, None
 
     def run(self):
         try:
-            url = f"https://clutch.co/search?query={self.query}"
-            r = requests.get(url)
-            soup = BeautifulSoup(r.text, 'html.parser')
-
-            session = get_db_session()
-            for company in soup.select('.search-result'):
-                name = company.select_one('.company-name').text.strip()
-                website = company.select_one('.website-link')['href']
-                industry = company.select_one('.industry').text.strip()
-                location = company.select_one('.location').text.strip()
-
-                lead = Lead(
-                    platform="clutch",
-                    company_name=name,
-                    company_website=website,
-                    industry=industry,
-                    location=location
+            with HttpClient() as http:
+                pipeline = Pipeline(
+                    fetch=lambda url: http.get(url).text,
+                    parse=parse_search_page,
+                    write=self.collect if self.enrich else self.write
                 )
-                session.add(lead)
-            session.commit()
-            session.close()
+                try:
+                    pipeline.run(self.page_urls())
+                    if self.enrich:
+                        self.enrich_profiles(http)
+                finally:
+                    if self.cards:
+                        # The search failed before enrichment; keep the cards it did collect
+                        self.write(LeadBatch(self.cards))
+                        self.cards = []
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.error(f"Error in ClutchScraper: {e}") 
\ No newline at end of file
+            logger.error("Error in ClutchScraper: %s", e)
+
+    def enrich_profiles(self, http):
+        """Fetch the collected cards' profiles concurrently and spool the merged leads."""
+        cards, self.cards = self.cards, []
+        self.circuit_error = None
+        pipeline = Pipeline(
+            fetch=lambda lead: self.fetch_profile(http, lead),
+            parse=parse_profile_page,
+            write=self.write,
+            fetch_concurrency=self.profile_concurrency
+        )
+        stats = pipeline.run(cards)
+        logger.info("Enriched %s Clutch companies in %.2fs.", len(cards), stats.elapsed)
+        if self.circuit_error:
+            # Cards were still spooled with their search values
+            raise self.circuit_error
@@ -1,33 +1,190 @@
-import requests
+import os
 import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from src.config.config import Config
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
+from src.common.http_client import HttpClient
+from src.common.resilience import CircuitOpenError
+from src.database.lead_spool import spool_leads
+from src.common.lead_batch import LeadBatch
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SEARCH_URL = "https://places.googleapis.com/v1/places:searchText"
+# Only the fields we store, which also keeps requests in the cheapest billing tier
+FIELD_MASK = "places.id,places.displayName,places.formattedAddress,places.rating,nextPageToken"
+PAGE_SIZE = 20
+MAX_PAGES = 3  # Text search stops paginating after 60 results
+
+
+def place_url(place_id):
+    return f"https://www.google.com/maps/place/?q=place_id:{place_id}"
+
+
+def split_tile(tile):
+    """Split a (south, west, north, east) box into four quadrants."""
+    south, west, north, east = tile
+    mid_lat, mid_lng = (south + north) / 2, (west + east) / 2
+    return [
+        (south, west, mid_lat, mid_lng),
+        (south, mid_lng, mid_lat, east),
+        (mid_lat, west, north, mid_lng),
+        (mid_lat, mid_lng, north, east),
+    ]
+
+
+def grid(bounds, rows, cols):
+    south, west, north, east = bounds
+    lat_step, lng_step = (north - south) / rows, (east - west) / cols
+    return [
+        (south + r * lat_step, west + c * lng_step, south + (r + 1) * lat_step, west + (c + 1) * lng_step)
+        for r in range(rows)
+        for c in range(cols)
+    ]
+
+
+class SeenPlaces:
+    """Set of place_ids already collected, persisted as an append-only file between runs."""
+
+    def __init__(self, path=Config.GOOGLE_MAPS_SEEN_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._ids = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self._ids.update(line.strip() for line in f if line.strip())
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def unseen(self, place_ids):
+        with self._lock:
+            return [pid for pid in dict.fromkeys(place_ids) if pid not in self._ids]
+
+    def add(self, place_ids):
+        with self._lock:
+            new = [pid for pid in place_ids if pid not in self._ids]
+            self._ids.update(new)
+            with open(self.path, "a") as f:
+                f.write("".join(f"{pid}\n" for pid in new))
+
+
 class GoogleMapsScraper:
-    def __init__(self, query):
+    HOST = "places.googleapis.com"
+
+    def __init__(self, query, bounds=None, grid_size=4, max_depth=3,
+                 concurrency=Config.GOOGLE_MAPS_CONCURRENCY, max_requests=1000, seen=None):
+        """
+        Args:
+            query (str): Text search, e.g. "marketing agency".
+            bounds (tuple, optional): (south, west, north, east) area to cover. Without it a
+                single unrestricted search is made.
+            grid_size (int): The area is first split into grid_size x grid_size tiles.
+            max_depth (int): How many times a saturated tile may be split into quadrants.
+            concurrency (int): Tiles fetched at once.
+            max_requests (int): Upper bound on API requests for the run.
+            seen (SeenPlaces, optional): place_id dedup set, persisted between runs.
+        """
         self.query = query
+        self.bounds = bounds
+        self.grid_size = grid_size
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.max_requests = max_requests
+        self.seen = seen
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def _take_request(self):
+        with self._lock:
+            if self._requests >= self.max_requests:
+                return False
+            self._requests += 1
+            return True
+
+    def search_tile(self, http, tile):
+        """
+        Fetch every page of results for one tile.
+
+        Returns:
+            (places, saturated): saturated is True when the search hit its result cap,
+            meaning the tile may hold more places than it returned.
+        """
+        body = {"textQuery": self.query, "pageSize": PAGE_SIZE}
+        if tile:
+            south, west, north, east = tile
+            body["locationRestriction"] = {"rectangle": {
+                "low": {"latitude": south, "longitude": west},
+                "high": {"latitude": north, "longitude": east},
+            }}
+        headers = {"X-Goog-Api-Key": Config.GOOGLE_MAPS_API_KEY, "X-Goog-FieldMask": FIELD_MASK}
+        places = []
+        for _ in range(MAX_PAGES):
+            if not self._take_request():
+                logger.warning("Google Maps request cap of %s reached.", self.max_requests)
+                return places, False
+            data = http.post(SEARCH_URL, json=body, headers=headers).json()
+            places.extend(data.get("places", []))
+            if not data.get("nextPageToken"):
+                break
+            body["pageToken"] = data["nextPageToken"]
+        return places, len(places) >= PAGE_SIZE * MAX_PAGES
+
+    def write(self, places):
+        new_ids = set(self.seen.unseen(place["id"] for place in places if place.get("id")))
+        leads, spooled = LeadBatch(), []
+        for place in places:
+            if place.get("id") not in new_ids:
+                continue
+            new_ids.discard(place["id"])
+            spooled.append(place["id"])
+            leads.append(
+                platform="google_maps",
+                company_name=(place.get("displayName") or {}).get("text"),
+                location=place.get("formattedAddress"),
+                rating=place.get("rating"),
+                source_url=place_url(place["id"])
+            )
+        written = spool_leads(leads)
+        # Only mark places seen once they are safely spooled
+        self.seen.add(spooled)
+        return written
 
     def run(self):
         try:
-            url = f"https://maps.googleapis.com/maps/api/place/textsearch/json?query={self.query}&key={Config.GOOGLE_MAPS_API_KEY}"
-            r = requests.get(url)
-            data = r.json()
-
-            session = get_db_session()
-            for place in data.get("results", []):
-                lead = Lead(
-                    platform="google_maps",
-                    company_name=place.get("name"),
-                    location=place.get("formatted_address"),
-                    rating=place.get("rating")
-                )
-                session.add(lead)
-            session.commit()
-            session.close()
+            if self.seen is None:
+                self.seen = SeenPlaces()
+            tiles = grid(self.bounds, self.grid_size, self.grid_size) if self.bounds else [None]
+            written, failed, circuit_error = 0, 0, None
+            with HttpClient() as http, ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                pending = {executor.submit(self.search_tile, http, tile): (tile, 0) for tile in tiles}
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        tile, depth = pending.pop(future)
+                        # A failed tile only loses its own places; the rest are already paid for
+                        try:
+                            places, saturated = future.result()
+                        except CircuitOpenError as e:
+                            circuit_error = circuit_error or e
+                            continue
+                        except Exception as e:
+                            failed += 1
+                            logger.warning("Google Maps tile %s failed: %s", tile, e)
+                            continue
+                        written += self.write(places)
+                        if saturated and tile and depth < self.max_depth:
+                            # Dense area: the cap hid results, so search each quadrant too
+                            for quadrant in split_tile(tile):
+                                pending[executor.submit(self.search_tile, http, quadrant)] = (quadrant, depth + 1)
+            logger.info("Google Maps '%s': %s new places from %s requests, %s tiles failed.",
+                        self.query, written, self._requests, failed)
+            if circuit_error:
+                raise circuit_error
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.error(f"Error in GoogleMapsScraper: {e}") 
\ No newline at end of file
+            logger.error("Error in GoogleMapsScraper: %s", e)
@@ -16,8 +16,10 @@ logger.addHandler(logging.NullHandler())
 from .scraper import LinkedInSalesNavigatorScraper
 from .persona_definitions import IndustryPersonas, PersonaConfig
 from .filters import CompanySize, Seniority, SalesNavigatorFilters
-from .authenticator import authenticate
-from .anti_detection import RateLimitManager
+from .authenticator import authenticate, ensure_authenticated
+from .anti_detection import RateLimitManager, get_rate_limit_manager
+from .persona_classifier import PersonaClassifier, get_persona_classifier, tag_leads
+from .query_planner import QueryPlanner, merge_shard_leads
 
 __all__ = [
     "LinkedInSalesNavigatorScraper",
@@ -27,5 +29,12 @@ __all__ = [
     "Seniority",
     "SalesNavigatorFilters",
     "authenticate",
-    "RateLimitManager"
+    "ensure_authenticated",
+    "RateLimitManager",
+    "get_rate_limit_manager",
+    "PersonaClassifier",
+    "get_persona_classifier",
+    "tag_leads",
+    "QueryPlanner",
+    "merge_shard_leads"
 ]
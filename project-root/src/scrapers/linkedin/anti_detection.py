@@ -14,7 +14,12 @@ bot-like patterns.
 import time
 import random
 import logging
+import threading
+from typing import Optional
 from playwright.sync_api import Page
+from src.config.config import Config
+from src.common.browser_waits import wait_for_dom_quiet
+from src.common.transport import replaying
 
 logger = logging.getLogger(__name__)
 
@@ -27,11 +32,14 @@ class RateLimitManager:
         min_delay (float): Minimum number of seconds to wait before actions.
         max_delay (float): Maximum number of seconds to wait before actions.
         error_delay (float): Delay applied after encountering errors to avoid rapid retries.
+        pacing_budget (float): Seconds `pace` may sleep per run, or None for no limit.
+        paced (float): Seconds `pace` has slept so far in the current run.
     """
     def __init__(self, 
                  min_delay: float = 2.0, 
                  max_delay: float = 5.0, 
-                 error_delay: float = 30.0):
+                 error_delay: float = 30.0,
+                 pacing_budget: Optional[float] = None):
         """
         Initialize the rate limit manager with configurable delays.
 
@@ -39,26 +47,68 @@ class RateLimitManager:
             min_delay (float): The shortest delay (in seconds) to wait before actions.
             max_delay (float): The longest delay (in seconds) to wait before actions.
             error_delay (float): Delay (in seconds) to wait after encountering an error.
+            pacing_budget (float, optional): Cap on the time spent pacing per run.
         """
         self.min_delay = min_delay
         self.max_delay = max_delay
         self.error_delay = error_delay
+        self.pacing_budget = pacing_budget
+        self.paced = 0.0
+        self._last_action: Optional[float] = None
+        self._lock = threading.Lock()
 
     def random_delay(self) -> None:
         """
         Wait a random amount of time between `min_delay` and `max_delay` seconds.
         This helps break up predictable timing patterns and may reduce detection.
+        Skipped when replaying recorded fixtures.
         """
+        if replaying():
+            return
         delay = random.uniform(self.min_delay, self.max_delay)
-        logger.debug(f"Applying random delay of {delay:.2f} seconds.")
+        logger.debug("Applying random delay of %.2f seconds.", delay)
         time.sleep(delay)
 
+    def pace(self, min_gap: Optional[float] = None, max_gap: Optional[float] = None) -> None:
+        """
+        Keep consecutive actions a random `min_gap`..`max_gap` seconds apart (defaults to
+        `min_delay`..`max_delay`). Time already spent since the previous action, such as
+        waiting for the page to become ready, counts toward the gap, so only the remainder
+        is slept. Once `pacing_budget` is used up, or when replaying recorded fixtures,
+        pacing no longer sleeps.
+
+        Args:
+            min_gap (float, optional): Shortest gap between actions, in seconds.
+            max_gap (float, optional): Longest gap between actions, in seconds.
+        """
+        gap = random.uniform(self.min_delay if min_gap is None else min_gap,
+                             self.max_delay if max_gap is None else max_gap)
+        with self._lock:
+            now = time.monotonic()
+            delay = 0.0 if self._last_action is None else gap - (now - self._last_action)
+            if self.pacing_budget is not None:
+                delay = min(delay, self.pacing_budget - self.paced)
+            delay = max(delay, 0.0)
+            self.paced += delay
+            self._last_action = now + delay
+        if delay and not replaying():
+            logger.debug("Pacing for %.2f seconds (%.1fs paced in total).", delay, self.paced)
+            time.sleep(delay)
+
+    def start_run(self) -> None:
+        """
+        Start a new run (one scraper job): the pacing budget applies per run, so the
+        time paced so far is forgotten. The gap since the last action still counts.
+        """
+        with self._lock:
+            self.paced = 0.0
+
     def error_backoff(self) -> None:
         """
         Wait a specified delay after encountering an error to avoid hammering
         the target platform with rapid retries.
         """
-        logger.debug(f"Applying error backoff delay of {self.error_delay:.2f} seconds.")
+        logger.debug("Applying error backoff delay of %.2f seconds.", self.error_delay)
         time.sleep(self.error_delay)
 
     def simulate_human_scroll(self, page: Page, scrolls: int = 2) -> None:
@@ -71,14 +121,14 @@ class RateLimitManager:
             page (Page): The Playwright page instance to scroll.
             scrolls (int): Number of times to scroll. Scrolling distance and intervals are randomized.
         """
-        logger.debug(f"Simulating human-like scrolling with {scrolls} scroll actions.")
+        logger.debug("Simulating human-like scrolling with %d scroll actions.", scrolls)
         for i in range(scrolls):
             scroll_distance = random.randint(300, 800)
             page.evaluate(f"window.scrollBy(0, {scroll_distance});")
-            # Apply a small delay between scrolls
-            small_delay = random.uniform(0.5, 1.5)
-            logger.debug(f"Scrolled {scroll_distance}px down and waiting {small_delay:.2f} seconds.")
-            time.sleep(small_delay)
+            # Let lazily loaded content settle, then top up to a human-looking gap
+            wait_for_dom_quiet(page, quiet=300, timeout=3000)
+            logger.debug("Scrolled %dpx down.", scroll_distance)
+            self.pace(0.5, 1.5)
 
     def simulate_mouse_movement(self, page: Page) -> None:
         """
@@ -94,3 +144,23 @@ class RateLimitManager:
         # page.mouse.move(random.randint(0, 100), random.randint(0, 100))
         # time.sleep(random.uniform(0.5, 1.0))
         pass
+
+
+_manager: Optional[RateLimitManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_rate_limit_manager() -> RateLimitManager:
+    """
+    Return the process-wide pacing manager, configured from `REQUEST_DELAY_MIN`,
+    `REQUEST_DELAY_MAX` and `PACING_BUDGET`.
+    """
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = RateLimitManager(
+                min_delay=Config.REQUEST_DELAY_MIN,
+                max_delay=Config.REQUEST_DELAY_MAX,
+                pacing_budget=Config.PACING_BUDGET or None,
+            )
+        return _manager
@@ -5,18 +5,47 @@ This module is intended to handle the entire login flow:
 - Inserting credentials into login fields.
 - Handling two-factor authentication (if required).
 - Waiting for the authenticated session page to load fully.
-- Optionally, loading session cookies to bypass login if available.
+- Reusing a persisted, encrypted session snapshot to bypass login when it is still valid.
 
 NOTE: Actual authentication logic depends on your credentials and requirements,
 and should be implemented accordingly.
 """
 
 import os
+import json
 import logging
-from playwright.sync_api import Page, TimeoutError
+from playwright.sync_api import BrowserContext, Page, TimeoutError
+from src.common.session_store import SessionStore
+from src.common.transport import replaying
 
 logger = logging.getLogger(__name__)
 
+# Restores a storage state's localStorage for the page's origin, once per tab
+_LOCAL_STORAGE_SCRIPT = """
+(origins => {
+    if (window.sessionStorage.getItem("__storage_state_applied")) return;
+    const entry = origins.find(o => o.origin === window.location.origin);
+    if (!entry) return;
+    for (const {name, value} of entry.localStorage) window.localStorage.setItem(name, value);
+    window.sessionStorage.setItem("__storage_state_applied", "1");
+})(%s);
+"""
+
+
+def apply_storage_state(context: BrowserContext, state: dict) -> None:
+    """
+    Apply a `storage_state` snapshot to an existing context: its cookies right away,
+    and its localStorage origins as each origin's next document loads.
+
+    Args:
+        context (BrowserContext): The context to update.
+        state (dict): Snapshot as returned by `BrowserContext.storage_state()`.
+    """
+    context.add_cookies(state.get("cookies", []))
+    origins = state.get("origins", [])
+    if origins:
+        context.add_init_script(script=_LOCAL_STORAGE_SCRIPT % json.dumps(origins))
+
 def authenticate(page: Page, username: str = None, password: str = None) -> None:
     """
     Perform LinkedIn Sales Navigator authentication on the given Playwright page.
@@ -44,7 +73,7 @@ def authenticate(page: Page, username: str = None, password: str = None) -> None
     logger.info("Starting LinkedIn authentication process...")
 
     # Navigate to LinkedIn login page
-    page.goto("https://www.linkedin.com/login", wait_until="networkidle")
+    page.goto("https://www.linkedin.com/login", wait_until="domcontentloaded")
 
     # Fill in the username field
     username_selector = "input#username"
@@ -53,7 +82,7 @@ def authenticate(page: Page, username: str = None, password: str = None) -> None
 
     page.wait_for_selector(username_selector)
     page.fill(username_selector, username)
-    logger.debug(f"Filled username field with {username}")
+    logger.debug("Filled username field with %s", username)
 
     page.wait_for_selector(password_selector)
     page.fill(password_selector, password)
@@ -75,3 +104,86 @@ def authenticate(page: Page, username: str = None, password: str = None) -> None
     # - Handle two-factor authentication if prompted.
     # - Check if login was successful by verifying user avatar or navigation to homepage.
     # - Handle unusual login scenarios (e.g., captcha, account verification).
+
+
+SESSION_PROBE_URL = "https://www.linkedin.com/sales/home"
+
+
+def is_session_valid(page: Page) -> bool:
+    """
+    Cheaply check whether the page's browser context holds a live Sales Navigator session.
+
+    The probe is a single HTTP request issued through the context's request client (it
+    shares the context's cookies) without rendering anything or following redirects.
+    An expired session is redirected to the login or checkpoint pages.
+
+    Args:
+        page (Page): A page whose context should be checked.
+
+    Returns:
+        bool: True if the session is authenticated. Always True when replaying recorded
+        fixtures, since the probe's request client bypasses the recorded HAR.
+    """
+    if replaying():
+        return True
+    try:
+        response = page.request.get(SESSION_PROBE_URL, max_redirects=0, timeout=10000)
+    except Exception as e:
+        logger.warning("Session probe failed: %s", e)
+        return False
+    location = response.headers.get("location", "")
+    valid = response.ok and "/login" not in location and "/checkpoint" not in location
+    logger.debug("Session probe returned %s, valid=%s.", response.status, valid)
+    return valid
+
+
+async def is_session_valid_async(page) -> bool:
+    """
+    Async version of `is_session_valid`, for pages from `playwright.async_api`.
+    """
+    if replaying():
+        return True
+    try:
+        response = await page.request.get(SESSION_PROBE_URL, max_redirects=0, timeout=10000)
+    except Exception as e:
+        logger.warning("Session probe failed: %s", e)
+        return False
+    location = response.headers.get("location", "")
+    valid = response.ok and "/login" not in location and "/checkpoint" not in location
+    logger.debug("Session probe returned %s, valid=%s.", response.status, valid)
+    return valid
+
+
+def ensure_authenticated(page: Page, store: SessionStore,
+                         username: str = None, password: str = None) -> None:
+    """
+    Make sure the page's context is logged in, reusing the persisted session when possible.
+
+    The context is expected to have been created with `store.load()` as its storage state.
+    If the probe shows that session has expired, the refresh happens once, under the
+    store's lock: a worker that waited on the lock first checks whether another worker
+    already saved a fresher snapshot and adopts it instead of logging in again.
+
+    Args:
+        page (Page): The Playwright page to authenticate.
+        store (SessionStore): Encrypted store holding the shared session snapshot.
+        username (str, optional): LinkedIn username/email, see `authenticate`.
+        password (str, optional): LinkedIn password, see `authenticate`.
+    """
+    seen_version = store.version()
+    if seen_version and is_session_valid(page):
+        logger.info("Reusing persisted LinkedIn session.")
+        return
+
+    with store.lock():
+        if store.version() > seen_version:
+            state = store.load()
+            if state:
+                apply_storage_state(page.context, state)
+                if is_session_valid(page):
+                    logger.info("Adopted LinkedIn session refreshed by another worker.")
+                    return
+
+        authenticate(page, username, password)
+        store.save(page.context.storage_state())
+
@@ -0,0 +1,264 @@
+"""
+Tags incoming leads (from Apollo, Clutch, LinkedIn, ...) with every persona they match.
+
+Rather than testing each lead against each persona's title, industry and keyword lists,
+all persona terms are compiled once into a single token-level Aho-Corasick automaton.
+Each lead field is then scanned once, and every persona term it contains is reported in
+that same pass, so the cost grows with the size of the lead text rather than with
+leads x personas x terms.
+
+The compiled index is cached and keyed by a fingerprint of the persona definitions, so
+it is rebuilt automatically whenever the personas change.
+"""
+
+import re
+import json
+import hashlib
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.common.lead_batch import LeadBatch
+from .persona_definitions import IndustryPersonas
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_QUOTED_RE = re.compile(r'"([^"]+)"')
+
+# Which lead fields each kind of persona term is matched against.
+FIELD_KINDS: Dict[str, Tuple[str, ...]] = {
+    "job_title": ("job_title",),
+    "industry": ("industry",),
+    "keyword": ("job_title", "industry", "company_name"),
+}
+LEAD_FIELDS: Tuple[str, ...] = ("job_title", "industry", "company_name")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case `text` and split it into word tokens."""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(text.lower())
+
+
+def persona_terms(persona: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    Recover the raw job title, industry and keyword terms from a persona dictionary.
+
+    `SalesNavigatorFilters.to_search_query` renders job titles as a parenthesised OR group
+    followed by the AND'ed keywords, so the terms are read back from that string.
+
+    Args:
+        persona (dict): A persona dictionary as returned by `IndustryPersonas`.
+
+    Returns:
+        A dictionary mapping term kind ("job_title", "industry", "keyword") to terms.
+    """
+    search_params = persona.get("search_params", {})
+    keywords = search_params.get("keywords", "")
+    titles: List[str] = []
+    if keywords.startswith("("):
+        title_group, _, keywords = keywords.partition(")")
+        titles = _QUOTED_RE.findall(title_group)
+    company = search_params.get("filterGroups", {}).get("company", {})
+    return {
+        "job_title": titles,
+        "industry": list(company.get("industry", [])),
+        "keyword": _QUOTED_RE.findall(keywords),
+    }
+
+
+def personas_fingerprint(personas: Sequence[Dict[str, Any]]) -> str:
+    """Return a stable hash of the persona definitions, used to invalidate the index."""
+    payload = json.dumps(
+        [{"name": p.get("name"), "search_params": p.get("search_params")} for p in personas],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class _Pattern:
+    persona: str
+    kind: str
+    term: str
+    length: int
+
+
+class PersonaClassifier:
+    """
+    A compiled multi-pattern matcher over all persona terms.
+
+    Attributes:
+        fingerprint (str): Hash of the persona definitions this index was built from.
+        persona_names (list): Names of the personas in the index, in definition order.
+    """
+
+    def __init__(self, personas: Sequence[Dict[str, Any]]):
+        """
+        Compile the automaton for the given personas.
+
+        Args:
+            personas (list): Persona dictionaries as returned by `IndustryPersonas`.
+        """
+        self.fingerprint = personas_fingerprint(personas)
+        self.persona_names = [p["name"] for p in personas]
+        self._patterns: List[_Pattern] = []
+        # Trie over tokens: goto transitions, failure links and pattern ids per node.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        seen: Set[Tuple[str, str, Tuple[str, ...]]] = set()
+        for persona in personas:
+            for kind, terms in persona_terms(persona).items():
+                for term in terms:
+                    tokens = tuple(tokenize(term))
+                    if not tokens or (persona["name"], kind, tokens) in seen:
+                        continue
+                    seen.add((persona["name"], kind, tokens))
+                    self._add_pattern(tokens, _Pattern(persona["name"], kind, term, len(tokens)))
+        self._build_failure_links()
+        logger.debug("Compiled persona index with %s terms across %s personas.",
+                     len(self._patterns), len(self.persona_names))
+
+    def _add_pattern(self, tokens: Tuple[str, ...], pattern: _Pattern) -> None:
+        node = 0
+        for token in tokens:
+            nxt = self._goto[node].get(token)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][token] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(len(self._patterns))
+        self._patterns.append(pattern)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def scan(self, text: Optional[str]) -> List[_Pattern]:
+        """
+        Find every persona term contained in `text` in a single pass.
+
+        Args:
+            text (str): Free text such as a job title or industry name.
+
+        Returns:
+            The matched patterns, in the order their last token was seen.
+        """
+        matches = []
+        node = 0
+        for token in tokenize(text):
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            for pattern_id in self._out[node]:
+                matches.append(self._patterns[pattern_id])
+        return matches
+
+    def classify(self, lead: Any) -> Dict[str, List[str]]:
+        """
+        Match a single lead against every persona.
+
+        Args:
+            lead: A lead dictionary or `Lead` model instance.
+
+        Returns:
+            A dictionary mapping each matched persona name to the terms that matched it,
+            ordered by number of matched terms (best match first).
+        """
+        hits: Dict[str, List[str]] = {}
+        for field_name in LEAD_FIELDS:
+            for pattern in self.scan(_lead_field(lead, field_name)):
+                if field_name in FIELD_KINDS[pattern.kind] and pattern.term not in hits.get(pattern.persona, ()):
+                    hits.setdefault(pattern.persona, []).append(pattern.term)
+        return dict(sorted(hits.items(), key=lambda item: -len(item[1])))
+
+    def tag_batch(self, leads: Iterable[Any], attribute: str = "persona_tags") -> List[Any]:
+        """
+        Tag a batch of leads in place with the names of every persona they match.
+
+        The tags are stored as a comma-separated string under `attribute`: as a column of
+        a `LeadBatch`, a dictionary key for dict leads or an attribute for `Lead` instances.
+
+        Args:
+            leads: A `LeadBatch`, or lead dictionaries or `Lead` model instances.
+            attribute (str): Field to store the tags in.
+
+        Returns:
+            The same `LeadBatch`, or the leads as a list.
+        """
+        if isinstance(leads, LeadBatch):
+            leads.set_column(attribute, (",".join(self.classify(lead)) for lead in leads))
+            return leads
+        leads = list(leads)
+        for lead in leads:
+            tags = ",".join(self.classify(lead))
+            if isinstance(lead, dict):
+                lead[attribute] = tags
+            else:
+                setattr(lead, attribute, tags)
+        return leads
+
+
+def _lead_field(lead: Any, name: str) -> Optional[str]:
+    if isinstance(lead, dict):
+        return lead.get(name)
+    return getattr(lead, name, None)
+
+
+_index_lock = threading.Lock()
+_index: Optional[PersonaClassifier] = None
+
+
+def get_persona_classifier(personas: Optional[Sequence[Dict[str, Any]]] = None) -> PersonaClassifier:
+    """
+    Return the shared compiled index, rebuilding it if the persona definitions changed.
+
+    Args:
+        personas (list, optional): Persona dictionaries. Defaults to all `IndustryPersonas`.
+
+    Returns:
+        PersonaClassifier: The compiled index for the current persona definitions.
+    """
+    global _index
+    personas = IndustryPersonas.all_personas() if personas is None else list(personas)
+    fingerprint = personas_fingerprint(personas)
+    with _index_lock:
+        if _index is None or _index.fingerprint != fingerprint:
+            logger.info("Persona definitions changed, rebuilding persona classifier index.")
+            _index = PersonaClassifier(personas)
+        return _index
+
+
+def invalidate_persona_classifier() -> None:
+    """Drop the cached index so the next call to `get_persona_classifier` rebuilds it."""
+    global _index
+    with _index_lock:
+        _index = None
+
+
+def tag_leads(leads: Iterable[Any], personas: Optional[Sequence[Dict[str, Any]]] = None) -> List[Any]:
+    """
+    Tag a batch of leads with every persona they match, using the shared index.
+
+    Intended to be called inline just before leads are written to the database.
+    """
+    return get_persona_classifier(personas).tag_batch(leads)
@@ -7,7 +7,7 @@ tailored to specific industries or targeting strategies.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from .filters import CompanySize, Seniority, SalesNavigatorFilters
 
 
@@ -19,6 +19,8 @@ class PersonaConfig:
     - Pre-built search parameters (filters and keywords) for Sales Navigator.
     - A call-to-action message (CTA) to be used when reaching out to leads.
     - Optional tags for categorization or analytics purposes.
+    - Optionally the structured `SalesNavigatorFilters` behind `search_params`, which
+      `run_sharded_async` splits into shards.
 
     This class enforces that the `name` and `search_params` fields are present and not empty.
     """
@@ -26,6 +28,7 @@ class PersonaConfig:
     search_params: Dict[str, Any]
     cta: str
     tags: List[str] = field(default_factory=list)
+    sales_navigator_filters: Optional[SalesNavigatorFilters] = None
 
     def __post_init__(self):
         """Validate that all required fields are present."""
@@ -42,12 +45,15 @@ class PersonaConfig:
         Returns:
             A dictionary containing all persona attributes.
         """
-        return {
+        persona = {
             "name": self.name,
             "search_params": self.search_params,
             "cta": self.cta,
             "tags": self.tags
         }
+        if self.sales_navigator_filters is not None:
+            persona["sales_navigator_filters"] = self.sales_navigator_filters
+        return persona
 
 
 class IndustryPersonas:
@@ -60,6 +66,20 @@ class IndustryPersonas:
     detailed search parameters for LinkedIn Sales Navigator queries.
     """
 
+    @classmethod
+    def all_personas(cls) -> List[Dict[str, Any]]:
+        """
+        Collect every predefined persona, i.e. the result of each `*_persona` static method.
+
+        Returns:
+            A list of persona dictionaries in definition order.
+        """
+        return [
+            getattr(cls, attr)()
+            for attr, value in vars(cls).items()
+            if attr.endswith("_persona") and isinstance(value, staticmethod)
+        ]
+
     @staticmethod
     def ai_automation_persona() -> Dict[str, Any]:
         """
@@ -86,11 +106,12 @@ class IndustryPersonas:
             seniority_levels=[Seniority.FOUNDER, Seniority.DIRECTOR, Seniority.MANAGER],
             keywords=["automation", "marketing automation", "operational efficiency"],
             locations=["United States", "United Kingdom", "Canada"]
-        ).to_search_query()
+        )
 
         return {
             "name": "AI Automation Services",
-            "search_params": filters,
+            "search_params": filters.to_search_query(),
+            "sales_navigator_filters": filters,
             "cta": "Let me show you how you can save 20+ hours per week.",
             "tags": ["ai", "automation", "efficiency"]
         }
@@ -121,11 +142,12 @@ class IndustryPersonas:
             keywords=["operational efficiency", "process automation", "field operations"],
             locations=["United States", "Canada"],
             technologies_used=["ERP", "CRM", "Field Service Software"]
-        ).to_search_query()
+        )
 
         return {
             "name": "Opscale AI Dashboard",
-            "search_params": filters,
+            "search_params": filters.to_search_query(),
+            "sales_navigator_filters": filters,
             "cta": "Get actionable insights to boost efficiency.",
             "tags": ["operations", "ai", "dashboard", "insights"]
         }
@@ -156,11 +178,12 @@ class IndustryPersonas:
             keywords=["smart contracts", "NFT", "web3", "blockchain", "defi"],
             locations=["Global"],
             active_last_30_days=True
-        ).to_search_query()
+        )
 
         return {
             "name": "Smart Contract Services",
-            "search_params": filters,
+            "search_params": filters.to_search_query(),
+            "sales_navigator_filters": filters,
             "cta": "Let's audit your contracts before launch.",
             "tags": ["web3", "blockchain", "smart-contracts"]
         }
@@ -189,11 +212,12 @@ class IndustryPersonas:
             seniority_levels=[Seniority.HEAD, Seniority.DIRECTOR, Seniority.MANAGER],
             keywords=["game economy", "player retention", "monetization"],
             locations=["Global"]
-        ).to_search_query()
+        )
 
         return {
             "name": "Game Economy Design",
-            "search_params": filters,
+            "search_params": filters.to_search_query(),
+            "sales_navigator_filters": filters,
             "cta": "Optimize your game economy and boost player retention.",
             "tags": ["gaming", "economy", "retention"]
         }
@@ -223,11 +247,12 @@ class IndustryPersonas:
             keywords=["cash flow", "financial management", "payments"],
             locations=["Mexico", "Brazil", "Colombia", "Argentina", "Chile"],
             regions=["Latin America"]
-        ).to_search_query()
+        )
 
         return {
             "name": "Bankero FinTech",
-            "search_params": filters,
+            "search_params": filters.to_search_query(),
+            "sales_navigator_filters": filters,
             "cta": "Let us optimize your cash flow today.",
             "tags": ["fintech", "finance", "cashflow"]
         }
@@ -0,0 +1,167 @@
+"""
+Splits broad Sales Navigator searches into shards that each stay under the result cap.
+
+Sales Navigator returns at most `LINKEDIN_RESULT_CAP` results per search, so a persona
+combining several countries, company sizes and seniorities silently loses everything
+past the cap. `QueryPlanner` estimates the result count of a search and, while it is
+over the cap, expands it along one dimension at a time (locations, then company sizes,
+then seniority levels, then job titles) into sub-searches with a single value each. Values
+whose searches fit are packed back together into as few, evenly sized shards as the
+cap allows; values still over the cap are split along the next dimension.
+
+Locations, company sizes and seniority levels give disjoint shards. Job titles are OR'ed
+in the keyword query and a profile can match two of them, so they are split last and
+the overlap is removed when shard results are merged (`merge_shard_leads`).
+
+Only dimensions the filters list explicitly are split. An empty list means "any", and
+expanding it into enum members would drop whatever the enum does not cover.
+"""
+
+import math
+import asyncio
+import logging
+from dataclasses import dataclass, replace
+from typing import Awaitable, Callable, Iterable, List, Optional, Sequence
+
+from src.config.config import Config
+from src.common.lead_batch import LeadBatch
+from .filters import SalesNavigatorFilters
+
+logger = logging.getLogger(__name__)
+
+# SalesNavigatorFilters fields split into sub-searches, in order of preference.
+SPLIT_DIMENSIONS = ("locations", "company_sizes", "seniority_levels", "job_titles")
+
+
+@dataclass
+class Shard:
+    """
+    A sub-search of a sharded query.
+
+    Attributes:
+        filters: The shard's filters; they differ from the original in split dimensions only.
+        estimate: Estimated number of results, or None if it could not be estimated.
+    """
+    filters: SalesNavigatorFilters
+    estimate: Optional[int] = None
+
+    def fits(self, cap: int) -> bool:
+        return self.estimate is None or self.estimate <= cap
+
+
+def split_dimension(filters: SalesNavigatorFilters,
+                    dimensions: Sequence[str] = SPLIT_DIMENSIONS) -> Optional[str]:
+    """Return the first dimension with more than one value, or None if the filters are atomic."""
+    return next((dimension for dimension in dimensions if len(getattr(filters, dimension)) > 1), None)
+
+
+def pack(shards: List[Shard], dimension: str, cap: int) -> List[Shard]:
+    """
+    Combine single-value shards of `dimension` into as few shards as fit under `cap`,
+    balancing their estimates (largest first onto the least loaded shard).
+
+    Args:
+        shards: Shards whose `dimension` holds one value each, all with estimates <= cap.
+        dimension: The dimension the shards were split along.
+        cap: Maximum estimated results per packed shard.
+
+    Returns:
+        The packed shards, each listing its values in their original order.
+    """
+    if len(shards) <= 1:
+        return shards
+    order = {id(shard): i for i, shard in enumerate(shards)}
+    bins = max(1, math.ceil(sum(shard.estimate for shard in shards) / cap))
+    while True:
+        groups = [[0, []] for _ in range(bins)]
+        for shard in sorted(shards, key=lambda s: s.estimate, reverse=True):
+            group = min(groups, key=lambda g: g[0])
+            group[0] += shard.estimate
+            group[1].append(shard)
+        if all(load <= cap for load, _ in groups):
+            break
+        bins += 1
+
+    packed = []
+    for load, members in groups:
+        if not members:
+            continue
+        members.sort(key=lambda s: order[id(s)])
+        values = [value for member in members for value in getattr(member.filters, dimension)]
+        packed.append(Shard(replace(members[0].filters, **{dimension: values}), load))
+    return packed
+
+
+class QueryPlanner:
+    """
+    Plans shards of a search so that each stays under the result cap.
+
+    Attributes:
+        estimate: Coroutine function returning the result count of a search, or None if
+            unknown. Estimates of sibling sub-searches run concurrently.
+        cap: Maximum results a single search returns.
+        dimensions: Filter fields that may be split, in order of preference.
+    """
+
+    def __init__(self,
+                 estimate: Callable[[SalesNavigatorFilters], Awaitable[Optional[int]]],
+                 cap: int = Config.LINKEDIN_RESULT_CAP,
+                 dimensions: Sequence[str] = SPLIT_DIMENSIONS):
+        self.estimate = estimate
+        self.cap = cap
+        self.dimensions = dimensions
+        self.estimates = 0
+
+    async def _estimate(self, filters: SalesNavigatorFilters) -> Shard:
+        self.estimates += 1
+        return Shard(filters, await self.estimate(filters))
+
+    async def plan(self, filters: SalesNavigatorFilters) -> List[Shard]:
+        """
+        Split `filters` into shards whose estimates are under the cap.
+
+        Returns:
+            The shards. A shard that cannot be split further stays over the cap and
+            is logged; one whose estimate failed is kept as it is.
+        """
+        shards = await self._refine(await self._estimate(filters))
+        logger.info("Planned %s shard(s) from %s estimate(s): %s",
+                    len(shards), self.estimates, [shard.estimate for shard in shards])
+        return shards
+
+    async def _refine(self, shard: Shard) -> List[Shard]:
+        if shard.fits(self.cap):
+            return [shard]
+        dimension = split_dimension(shard.filters, self.dimensions)
+        if dimension is None:
+            logger.warning("Search with ~%s results cannot be split further; results past %s will be missed.",
+                           shard.estimate, self.cap)
+            return [shard]
+
+        children = await asyncio.gather(*(
+            self._estimate(replace(shard.filters, **{dimension: [value]}))
+            for value in getattr(shard.filters, dimension)
+        ))
+        fitting = [child for child in children if child.estimate is not None and child.estimate <= self.cap]
+        unknown = [child for child in children if child.estimate is None]
+        refined = await asyncio.gather(*(self._refine(child) for child in children
+                                         if child.estimate is not None and child.estimate > self.cap))
+        return pack(fitting, dimension, self.cap) + unknown + [s for shards in refined for s in shards]
+
+
+def merge_shard_leads(batches: Iterable[LeadBatch], key: str = "linkedin_url") -> LeadBatch:
+    """
+    Merge the leads of several shards, keeping the first lead seen for each `key`.
+    Leads without a key are kept as they are.
+    """
+    merged = LeadBatch()
+    seen = set()
+    for batch in batches:
+        for lead in batch:
+            value = lead.get(key)
+            if value:
+                if value in seen:
+                    continue
+                seen.add(value)
+            merged.append(lead)
+    return merged
@@ -0,0 +1,136 @@
+"""
+Snapshots of persona search results, so re-runs only process what is new.
+
+A snapshot is the ordered list of profile URLs a persona's search returned last time,
+keyed by a hash of the persona's search definition and kept for `PERSONA_SNAPSHOT_TTL`
+seconds. Sales Navigator lists the newest matches first, so on a re-run the scraper
+walks the result pages only until it reaches a page whose profiles are all already in
+the snapshot, and hands on only the profiles it has not seen (the delta). A re-run then
+costs about as many pages as there are new results, not the full result count.
+
+Only full runs restart a snapshot's TTL. Once it expires the next run is a full one
+again, which refreshes `last_seen` for every lead still listed.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.config.config import Config
+from src.common.lead_batch import LeadBatch
+
+logger = logging.getLogger(__name__)
+
+# Persona keys that shape the search; name, CTA and tags do not change the results.
+SEARCH_KEYS = ("query", "filters", "search_params")
+
+
+def persona_key(persona: Dict[str, Any]) -> str:
+    """Hash the search-defining parts of a persona."""
+    search = {key: persona.get(key) for key in SEARCH_KEYS}
+    payload = json.dumps(search, sort_keys=True, default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SnapshotCache:
+    """
+    Persistent persona key -> ordered profile URLs cache backed by SQLite.
+
+    Attributes:
+        path (str): Database file path.
+        ttl (float): Seconds after which a snapshot is ignored.
+    """
+
+    def __init__(self, path: str = Config.PERSONA_SNAPSHOT_PATH, ttl: float = Config.PERSONA_SNAPSHOT_TTL):
+        self.path = path
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "key TEXT PRIMARY KEY, urls TEXT NOT NULL, taken_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[List[str]]:
+        """Return the fresh snapshot for `key`, or None if it is missing or stale."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT urls FROM snapshots WHERE key = ? AND taken_at >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, urls: List[str], full: bool = True) -> None:
+        """
+        Store a snapshot. Only a full run restarts the TTL; a delta run updates the URLs
+        but keeps the expiry, so a full pass still happens every `ttl` seconds.
+        """
+        with self._lock, self._conn:
+            if full:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (key, urls, taken_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(urls), time.time()),
+                )
+            else:
+                self._conn.execute("UPDATE snapshots SET urls = ? WHERE key = ?", (json.dumps(urls), key))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultDelta:
+    """
+    Tracks one run's result pages against the previous snapshot.
+
+    Attributes:
+        known (set): Profile URLs from the previous snapshot (empty on a full run).
+        urls (list): Profile URLs seen in this run, in result order.
+        done (bool): True once a page held nothing new, so paginating further is wasted.
+    """
+
+    def __init__(self, snapshot: Optional[List[str]] = None):
+        self.snapshot = snapshot or []
+        self.known = set(self.snapshot)
+        self.urls: List[str] = []
+        self.done = False
+
+    def add_page(self, leads: LeadBatch) -> LeadBatch:
+        """
+        Record a result page and return only its leads not in the snapshot. An empty
+        page, or one made up entirely of known profiles, marks the run as done.
+        """
+        fresh = LeadBatch(fields=leads.fields)
+        for lead in leads:
+            url = lead.get("linkedin_url")
+            if url:
+                self.urls.append(url)
+            if not url or url not in self.known:
+                fresh.append(lead)
+        if not leads or (self.known and not fresh):
+            self.done = True
+        return fresh
+
+    def merged(self) -> List[str]:
+        """The next snapshot: this run's URLs, followed by older ones not reached this time."""
+        seen = set(self.urls)
+        return list(dict.fromkeys(self.urls)) + [url for url in self.snapshot if url not in seen]
+
+
+_cache: Optional[SnapshotCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_snapshot_cache() -> SnapshotCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SnapshotCache()
+        return _cache
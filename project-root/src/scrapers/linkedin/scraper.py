@@ -1,18 +1,119 @@
-import time
+import asyncio
 import logging
-from random import uniform
-from src.common.playwright_driver import PlaywrightDriver
-from src.common.utils import random_delay
-from src.common.proxy_manager import ProxyManager
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+from urllib.parse import urlparse
+from src.config.config import Config
+from src.common.playwright_driver import PlaywrightDriver, ResponseCapture, goto
+from src.common.async_playwright_driver import AsyncPlaywrightDriver, goto_async
+from src.common.browser_waits import (
+    content_signature,
+    content_signature_async,
+    expect_json_response,
+    expect_json_response_async,
+    wait_for_change,
+    wait_for_change_async,
+    wait_for_count,
+    wait_for_count_async,
+    wait_for_dom_quiet,
+    wait_for_dom_quiet_async,
+)
+from src.common.resilience import CircuitOpenError, RetryBudget
+from src.common.session_store import SessionStore
+from src.common.transport import fixture_name
+from src.common.profiling import profile_memory
+from src.database.lead_spool import spool_leads
+from src.common.lead_batch import LeadBatch
+from .persona_classifier import tag_leads
+from .authenticator import ensure_authenticated, is_session_valid_async
+from .anti_detection import get_rate_limit_manager
+from .query_planner import QueryPlanner, merge_shard_leads
+from .result_snapshots import ResultDelta, get_snapshot_cache, persona_key
+
 logger = logging.getLogger(__name__)
 
+SEARCH_URL = "https://www.linkedin.com/sales/search/people"
+SEARCH_INPUT_SELECTOR = "input[data-test-search-bar-input]"
+SEARCH_API_PATTERN = "**/sales-api/salesApiLeadSearch**"  # XHR that delivers the results
+RESULT_SELECTOR = ".result-lockup"
+NO_RESULTS_SELECTOR = ".search-results__no-results"
+NEXT_PAGE_SELECTOR = "button.artdeco-pagination__button--next"
+LEAD_URL = "https://www.linkedin.com/sales/lead/{}"
+
+
+def lead_url(reference):
+    """
+    Canonical profile URL of a lead, the same for every search and extraction path.
+
+    :param reference: A profile URN ("urn:li:fs_salesProfile:(ACwAA...,NAME_SEARCH,x1y2)")
+        or a result card link ("/sales/lead/ACwAA...,NAME_SEARCH,x1y2?_ntb=...").
+    :return: `LEAD_URL` with the bare profile id, without the per-search suffix and
+        query string, or None if there is no id.
+    """
+    if not reference:
+        return None
+    if "(" in reference:
+        profile = reference[reference.index("(") + 1:].rstrip(")")
+    else:
+        profile = urlparse(reference).path.rstrip("/").rsplit("/", 1)[-1]
+    profile = profile.split(",")[0].strip()
+    return LEAD_URL.format(profile) if profile else None
+
+
+def parse_lead_search(payload):
+    """
+    Parse a Sales Navigator lead search API payload into leads.
+
+    :param payload: Decoded JSON of a salesApiLeadSearch response.
+    :return: LeadBatch of leads; elements without a profile URN are skipped.
+    """
+    leads = LeadBatch()
+    for element in payload.get("elements", []):
+        profile_url = lead_url(element.get("entityUrn"))
+        if not profile_url:
+            continue
+        positions = element.get("currentPositions") or [{}]
+        position = next((p for p in positions if p.get("current")), positions[0])
+        company = position.get("companyUrnResolutionResult") or {}
+        leads.append(
+            platform="linkedin",
+            first_name=element.get("firstName"),
+            last_name=element.get("lastName"),
+            job_title=position.get("title"),
+            company_name=position.get("companyName") or company.get("name"),
+            company_website=company.get("website"),
+            industry=company.get("industry"),
+            location=element.get("geoRegion"),
+            linkedin_url=profile_url,
+        )
+    return leads
+
+
+def shard_persona(persona, filters):
+    """
+    Derive the persona of one query shard, with search inputs taken from its filters.
+
+    :param persona: The persona being sharded; name and CTA carry over to the shard.
+    :param filters: SalesNavigatorFilters of the shard.
+    :return: Persona dictionary for a LinkedInSalesNavigatorScraper.
+    """
+    search_params = filters.to_search_query()
+    inputs = {
+        "location": ", ".join(filters.locations),
+        "industry": ", ".join(filters.industry_keywords),
+        "company_size": ", ".join(size.value for size in filters.company_sizes),
+        "seniority": ", ".join(level.value for level in filters.seniority_levels),
+    }
+    return {
+        **persona,
+        "query": search_params["keywords"],
+        "filters": {name: value for name, value in inputs.items() if value},
+        "search_params": search_params,
+        "sales_navigator_filters": filters,
+    }
+
 
 class LinkedInSalesNavigatorScraper:
+    HOST = "www.linkedin.com"
+
     def __init__(self, persona):
         """
         Initializes the scraper with a persona configuration.
@@ -20,40 +121,68 @@ class LinkedInSalesNavigatorScraper:
         :param persona: Dictionary containing search parameters for the persona.
         """
         self.persona = persona
-        self.proxy = ProxyManager.get_random_proxy()
+        self.budget = RetryBudget()
+        self.pacer = get_rate_limit_manager()
+        self.snapshots = get_snapshot_cache()
+        self.max_pages = Config.LINKEDIN_MAX_PAGES
+        self.stale_cards = None  # Result cards shown before the last next-page click
+        self.pending_snapshot = None  # (key, urls, full) from `collect_in_tab`, stored once saved
 
     def run(self):
         """
         Executes the scraper to fetch LinkedIn profiles based on persona filters.
         """
-        logger.info(f"Starting scraper for persona: {self.persona['name']}...")
+        logger.info("Starting scraper for persona: %s...", self.persona['name'])
+        self.pacer.start_run()
         try:
-            with PlaywrightDriver(proxy=self.proxy, headless=True) as page:
+            session_store = SessionStore("linkedin")
+            capture = ResponseCapture({SEARCH_API_PATTERN: parse_lead_search})
+            with PlaywrightDriver(headless=True, storage_state=session_store.load(), capture=capture,
+                                  har_name=fixture_name("linkedin", self.persona["name"])) as page:
+                ensure_authenticated(page, session_store)
                 self.navigate_to_search(page)
-                leads = self.extract_leads(page)
-
-                if not leads:
-                    logger.warning(f"No leads found for persona: {self.persona['name']}")
-                    return
+                self.stale_cards = None
+                key = persona_key(self.persona)
+                delta = ResultDelta(self.snapshots.get(key))
+                leads = LeadBatch()
+                with profile_memory("extract_leads"):
+                    for page_number in range(1, self.max_pages + 1):
+                        page_leads = self.captured_leads(capture.collect())
+                        if not page_leads:
+                            self.wait_for_results(page)
+                            page_leads = self.extract_leads(page)
+                        leads.extend(delta.add_page(page_leads))
+                        if delta.done or page_number == self.max_pages or not self.next_page(page):
+                            break
+                self.log_delta(delta, leads, page_number)
 
-                self.save_to_database(leads)
-                logger.info(f"Successfully saved {len(leads)} leads to the database for persona: {self.persona['name']}.")
+                if leads:
+                    self.save_to_database(leads)
+                    logger.info("Successfully saved %s leads to the database for persona: %s.",
+                                len(leads), self.persona['name'])
+                elif not delta.known:
+                    logger.warning("No leads found for persona: %s", self.persona['name'])
+                self.snapshots.put(key, delta.merged(), full=not delta.known)
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.exception(f"An error occurred while scraping for persona {self.persona['name']}: {e}")
+            logger.exception("An error occurred while scraping for persona %s: %s", self.persona['name'], e)
         finally:
-            logger.info(f"Scraper completed for persona: {self.persona['name']}.")
+            logger.info("Scraper completed for persona: %s.", self.persona['name'])
 
     def navigate_to_search(self, page):
         """
         Navigate to LinkedIn Sales Navigator search page and apply persona filters.
         """
-        logger.info(f"Navigating to LinkedIn Sales Navigator for persona: {self.persona['name']}...")
-        page.goto("https://www.linkedin.com/sales/search/people")
-        random_delay()
+        logger.info("Navigating to LinkedIn Sales Navigator for persona: %s...", self.persona['name'])
+        goto(page, SEARCH_URL, budget=self.budget, wait_until="domcontentloaded")
+        page.wait_for_selector(SEARCH_INPUT_SELECTOR, timeout=15000)
+        self.pacer.pace()
 
         # Apply query and persona filters
-        page.fill("input[data-test-search-bar-input]", self.persona.get("query", ""))
-        logger.info(f"Search query entered: {self.persona.get('query', '')}")
+        page.fill(SEARCH_INPUT_SELECTOR, self.persona.get("query", ""))
+        logger.info("Search query entered: %s", self.persona.get('query', ''))
 
         filters = self.persona.get("filters", {})
         for filter_name, filter_value in filters.items():
@@ -61,13 +190,57 @@ class LinkedInSalesNavigatorScraper:
                 selector = self.get_filter_selector(filter_name)
                 if selector:
                     page.fill(selector, filter_value)
-                    logger.info(f"Applied filter - {filter_name}: {filter_value}")
+                    logger.info("Applied filter - %s: %s", filter_name, filter_value)
             except Exception as e:
-                logger.warning(f"Failed to apply filter {filter_name}: {e}")
+                logger.warning("Failed to apply filter %s: %s", filter_name, e)
 
-        # Execute the search
-        page.keyboard.press("Enter")
-        random_delay()
+        # Execute the search and wait for the results API response rather than a fixed delay
+        self.pacer.pace()
+        expect_json_response(page, SEARCH_API_PATTERN, lambda: page.keyboard.press("Enter"))
+
+    def next_page(self, page):
+        """
+        Move to the next result page and wait for its search API response. The
+        previous page's cards are remembered so a DOM fallback can wait for them to go.
+
+        :param page: Playwright page object.
+        :return: False if there is no next page.
+        """
+        button = page.query_selector(NEXT_PAGE_SELECTOR)
+        if button is None or not button.is_enabled():
+            return False
+        self.stale_cards = content_signature(page, RESULT_SELECTOR)
+        self.pacer.pace()
+        expect_json_response(page, SEARCH_API_PATTERN, button.click)
+        return True
+
+    def log_delta(self, delta, leads, pages):
+        """
+        Log how a run compared with the persona's previous snapshot.
+
+        :param delta: ResultDelta of the run.
+        :param leads: The leads handed on (new ones only on a delta run).
+        :param pages: Number of result pages walked.
+        """
+        if delta.known:
+            logger.info("Persona %s: %s new leads since the last run in %s page(s), %s already known.",
+                        self.persona['name'], len(leads), pages, len(delta.urls) - len(leads))
+        else:
+            logger.info("Persona %s: full run, %s leads in %s page(s).", self.persona['name'], len(leads), pages)
+
+    def wait_for_results(self, page):
+        """
+        Wait until the search results have rendered, for extraction from the DOM. After
+        a next-page click the API response can arrive before the cards re-render, so
+        wait for the previous page's cards to be replaced first.
+
+        :param page: Playwright page object.
+        """
+        if self.stale_cards is not None:
+            wait_for_change(page, RESULT_SELECTOR, self.stale_cards, empty_selector=NO_RESULTS_SELECTOR)
+        count = wait_for_count(page, RESULT_SELECTOR, empty_selector=NO_RESULTS_SELECTOR)
+        wait_for_dom_quiet(page)
+        logger.info("Search results ready (%s result cards).", count)
 
     def get_filter_selector(self, filter_name):
         """
@@ -80,26 +253,44 @@ class LinkedInSalesNavigatorScraper:
             "location": "input[data-test-location-input]",
             "industry": "input[data-test-industry-input]",
             "company_size": "input[data-test-company-size-input]",
+            "seniority": "input[data-test-seniority-input]",
             "job_roles": "input[data-test-title-input]"
         }
         return filter_selectors.get(filter_name)
 
+    def captured_leads(self, leads):
+        """
+        Labels leads built from the search API responses captured during the search, so
+        the rendered result cards don't need to be read.
+
+        :param leads: LeadBatch collected from the ResponseCapture on the search page.
+        :return: The same LeadBatch, empty if nothing usable was captured (the caller
+            then falls back to DOM extraction).
+        """
+        if leads:
+            leads.set_column("persona", [self.persona["name"]] * len(leads))
+            leads.set_column("cta", [self.persona.get("cta", "")] * len(leads))
+            logger.info("Captured %s leads from search API responses.", len(leads))
+        else:
+            logger.info("No usable search API responses captured, falling back to the DOM.")
+        return leads
+
     def extract_leads(self, page):
         """
-        Extracts leads from search results.
+        Extracts leads from the rendered search results (DOM fallback).
 
         :param page: Playwright page object.
-        :return: List of extracted leads.
+        :return: LeadBatch of extracted leads.
         """
         logger.info("Extracting leads from search results...")
-        leads = []
-        result_cards = page.query_selector_all(".result-lockup")
+        leads = LeadBatch()
+        result_cards = page.query_selector_all(RESULT_SELECTOR)
 
         for idx, card in enumerate(result_cards):
             try:
                 # Ensure that the expected elements exist before accessing them
                 if not card:
-                    logger.warning(f"Result card #{idx + 1} is None.")
+                    logger.warning("Result card #%d is None.", idx + 1)
                     continue
                 first_name, last_name = self.parse_name(card)
                 job_title = self.safe_query_text(card, ".result-lockup__highlight")
@@ -107,21 +298,20 @@ class LinkedInSalesNavigatorScraper:
                 profile_url = self.safe_query_attribute(card, ".result-lockup__name a", "href")
 
                 if profile_url:
-                    lead = {
-                        "platform": "linkedin",
-                        "persona": self.persona['name'],
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "job_title": job_title,
-                        "company_name": company_name,
-                        "linkedin_url": profile_url,
-                        "cta": self.persona.get("cta", ""),
-                    }
-                    leads.append(lead)
+                    leads.append(
+                        platform="linkedin",
+                        persona=self.persona['name'],
+                        first_name=first_name,
+                        last_name=last_name,
+                        job_title=job_title,
+                        company_name=company_name,
+                        linkedin_url=lead_url(profile_url),
+                        cta=self.persona.get("cta", ""),
+                    )
             except Exception as e:
-                logger.warning(f"Failed to parse lead #{idx + 1}: {e}")
+                logger.warning("Failed to parse lead #%d: %s", idx + 1, e)
 
-        logger.info(f"Extracted {len(leads)} leads.")
+        logger.info("Extracted %s leads.", len(leads))
         return leads
 
     def parse_name(self, card):
@@ -131,7 +321,16 @@ class LinkedInSalesNavigatorScraper:
         :param card: Result card element.
         :return: Tuple of first and last name.
         """
-        full_name = self.safe_query_text(card, ".result-lockup__name a")
+        return self.split_name(self.safe_query_text(card, ".result-lockup__name a"))
+
+    @staticmethod
+    def split_name(full_name):
+        """
+        Split a full name into first and last name.
+
+        :param full_name: Name as displayed, e.g. "Ada Lovelace".
+        :return: Tuple of first and last name.
+        """
         if full_name:
             parts = full_name.split(" ", 1)
             first_name = parts[0]
@@ -162,26 +361,285 @@ class LinkedInSalesNavigatorScraper:
         element = card.query_selector(selector)
         return element.get_attribute(attribute) if element else None
 
+    # -- async: several personas in one browser ---------------------------------------
+
+    @classmethod
+    async def run_async(cls, personas, tabs=Config.LINKEDIN_TABS, headless=True):
+        """
+        Scrape several personas concurrently in a single browser, one tab per persona
+        and at most `tabs` at a time. The tabs share one logged-in context.
+
+        :param personas: List of persona dictionaries.
+        :param tabs: Number of personas processed at once.
+        :param headless: Whether to run the browser in headless mode.
+        :return: Total number of leads spooled.
+        """
+        get_rate_limit_manager().start_run()
+        session_store = SessionStore("linkedin")
+        semaphore = asyncio.Semaphore(tabs)
+        async with AsyncPlaywrightDriver(headless=headless, storage_state=session_store.load(),
+                                         har_name="linkedin-tabs") as driver:
+            await cls._ensure_session_async(driver, session_store, headless)
+
+            async def process(persona):
+                async with semaphore:
+                    return await cls(persona).run_in_tab(driver)
+
+            results = await asyncio.gather(*(process(persona) for persona in personas), return_exceptions=True)
+
+        for result in results:
+            if isinstance(result, BaseException):
+                # Let the orchestrator move on to healthy platforms
+                raise result
+        return sum(results)
+
+    @classmethod
+    async def run_sharded_async(cls, persona, tabs=Config.LINKEDIN_TABS, headless=True,
+                                cap=Config.LINKEDIN_RESULT_CAP):
+        """
+        Scrape a broad persona as disjoint shards that each stay under the result cap.
+
+        The persona's `sales_navigator_filters` are split by location, company size and
+        seniority (see `QueryPlanner`). Estimates and shard searches run in parallel tabs
+        of one browser, and the merged leads are deduplicated by profile URL before
+        they are saved.
+
+        :param persona: Persona dictionary with a `sales_navigator_filters` entry.
+        :param tabs: Number of searches run at once.
+        :param headless: Whether to run the browser in headless mode.
+        :param cap: Most results a single search returns.
+        :return: Number of leads spooled.
+        """
+        get_rate_limit_manager().start_run()
+        session_store = SessionStore("linkedin")
+        semaphore = asyncio.Semaphore(tabs)
+        async with AsyncPlaywrightDriver(headless=headless, storage_state=session_store.load(),
+                                         har_name=fixture_name("linkedin-shards", persona["name"])) as driver:
+            await cls._ensure_session_async(driver, session_store, headless)
+
+            async def estimate(filters):
+                async with semaphore:
+                    return await cls(shard_persona(persona, filters)).estimate_async(driver)
+
+            async def collect(shard):
+                async with semaphore:
+                    scraper = cls(shard_persona(persona, shard.filters))
+                    return scraper, await scraper.collect_in_tab(driver)
+
+            shards = await QueryPlanner(estimate, cap=cap).plan(persona["sales_navigator_filters"])
+            results = await asyncio.gather(*(collect(shard) for shard in shards), return_exceptions=True)
+
+        batches, scrapers, circuit_error = [], [], None
+        for shard, result in zip(shards, results):
+            if isinstance(result, CircuitOpenError):
+                circuit_error = circuit_error or result
+                continue
+            if isinstance(result, BaseException):
+                logger.error("Shard %s/%s of persona %s failed: %s", shard.filters.locations,
+                             [s.value for s in shard.filters.company_sizes], persona['name'], result)
+                continue
+            scraper, batch = result
+            scrapers.append(scraper)
+            batches.append(batch)
+
+        leads = merge_shard_leads(batches)
+        logger.info("Persona %s: %s unique leads from %s shards (%s before dedup).",
+                    persona['name'], len(leads), len(shards), sum(len(batch) for batch in batches))
+        if leads:
+            await asyncio.to_thread(cls(persona).save_to_database, leads)
+        # Only now are the healthy shards' leads safe, so their snapshots may mark them known
+        for scraper in scrapers:
+            scraper.commit_snapshot()
+        if circuit_error:
+            # Let the orchestrator move on to healthy platforms
+            raise circuit_error
+        return len(leads)
+
+    @staticmethod
+    async def _ensure_session_async(driver, session_store, headless):
+        """
+        Make sure the driver's shared context is logged in. A refresh goes through the
+        synchronous `ensure_authenticated` flow in a worker thread, then the shared
+        context is recreated from the refreshed storage state (cookies and local storage).
+        """
+        async with driver.page() as page:
+            if session_store.version() and await is_session_valid_async(page):
+                logger.info("Reusing persisted LinkedIn session.")
+                return
+
+        def refresh():
+            with PlaywrightDriver(headless=headless, storage_state=session_store.load(),
+                                  har_name="linkedin-login") as page:
+                ensure_authenticated(page, session_store)
+
+        await asyncio.to_thread(refresh)
+        await driver.use_storage_state(session_store.load())
+
+    async def run_in_tab(self, driver):
+        """
+        Scrape this scraper's persona in a new tab of `driver`.
+
+        :param driver: A started AsyncPlaywrightDriver.
+        :return: Number of leads spooled.
+        """
+        logger.info("Starting scraper for persona: %s...", self.persona['name'])
+        try:
+            leads = await self.collect_in_tab(driver)
+            if leads:
+                await asyncio.to_thread(self.save_to_database, leads)
+            else:
+                logger.warning("No leads found for persona: %s", self.persona['name'])
+            self.commit_snapshot()
+            return len(leads)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.exception("An error occurred while scraping for persona %s: %s", self.persona['name'], e)
+            return 0
+        finally:
+            logger.info("Scraper completed for persona: %s.", self.persona['name'])
+
+    async def collect_in_tab(self, driver):
+        """
+        Run this scraper's search in a new tab of `driver` and return the leads, unsaved.
+        The search's snapshot is kept in `pending_snapshot`; call `commit_snapshot` once
+        the leads are spooled, or later delta runs would skip leads that were never saved.
+
+        :param driver: A started AsyncPlaywrightDriver.
+        :return: LeadBatch of leads, from the search API responses or the DOM.
+        """
+        capture = ResponseCapture({SEARCH_API_PATTERN: parse_lead_search})
+        key = persona_key(self.persona)
+        delta = ResultDelta(self.snapshots.get(key))
+        leads = LeadBatch()
+        async with driver.page(capture) as page:
+            await self.navigate_to_search_async(page)
+            self.stale_cards = None
+            for page_number in range(1, self.max_pages + 1):
+                page_leads = self.captured_leads(await capture.collect_async())
+                if not page_leads:
+                    if self.stale_cards is not None:
+                        await wait_for_change_async(page, RESULT_SELECTOR, self.stale_cards,
+                                                    empty_selector=NO_RESULTS_SELECTOR)
+                    await wait_for_count_async(page, RESULT_SELECTOR, empty_selector=NO_RESULTS_SELECTOR)
+                    await wait_for_dom_quiet_async(page)
+                    page_leads = await self.extract_leads_async(page)
+                leads.extend(delta.add_page(page_leads))
+                if delta.done or page_number == self.max_pages or not await self.next_page_async(page):
+                    break
+        self.log_delta(delta, leads, page_number)
+        self.pending_snapshot = (key, delta.merged(), not delta.known)
+        return leads
+
+    def commit_snapshot(self):
+        """
+        Store the snapshot of the last `collect_in_tab`, once its leads are spooled.
+        """
+        if self.pending_snapshot is not None:
+            key, urls, full = self.pending_snapshot
+            self.snapshots.put(key, urls, full=full)
+            self.pending_snapshot = None
+
+    async def estimate_async(self, driver):
+        """
+        Estimate the result count of this scraper's search from the search API's paging total.
+
+        :param driver: A started AsyncPlaywrightDriver.
+        :return: Number of results, or None if the search API response was not seen.
+        """
+        async with driver.page() as page:
+            response = await self.navigate_to_search_async(page)
+            if response is None:
+                return None
+            try:
+                return (await response.json()).get("paging", {}).get("total")
+            except Exception as e:
+                logger.warning("Could not read the result count for persona %s: %s", self.persona['name'], e)
+                return None
+
+    async def navigate_to_search_async(self, page):
+        """
+        Async version of `navigate_to_search`. Pacing is shared across tabs.
+
+        :return: The search API response, or None if it did not arrive.
+        """
+        await goto_async(page, SEARCH_URL, budget=self.budget, wait_until="domcontentloaded")
+        await page.wait_for_selector(SEARCH_INPUT_SELECTOR, timeout=15000)
+        await asyncio.to_thread(self.pacer.pace)
+
+        await page.fill(SEARCH_INPUT_SELECTOR, self.persona.get("query", ""))
+        for filter_name, filter_value in self.persona.get("filters", {}).items():
+            try:
+                selector = self.get_filter_selector(filter_name)
+                if selector:
+                    await page.fill(selector, filter_value)
+            except Exception as e:
+                logger.warning("Failed to apply filter %s: %s", filter_name, e)
+
+        await asyncio.to_thread(self.pacer.pace)
+        return await expect_json_response_async(page, SEARCH_API_PATTERN, lambda: page.keyboard.press("Enter"))
+
+    async def next_page_async(self, page):
+        """
+        Async version of `next_page`.
+        """
+        button = await page.query_selector(NEXT_PAGE_SELECTOR)
+        if button is None or not await button.is_enabled():
+            return False
+        self.stale_cards = await content_signature_async(page, RESULT_SELECTOR)
+        await asyncio.to_thread(self.pacer.pace)
+        await expect_json_response_async(page, SEARCH_API_PATTERN, button.click)
+        return True
+
+    async def extract_leads_async(self, page):
+        """
+        Async version of `extract_leads` (DOM fallback).
+
+        :param page: Async Playwright page object.
+        :return: LeadBatch of extracted leads.
+        """
+        async def text(card, selector):
+            element = await card.query_selector(selector)
+            return (await element.inner_text()).strip() if element else ""
+
+        leads = LeadBatch()
+        for idx, card in enumerate(await page.query_selector_all(RESULT_SELECTOR)):
+            try:
+                name_link = await card.query_selector(".result-lockup__name a")
+                profile_url = await name_link.get_attribute("href") if name_link else None
+                if not profile_url:
+                    continue
+                first_name, last_name = self.split_name(await text(card, ".result-lockup__name a"))
+                leads.append(
+                    platform="linkedin",
+                    persona=self.persona['name'],
+                    first_name=first_name,
+                    last_name=last_name,
+                    job_title=await text(card, ".result-lockup__highlight"),
+                    company_name=await text(card, ".result-lockup__subtitle"),
+                    linkedin_url=lead_url(profile_url),
+                    cta=self.persona.get("cta", ""),
+                )
+            except Exception as e:
+                logger.warning("Failed to parse lead #%d: %s", idx + 1, e)
+        logger.info("Extracted %s leads.", len(leads))
+        return leads
+
     def save_to_database(self, leads):
         """
-        Save extracted leads to the database.
+        Append extracted leads to the local spool; the spool loader writes them to the database.
 
-        :param leads: List of lead dictionaries to save.
+        :param leads: LeadBatch of leads to save.
         """
-        logger.info("Saving leads to the database...")
-        with get_db_session() as session:
-            for lead in leads:
-                try:
-                    db_lead = Lead(**lead)
-                    session.add(db_lead)
-                except Exception as e:
-                    logger.warning(f"Failed to save lead to database: {e}")
-            session.commit()
-        logger.info("Database transaction completed successfully.")
+        logger.info("Spooling leads for the database loader...")
+        spooled = spool_leads(tag_leads(leads))
+        logger.info("Spooled %s leads.", spooled)
 
 
 # Example usage with dynamic personas
 if __name__ == "__main__":
+    from src.common.logging_setup import setup_logging
+    setup_logging()
     personas = [
         {
             "name": "Small Business Founders in AI Automation",
@@ -205,6 +663,4 @@ if __name__ == "__main__":
         }
     ]
 
-    for persona in personas:
-        scraper = LinkedInSalesNavigatorScraper(persona=persona)
-        scraper.run()
+    asyncio.run(LinkedInSalesNavigatorScraper.run_async(personas, tabs=2))
@@ -1,28 +1,43 @@
-import time
 import logging
-from src.common.playwright_driver import PlaywrightDriver
-from src.common.utils import random_delay
-from src.common.proxy_manager import ProxyManager
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
+from src.common.playwright_driver import PlaywrightDriver, ResponseCapture, goto
+from src.common.browser_waits import expect_json_response, wait_for_count, wait_for_dom_quiet
+from src.common.resilience import CircuitOpenError, RetryBudget
+from src.common.transport import fixture_name
+from src.database.lead_spool import spool_leads
+from src.scrapers.linkedin.persona_classifier import tag_leads
+from src.scrapers.linkedin.anti_detection import get_rate_limit_manager
+from src.scrapers.linkedin.scraper import (
+    NO_RESULTS_SELECTOR,
+    RESULT_SELECTOR,
+    SEARCH_API_PATTERN,
+    SEARCH_INPUT_SELECTOR,
+    SEARCH_URL,
+    lead_url,
+    parse_lead_search,
+)
+from src.common.lead_batch import LeadBatch
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class LinkedInSalesNavigatorScraper:
+    HOST = "www.linkedin.com"
+
     def __init__(self, query, location=None, industry=None, company_size=None):
         self.query = query
         self.location = location
         self.industry = industry
         self.company_size = company_size
-        self.proxy = ProxyManager.get_random_proxy()
 
     def run(self):
+        pacer = get_rate_limit_manager()
+        pacer.start_run()
+        capture = ResponseCapture({SEARCH_API_PATTERN: parse_lead_search})
         try:
-            with PlaywrightDriver(proxy=self.proxy, headless=True) as page:
-                page.goto("https://www.linkedin.com/sales/search/people")
-                page.fill("input[data-test-search-bar-input]", self.query)
+            with PlaywrightDriver(headless=True, capture=capture,
+                                  har_name=fixture_name("sales-navigator", self.query)) as page:
+                goto(page, SEARCH_URL, budget=RetryBudget(), wait_until="domcontentloaded")
+                page.wait_for_selector(SEARCH_INPUT_SELECTOR, timeout=15000)
+                page.fill(SEARCH_INPUT_SELECTOR, self.query)
 
                 # Fill in additional filters if provided
                 if self.location:
@@ -32,36 +47,42 @@ class LinkedInSalesNavigatorScraper:
                 if self.company_size:
                     page.fill("input[data-test-company-size-input]", self.company_size)
 
-                page.keyboard.press("Enter")
-                random_delay()
-
-                leads = []
-                result_cards = page.query_selector_all(".result-lockup")
-                for card in result_cards:
-                    first_name, last_name = self.parse_name(card)
-                    job_title = card.query_selector(".result-lockup__highlight").inner_text().strip()
-                    company_name = card.query_selector(".result-lockup__subtitle").inner_text().strip()
-                    profile_url = card.query_selector(".result-lockup__name a").get_attribute("href")
+                pacer.pace()
+                expect_json_response(page, SEARCH_API_PATTERN, lambda: page.keyboard.press("Enter"))
 
-                    leads.append({
-                        "platform": "linkedin",
-                        "first_name": first_name,
-                        "last_name": last_name,
-                        "job_title": job_title,
-                        "company_name": company_name,
-                        "linkedin_url": profile_url,
-                    })
+                # Prefer the results API payload; read the rendered cards only without it
+                leads = capture.collect()
+                if not leads:
+                    leads = self.extract_leads(page)
 
-                session = get_db_session()
-                for lead in leads:
-                    db_lead = Lead(**lead)
-                    session.add(db_lead)
-                session.commit()
-                session.close()
-                
-                time.sleep(2)  # Rate limiting to avoid detection
+                spool_leads(tag_leads(leads))
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.error(f"Error in LinkedInSalesNavigatorScraper: {e}")
+            logger.error("Error in LinkedInSalesNavigatorScraper: %s", e)
+
+    def extract_leads(self, page):
+        wait_for_count(page, RESULT_SELECTOR, empty_selector=NO_RESULTS_SELECTOR)
+        wait_for_dom_quiet(page)
+
+        leads = LeadBatch()
+        result_cards = page.query_selector_all(RESULT_SELECTOR)
+        for card in result_cards:
+            first_name, last_name = self.parse_name(card)
+            job_title = card.query_selector(".result-lockup__highlight").inner_text().strip()
+            company_name = card.query_selector(".result-lockup__subtitle").inner_text().strip()
+            profile_url = card.query_selector(".result-lockup__name a").get_attribute("href")
+
+            leads.append(
+                platform="linkedin",
+                first_name=first_name,
+                last_name=last_name,
+                job_title=job_title,
+                company_name=company_name,
+                linkedin_url=lead_url(profile_url),
+            )
+        return leads
 
     def parse_name(self, card):
         full_name = card.query_selector(".result-lockup__name a").inner_text().strip()
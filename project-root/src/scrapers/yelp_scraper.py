@@ -1,35 +1,56 @@
-import requests
 from bs4 import BeautifulSoup
-from src.database.db_manager import get_db_session
-from src.database.models import Lead
+from src.common.http_client import HttpClient
+from src.common.resilience import CircuitOpenError
+from src.database.lead_spool import spool_leads
+from src.workflows.pipeline import Pipeline
+from src.common.lead_batch import LeadBatch
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+RESULTS_PER_PAGE = 10
+
+
+def parse_search_page(html):
+    # Runs in a parse worker process, so it must stay a module-level function
+    soup = BeautifulSoup(html, 'html.parser')
+    leads = LeadBatch()
+    for business in soup.select('.businessName__09f24__3Ml2X'):
+        name = business.text.strip()
+        location = business.find_next('address').text.strip()
+
+        leads.append(
+            platform="yelp",
+            company_name=name,
+            location=location
+        )
+    return leads
+
+
 class YelpScraper:
-    def __init__(self, query):
+    HOST = "www.yelp.com"
+
+    def __init__(self, query, pages=1):
         self.query = query
+        self.pages = pages
+
+    def page_urls(self):
+        return [
+            f"https://www.yelp.com/search?find_desc={self.query}&start={page * RESULTS_PER_PAGE}"
+            for page in range(self.pages)
+        ]
 
     def run(self):
         try:
-            url = f"https://www.yelp.com/search?find_desc={self.query}"
-            r = requests.get(url)
-            soup = BeautifulSoup(r.text, 'html.parser')
-
-            session = get_db_session()
-            for business in soup.select('.businessName__09f24__3Ml2X'):
-                name = business.text.strip()
-                location = business.find_next('address').text.strip()
-
-                lead = Lead(
-                    platform="yelp",
-                    company_name=name,
-                    location=location
+            with HttpClient() as http:
+                pipeline = Pipeline(
+                    fetch=lambda url: http.get(url).text,
+                    parse=parse_search_page,
+                    write=spool_leads
                 )
-                session.add(lead)
-            session.commit()
-            session.close()
+                pipeline.run(self.page_urls())
+        except CircuitOpenError:
+            # Let the orchestrator move on to healthy platforms
+            raise
         except Exception as e:
-            logger.error(f"Error in YelpScraper: {e}") 
\ No newline at end of file
+            logger.error("Error in YelpScraper: %s", e)
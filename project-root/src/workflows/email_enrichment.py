@@ -0,0 +1,284 @@
+"""
+Domain-level email enrichment.
+
+Leads from LinkedIn, Clutch and Google Maps usually arrive without an email. Instead of
+looking up every person, leads are grouped by the domain of their `company_website`
+(or by company name when there is no website) and Hunter's domain search is called once
+per group. Results are kept in a persistent SQLite cache with a TTL, so API spend and
+latency grow with the number of new domains rather than the number of leads.
+
+Before any remote call, each domain's learned address pattern (see `email_patterns`) is
+tried; only domains without a confident pattern are looked up. Lookups for uncached
+domains run concurrently on a small thread pool, throttled by the Hunter client's rate
+limiter and capped by its per-run request quota. Emails matched to a lead by name, and
+pattern guesses that are not confident enough, are stored as "pending" for the batched
+validation stage (`email_validation`), so loading never waits on the validator.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.config import Config
+from src.apis.hunter import HunterClient, HunterQuotaExceeded
+from src.common.email_validator import EMAIL_PENDING
+from src.common.lead_batch import LeadBatch, LeadRow
+from src.database.lead_writer import save_leads
+from src.workflows.email_patterns import PatternIndex, normalize_domain
+
+logger = logging.getLogger(__name__)
+
+
+def _name_key(first_name: Optional[str], last_name: Optional[str]) -> Tuple[str, str]:
+    return ((first_name or "").strip().lower(), (last_name or "").strip().lower())
+
+
+def lookup_key(lead: LeadRow) -> Optional[str]:
+    """Return the cache key a lead is grouped under: its domain, else `company:<name>`."""
+    domain = normalize_domain(lead.get("company_website"))
+    if domain:
+        return domain
+    company = (lead.get("company_name") or "").strip().lower()
+    return f"company:{company}" if company else None
+
+
+def company_email(result: Dict[str, Any]) -> Optional[str]:
+    """
+    The address for a company lead with no person (e.g. from Clutch or Google Maps):
+    the most confident generic (role) address of a domain-search result, else its most
+    confident address.
+    """
+    emails = result.get("emails") or []
+    if not emails:
+        return None
+    best = max(emails, key=lambda email: (email.get("type") == "generic", email.get("confidence") or 0))
+    return best["value"]
+
+
+class DomainCache:
+    """
+    Persistent domain -> domain-search result cache backed by SQLite.
+
+    Attributes:
+        path (str): Database file path.
+        ttl (float): Seconds after which an entry is considered stale.
+    """
+
+    def __init__(self, path: str = Config.ENRICHMENT_CACHE_PATH, ttl: float = Config.ENRICHMENT_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS domains ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return the fresh cached results for `keys`; missing or stale keys are left out."""
+        keys = list(keys)
+        found: Dict[str, Dict[str, Any]] = {}
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, result FROM domains WHERE fetched_at >= ? AND key IN ({','.join('?' * len(chunk))})",
+                    [cutoff, *chunk],
+                ).fetchall()
+                found.update((key, json.loads(result)) for key, result in rows)
+        return found
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO domains (key, result, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmailEnricher:
+    """
+    Fills in missing emails on a `LeadBatch` with one Hunter lookup per domain.
+
+    Attributes:
+        client (HunterClient): Hunter API client (rate limited, with a request quota), or
+            None to rely on pattern inference only.
+        cache (DomainCache): Persistent cache of domain-search results.
+        concurrency (int): Number of domain lookups in flight at once.
+        patterns (PatternIndex): Per-domain email patterns, consulted before any remote call.
+    """
+
+    def __init__(self,
+                 client: Optional[HunterClient] = None,
+                 cache: Optional[DomainCache] = None,
+                 concurrency: int = Config.HUNTER_CONCURRENCY,
+                 patterns: Optional[PatternIndex] = None):
+        if client is None and Config.HUNTER_API_KEY:
+            client = HunterClient()
+        self.client = client
+        self.cache = cache or DomainCache()
+        self.concurrency = concurrency
+        self.patterns = patterns if patterns is not None else PatternIndex()
+
+    def _search(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            if key.startswith("company:"):
+                return self.client.domain_search(company=key[len("company:"):])
+            return self.client.domain_search(domain=key)
+        except HunterQuotaExceeded:
+            return None
+        except Exception as e:
+            logger.warning("Hunter domain search failed for %s: %s", key, e)
+            return None
+
+    def lookup(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Return domain-search results for `keys`, from the cache or fetched concurrently.
+
+        Keys that fail or fall outside the request quota are left out and not cached,
+        so they are retried on a later run.
+        """
+        keys = set(keys)
+        results = self.cache.get_many(keys)
+        missing = sorted(keys - results.keys())
+        if not missing:
+            return results
+        cached = len(results)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for key, result in zip(missing, executor.map(self._search, missing)):
+                if result is not None:
+                    self.cache.put(key, result)
+                    results[key] = result
+        logger.info("Looked up %d domains (%d cached), %d returned results.",
+                    len(missing), cached, len(results) - cached)
+        return results
+
+    def start_run(self) -> None:
+        """Start a new loader run, renewing the Hunter client's quota and retry budget."""
+        if self.client is not None:
+            self.client.start_run()
+
+    def enrich(self, batch: LeadBatch) -> LeadBatch:
+        """
+        Fill in `email` and `email_status` for leads that have no email, in place.
+
+        Leads whose domain has a confident pattern get the generated address with status
+        "inferred" and no remote call. The rest are grouped by domain for Hunter; emails
+        Hunter lists by name are used, and for everyone else the (now better informed)
+        pattern guess. Leads without a person's name get the company's address (see
+        `company_email`). All are stored "pending" unless the guess is confident, and
+        `PendingEmailValidator` settles their status later.
+
+        Returns:
+            The same batch.
+        """
+        groups: Dict[str, List[LeadRow]] = {}
+        inferred = 0
+        for lead in batch:
+            first_name, last_name = lead.get("first_name"), lead.get("last_name")
+            if lead.get("email"):
+                if lead.get("email_status") == "valid":
+                    self.patterns.observe(first_name, last_name, lead["email"],
+                                          normalize_domain(lead.get("company_website")))
+                continue
+            key = lookup_key(lead)
+            if not key:
+                continue
+            guess = None if key.startswith("company:") else self.patterns.guess(first_name, last_name, key)
+            if guess and guess[1] >= self.patterns.min_confidence:
+                lead["email"], lead["email_status"] = guess[0], "inferred"
+                inferred += 1
+            elif self.client is not None:
+                groups.setdefault(key, []).append(lead)
+        if not groups:
+            if inferred:
+                logger.info("Inferred %d emails from known domain patterns.", inferred)
+            return batch
+
+        results = self.lookup(groups)
+        pending = 0
+        for key, leads in groups.items():
+            result = results.get(key, {})
+            domain = result.get("domain") or (None if key.startswith("company:") else key)
+            website_domain = None if key.startswith("company:") else key
+            self.patterns.observe_pattern(domain, result.get("pattern"), website_domain)
+            emails = {}
+            for email in result.get("emails", []):
+                self.patterns.observe(email["first_name"], email["last_name"], email["value"], website_domain)
+                if email.get("first_name") and email.get("last_name"):
+                    emails[_name_key(email["first_name"], email["last_name"])] = email["value"]
+            for lead in leads:
+                first_name, last_name = lead.get("first_name"), lead.get("last_name")
+                if first_name or last_name:
+                    email = emails.get(_name_key(first_name, last_name))
+                else:
+                    email = company_email(result)
+                if email:
+                    lead["email"], lead["email_status"] = email, EMAIL_PENDING
+                    pending += 1
+                    continue
+                guess = self.patterns.guess(first_name, last_name, domain)
+                if guess and guess[1] >= self.patterns.min_confidence:
+                    lead["email"], lead["email_status"] = guess[0], "inferred"
+                    inferred += 1
+                elif guess:
+                    lead["email"], lead["email_status"] = guess[0], EMAIL_PENDING
+                    pending += 1
+
+        logger.info("Enriched %d of %d leads without an email (%d inferred from domain patterns, "
+                    "%d pending validation).", pending + inferred, inferred + sum(map(len, groups.values())),
+                    inferred, pending)
+        return batch
+
+
+_enricher: Optional[EmailEnricher] = None
+_enricher_lock = threading.Lock()
+
+
+def enrich_emails(batch: LeadBatch) -> LeadBatch:
+    """
+    Enrich a batch with the shared `EmailEnricher`, whose pattern index is learned from
+    the validated emails in the database. Without `HUNTER_API_KEY` only pattern
+    inference is used.
+    """
+    global _enricher
+    with _enricher_lock:
+        if _enricher is None:
+            try:
+                patterns = PatternIndex.from_database()
+            except Exception as e:
+                logger.warning("Could not learn email patterns from the database: %s", e)
+                patterns = PatternIndex()
+            _enricher = EmailEnricher(patterns=patterns)
+    return _enricher.enrich(batch)
+
+
+def start_enrichment_run() -> None:
+    """
+    Start a new run of the shared enricher, so `HUNTER_MAX_REQUESTS_PER_RUN` and the
+    retry budget apply per spool loader pass rather than per process.
+    """
+    with _enricher_lock:
+        if _enricher is not None:
+            _enricher.start_run()
+
+
+def save_enriched_leads(batch: LeadBatch) -> Tuple[int, int]:
+    """
+    Enrich a batch with emails and write it with `save_leads`. This is the write step of
+    every spool loader, in the orchestrator or standalone.
+    """
+    return save_leads(enrich_emails(batch))
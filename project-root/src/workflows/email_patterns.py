@@ -0,0 +1,212 @@
+"""
+Per-domain email pattern inference.
+
+Most companies use a single address format (first.last@, flast@, ...). The index learns
+each domain's format from validated emails already in `leads` and from the patterns
+Hunter reports, then generates the likely address for a new first/last name locally,
+with a confidence score. Only leads whose domain has no confident pattern need a remote
+lookup or validation call.
+
+Each domain is stored as one small counter array over the known `PATTERNS`, keyed by
+both the mail domain and the company website domain (they can differ, e.g. acme.io vs
+acme.com), so the index stays compact even with hundreds of thousands of domains.
+"""
+
+import re
+import logging
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Local-part templates, in Hunter's notation.
+PATTERNS: Tuple[str, ...] = (
+    "{first}.{last}",
+    "{f}{last}",
+    "{first}",
+    "{first}{last}",
+    "{first}_{last}",
+    "{f}.{last}",
+    "{first}{l}",
+    "{last}.{first}",
+    "{last}{f}",
+    "{first}-{last}",
+    "{last}",
+    "{f}{l}",
+    "{first}.{l}",
+    "{last}{first}",
+)
+_PATTERN_IDS = {pattern: i for i, pattern in enumerate(PATTERNS)}
+
+# Weight of a pattern reported by Hunter, in validated-email equivalents. A reported
+# pattern still needs one real email before it is trusted (see `PatternIndex.best`).
+HUNTER_PATTERN_WEIGHT = 4
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+
+
+def normalize_domain(website: Optional[str]) -> Optional[str]:
+    """Reduce a website URL ("https://www.acme.com/about") to its bare domain ("acme.com")."""
+    if not website:
+        return None
+    website = website.strip().lower()
+    if "//" not in website:
+        website = "//" + website
+    host = urlparse(website).hostname
+    if not host or "." not in host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lower-case a name and strip accents and punctuation ("José-Luis" -> "joseluis")."""
+    if not name:
+        return ""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM_RE.sub("", ascii_name.lower())
+
+
+def render(pattern: str, first_name: Optional[str], last_name: Optional[str]) -> Optional[str]:
+    """Render a local part from a pattern, or None if the pattern needs a missing name."""
+    first, last = normalize_name(first_name), normalize_name(last_name)
+    if ("{first}" in pattern or "{f}" in pattern) and not first:
+        return None
+    if ("{last}" in pattern or "{l}" in pattern) and not last:
+        return None
+    return pattern.format(first=first, last=last, f=first[:1], l=last[:1])
+
+
+def match_patterns(first_name: Optional[str], last_name: Optional[str], local_part: str) -> List[int]:
+    """Return the ids of every pattern that renders `local_part` for this name."""
+    local_part = local_part.lower()
+    return [i for i, pattern in enumerate(PATTERNS) if render(pattern, first_name, last_name) == local_part]
+
+
+class PatternIndex:
+    """
+    Thread-safe map of domain -> pattern counts.
+
+    Attributes:
+        min_confidence (float): Confidence at or above which a guess can be used as-is.
+    """
+
+    def __init__(self, min_confidence: float = Config.EMAIL_PATTERN_MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self._counts: Dict[str, array] = {}
+        self._mail_domains: Dict[str, str] = {}
+        self._confirmed: Dict[str, int] = {}  # Domain -> bitmask of patterns seen in a real email
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def _add(self, domain: str, pattern_id: int, weight: int, mail_domain: str,
+             website_domain: Optional[str] = None, confirmed: bool = False) -> None:
+        with self._lock:
+            for key in {domain, website_domain} - {None}:
+                counts = self._counts.get(key)
+                if counts is None:
+                    counts = self._counts[key] = array("I", bytes(4 * len(PATTERNS)))
+                counts[pattern_id] += weight
+                self._mail_domains.setdefault(key, mail_domain)
+                if confirmed:
+                    self._confirmed[key] = self._confirmed.get(key, 0) | (1 << pattern_id)
+
+    def observe(self, first_name: Optional[str], last_name: Optional[str], email: Optional[str],
+                website_domain: Optional[str] = None) -> bool:
+        """
+        Learn from one validated email. Ambiguous local parts (matching several patterns,
+        e.g. when first and last name are the same) are skipped.
+
+        Returns:
+            Whether the email taught the index anything.
+        """
+        if not email or "@" not in email:
+            return False
+        local_part, _, mail_domain = email.strip().lower().rpartition("@")
+        matches = match_patterns(first_name, last_name, local_part)
+        if len(matches) != 1:
+            return False
+        self._add(mail_domain, matches[0], 1, mail_domain, website_domain, confirmed=True)
+        return True
+
+    def observe_pattern(self, domain: str, pattern: Optional[str], website_domain: Optional[str] = None,
+                        weight: int = HUNTER_PATTERN_WEIGHT) -> bool:
+        """Learn a domain-wide pattern reported by an API such as Hunter's domain search."""
+        pattern_id = _PATTERN_IDS.get(pattern or "")
+        if pattern_id is None or not domain:
+            return False
+        self._add(domain.lower(), pattern_id, weight, domain.lower(), website_domain)
+        return True
+
+    def best(self, domain: Optional[str]) -> Optional[Tuple[str, float, str]]:
+        """
+        Return `(pattern, confidence, mail_domain)` for the domain's most common pattern.
+
+        Confidence is the pattern's share of observations with one pseudo-count of doubt
+        added, so a single example gives 0.5 and four agreeing examples give 0.8. A pattern
+        no real email has confirmed yet (only reported by an API) is capped at 0.5, so it
+        is never used without validation however heavily it is weighted.
+        """
+        if not domain:
+            return None
+        with self._lock:
+            counts = self._counts.get(domain.lower())
+            if counts is None:
+                return None
+            best_id = max(range(len(PATTERNS)), key=counts.__getitem__)
+            confidence = counts[best_id] / (sum(counts) + 1)
+            if not self._confirmed.get(domain.lower(), 0) >> best_id & 1:
+                confidence = min(confidence, 0.5)
+            return PATTERNS[best_id], confidence, self._mail_domains[domain.lower()]
+
+    def guess(self, first_name: Optional[str], last_name: Optional[str],
+              domain: Optional[str]) -> Optional[Tuple[str, float]]:
+        """
+        Generate the likely email for a person at a domain.
+
+        Returns:
+            `(email, confidence)`, or None if the domain has no known pattern or the
+            pattern needs a name part the lead lacks.
+        """
+        best = self.best(domain)
+        if best is None:
+            return None
+        pattern, confidence, mail_domain = best
+        local_part = render(pattern, first_name, last_name)
+        if not local_part:
+            return None
+        return f"{local_part}@{mail_domain}", confidence
+
+    @classmethod
+    def from_database(cls, session=None, min_confidence: float = Config.EMAIL_PATTERN_MIN_CONFIDENCE,
+                      statuses: Iterable[str] = ("valid",)) -> "PatternIndex":
+        """
+        Build an index from every lead in the database with a validated email.
+
+        Args:
+            session: SQLAlchemy session. A new one is opened (and closed) if omitted.
+            statuses (iterable): `email_status` values that count as validated.
+        """
+        from src.database.db_manager import get_db_session
+        from src.database.models import Lead
+
+        index = cls(min_confidence)
+        own_session = session is None
+        session = session or get_db_session()
+        try:
+            rows = (session.query(Lead.first_name, Lead.last_name, Lead.email, Lead.company_website)
+                    .filter(Lead.email.isnot(None), Lead.email_status.in_(list(statuses)))
+                    .yield_per(5000))
+            learned = sum(index.observe(first, last, email, normalize_domain(website))
+                          for first, last, email, website in rows)
+        finally:
+            if own_session:
+                session.close()
+        logger.info("Learned email patterns for %d domains from %d validated emails.", len(index), learned)
+        return index
@@ -0,0 +1,141 @@
+"""
+Email validation as a separate, batched stage.
+
+Scrapers store emails with `email_status = "pending"` instead of calling the validator
+inline, so ingest speed depends only on the source platform. This stage picks pending
+leads from the database in batches, validates them concurrently and writes the results
+back with one bulk UPDATE per batch, together with the change to `lead_aggregates` and
+the validated leads' entries in `webhook_outbox`. Leads whose email changed while it was
+being validated, or whose validation call failed (e.g. the validator is down), are left
+pending for the next pass.
+Run it after loading the spool, or continuously with `python -m src.workflows.email_validation`.
+"""
+
+import time
+import logging
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from src.config.config import Config
+from src.common.email_validator import EMAIL_PENDING, validate_email
+from src.common.http_client import HttpClient
+from src.database.db_manager import get_db_session
+from src.database.lead_aggregates import AggregateDelta
+from src.database.lead_writer import CONTENT_COLUMNS, queue_webhooks
+from src.database.models import Lead
+
+logger = logging.getLogger(__name__)
+
+
+class PendingEmailValidator:
+    """
+    Validates pending emails in the `leads` table.
+
+    Attributes:
+        validate (callable): `validate(email, http) -> {"status": ...}`, given one
+            `HttpClient` per batch.
+        batch_size (int): Leads validated and updated per batch.
+        concurrency (int): Validation calls in flight at once.
+    """
+
+    def __init__(self,
+                 validate: Callable[[str, HttpClient], Dict] = validate_email,
+                 batch_size: int = 200,
+                 concurrency: int = Config.EMAIL_VALIDATION_CONCURRENCY):
+        self.validate = validate
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+    def _status(self, http: HttpClient, email: str) -> Optional[str]:
+        """The validator's status for `email`, or None if no answer came back."""
+        try:
+            return self.validate(email, http).get("status") or "unknown"
+        except Exception as e:
+            logger.warning("Validation failed for %s: %s", email, e)
+            return None
+
+    def run_once(self, limit: Optional[int] = None) -> int:
+        """
+        Make one pass over the pending emails (or the first `limit` of them). Emails the
+        validator gave no answer for stay pending for the next pass, and the pass stops
+        early when a whole batch went unanswered.
+
+        Returns:
+            The number of emails validated.
+        """
+        validated, seen, last_id = 0, 0, 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while limit is None or seen < limit:
+                size = self.batch_size if limit is None else min(self.batch_size, limit - seen)
+                session = get_db_session()
+                try:
+                    pending = (session.query(Lead.id, Lead.email)
+                               .filter(Lead.email_status == EMAIL_PENDING, Lead.email.isnot(None),
+                                       Lead.id > last_id)
+                               .order_by(Lead.id)
+                               .limit(size)
+                               .all())
+                    if not pending:
+                        break
+                    session.rollback()  # Hold no snapshot or locks while validating
+                    emails = dict(pending)
+                    last_id, seen = pending[-1][0], seen + len(pending)
+                    # One client per batch, so each batch gets a fresh retry budget
+                    with HttpClient(use_proxies=False) as http:
+                        statuses = executor.map(lambda email: self._status(http, email), emails.values())
+                        results = {lead_id: status for lead_id, status in zip(emails, statuses)
+                                   if status is not None}
+                    if not results:
+                        logger.warning("No validation results for a batch of %d emails; "
+                                       "leaving them pending until the next pass.", len(emails))
+                        break
+                    # Re-read under lock: a concurrent save_leads may have changed the email (or
+                    # the status) meanwhile, and that lead's result no longer applies.
+                    locked = (session.query(Lead).filter(Lead.id.in_(results))
+                              .order_by(Lead.id).with_for_update().all())
+                    rows, statuses = [], []
+                    for row in locked:
+                        if row.email_status == EMAIL_PENDING and row.email == emails[row.id]:
+                            rows.append(row)
+                            statuses.append(results[row.id])
+                    session.bulk_update_mappings(Lead, [
+                        {"id": row.id, "email_status": status}
+                        for row, status in zip(rows, statuses)
+                    ])
+                    delta = AggregateDelta()
+                    validated_rows = []
+                    for row, status in zip(rows, statuses):
+                        lead = {column: getattr(row, column) for column in CONTENT_COLUMNS}
+                        lead.update(lead_key=row.lead_key, content_hash=row.content_hash, first_seen=row.first_seen)
+                        delta.add(lead, -1)
+                        lead["email_status"] = status
+                        delta.add(lead)
+                        validated_rows.append(lead)
+                    delta.apply(session)
+                    queue_webhooks(session, validated_rows, datetime.now(timezone.utc).replace(tzinfo=None))
+                    session.commit()
+                    validated += len(rows)
+                except Exception:
+                    session.rollback()
+                    raise
+                finally:
+                    session.close()
+        if validated:
+            logger.info("Validated %d pending emails.", validated)
+        return validated
+
+    def run_forever(self, poll_interval: float = 10.0) -> None:
+        """Keep validating new pending emails as they arrive."""
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Email validation pass failed: %s", e)
+            time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    from src.common.logging_setup import setup_logging
+    setup_logging()
+    PendingEmailValidator().run_forever()
@@ -1,23 +1,61 @@
+from src.config.config import Config
+from src.scrapers.apollo_scraper import ApolloScraper
+from src.scrapers.clutch_scraper import ClutchScraper
+from src.scrapers.google_maps_scraper import GoogleMapsScraper
+from src.scrapers.linkedin import IndustryPersonas
+from src.scrapers.linkedin.scraper import LinkedInSalesNavigatorScraper as PersonaScraper, shard_persona
 from src.scrapers.linkedin_sales_navigator_scraper import LinkedInSalesNavigatorScraper
-from src.common.utils import deduplicate_records
-from src.database.db_manager import get_db_session
+from src.scrapers.yelp_scraper import YelpScraper
+from src.database.lead_spool import SpoolLoader
+from src.workflows.email_validation import PendingEmailValidator
+from src.workflows.scheduler import YieldScheduler
+from src.workflows.webhook_delivery import WebhookDelivery
+import logging
 
-# Import other scrapers as needed
+logger = logging.getLogger(__name__)
+
+QUERY = "AI Solutions"
+
+
+def build_jobs():
+    """
+    Every scraper job the scheduler chooses between: one per predefined LinkedIn persona
+    and one per platform for `QUERY`. API scrapers are left out without their API key.
+    """
+    jobs = [PersonaScraper(shard_persona(persona, persona["sales_navigator_filters"]))
+            for persona in IndustryPersonas.all_personas()]
+    jobs += [LinkedInSalesNavigatorScraper(query=QUERY), ClutchScraper(QUERY), YelpScraper(QUERY)]
+    if Config.APOLLO_API_KEY:
+        jobs.append(ApolloScraper(QUERY))
+    if Config.GOOGLE_MAPS_API_KEY:
+        jobs.append(GoogleMapsScraper(QUERY))
+    return jobs
 
 
 def run_full_pipeline():
-    # LinkedIn Scraper
-    linkedin = LinkedInSalesNavigatorScraper(query="AI Solutions")
-    linkedin.run()
+    # Slots go to the jobs with the most new leads per second, within the daily budgets
+    YieldScheduler().run(build_jobs())
 
-    # TODO: Add other scrapers like Apollo, Clutch, Yelp, Google Maps
+    # Load everything the scrapers spooled. Deduplication happens at insert time (upsert on
+    # lead_key). If the DB is unavailable the leads stay in the spool for the next run or
+    # for a standalone loader (`python -m src.database.lead_spool`). Leads without an email
+    # are enriched with one Hunter domain search per company on the way in.
+    try:
+        loaded = SpoolLoader().run_once()
+        logger.info("Loaded %d spooled leads into the database.", loaded)
+    except Exception as e:
+        logger.error("Spooled leads not loaded, will retry on next run: %s", e)
 
-    # Deduplication logic if not done already
-    session = get_db_session()
-    leads = session.query().from_statement("SELECT * FROM leads").all()  # Example only; adjust as needed
-    unique_leads = deduplicate_records(leads, "email")
-    # This would require either re-inserting unique leads into another table or adjusting logic.
-    # For demonstration, assume already handled at insert time.
-    session.close()
+    # Validate emails stored as pending, outside the scrapers' ingest path
+    try:
+        PendingEmailValidator().run_once()
+    except Exception as e:
+        logger.error("Email validation pass failed, pending emails kept for next run: %s", e)
 
-    # Possibly trigger n8n workflow here, or output to Google Sheets/Airtable 
\ No newline at end of file
+    # Push new and changed leads to downstream automation (n8n etc.) in batches. Undelivered
+    # batches stay in the outbox for the next run or a standalone worker
+    # (`python -m src.workflows.webhook_delivery`).
+    try:
+        WebhookDelivery().run_once()
+    except Exception as e:
+        logger.error("Webhook delivery failed, leads kept in the outbox for next run: %s", e)
@@ -0,0 +1,190 @@
+"""
+A generic staged fetch -> parse -> write pipeline.
+
+- Fetch: network I/O, run concurrently on an asyncio event loop (the blocking `HttpClient`
+  calls run in worker threads so they keep their retries, circuit breakers and proxies).
+- Parse: CPU-heavy parsing (e.g. BeautifulSoup) runs in a `ProcessPoolExecutor`, so it uses
+  every core and never blocks the network I/O. The pool never has more processes than
+  there are items, and a single item is parsed in a thread without starting a pool.
+- Write: records are collected into batches and written by a single writer, so a slow DB
+  commit only delays writing, not fetching.
+
+Stages are linked by bounded queues. When a downstream stage falls behind, the queue in
+front of it fills up and the upstream stage waits, so the slowest stage sets the throughput
+and memory stays bounded.
+"""
+
+import os
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List, Optional, Sized
+
+from src.common.logging_setup import worker_logging
+from src.common.resilience import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class PipelineStats:
+    """Counters collected during a pipeline run."""
+    fetched: int = 0
+    parsed: int = 0
+    written: int = 0
+    batches: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+
+class Pipeline:
+    """
+    Runs work items through fetch, parse and write stages.
+
+    Attributes:
+        fetch (callable): `fetch(item) -> payload`. Blocking I/O, run in threads.
+        parse (callable): `parse(payload) -> records`, where records is a list or a
+            `LeadBatch`. Must be a picklable module-level function, as it runs in
+            worker processes.
+        write (callable): `write(records)`. Receives batches of up to `write_batch_size`,
+            of the same type `parse` returns.
+        fetch_concurrency (int): Maximum fetches in flight.
+        parse_workers (int): Number of parse processes. Defaults to the CPU count, and
+            is capped at the number of items when it is known.
+        queue_size (int): Capacity of each inter-stage queue.
+        write_batch_size (int): Records per write batch.
+    """
+
+    def __init__(self,
+                 fetch: Callable[[Any], Any],
+                 parse: Callable[[Any], List[Any]],
+                 write: Callable[[List[Any]], None],
+                 fetch_concurrency: int = 8,
+                 parse_workers: Optional[int] = None,
+                 queue_size: int = 32,
+                 write_batch_size: int = 200):
+        self.fetch = fetch
+        self.parse = parse
+        self.write = write
+        self.fetch_concurrency = fetch_concurrency
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.write_batch_size = write_batch_size
+
+    def run(self, items: Iterable[Any]) -> PipelineStats:
+        """
+        Run every item through the pipeline and block until all records are written.
+
+        Raises:
+            CircuitOpenError: If any fetch was shed by an open circuit breaker, after
+                everything fetched so far has been parsed and written.
+        """
+        return asyncio.run(self.run_async(items))
+
+    async def run_async(self, items: Iterable[Any]) -> PipelineStats:
+        stats = PipelineStats()
+        started = time.perf_counter()
+        circuit_error: List[CircuitOpenError] = []
+
+        parse_concurrency = self.parse_workers or os.cpu_count() or 1
+        if isinstance(items, Sized):
+            parse_concurrency = max(1, min(parse_concurrency, len(items)))
+        if isinstance(items, Sized) and len(items) <= 1:
+            # Starting worker processes would cost more than the parse itself
+            executor = nullcontext(None)
+        else:
+            initializer, initargs = worker_logging()
+            executor = ProcessPoolExecutor(max_workers=parse_concurrency, initializer=initializer, initargs=initargs)
+        with executor as pool:
+            items_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+            fetched_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+            parsed_q: asyncio.Queue = asyncio.Queue(self.queue_size)
+            loop = asyncio.get_running_loop()
+
+            async def feed() -> None:
+                for item in items:
+                    await items_q.put(item)
+                for _ in range(self.fetch_concurrency):
+                    await items_q.put(_DONE)
+
+            async def fetch_worker() -> None:
+                while (item := await items_q.get()) is not _DONE:
+                    if circuit_error:
+                        continue  # Host is shedding load; drain the remaining items.
+                    try:
+                        payload = await asyncio.to_thread(self.fetch, item)
+                    except CircuitOpenError as e:
+                        circuit_error.append(e)
+                        continue
+                    except Exception as e:
+                        self._record_failure(stats, "fetch", item, e)
+                        continue
+                    stats.fetched += 1
+                    await fetched_q.put(payload)
+
+            async def parse_worker() -> None:
+                while (payload := await fetched_q.get()) is not _DONE:
+                    try:
+                        records = await loop.run_in_executor(pool, self.parse, payload)
+                    except Exception as e:
+                        self._record_failure(stats, "parse", None, e)
+                        continue
+                    stats.parsed += len(records)
+                    if records:
+                        await parsed_q.put(records)
+
+            async def writer() -> None:
+                batch = None
+                while (records := await parsed_q.get()) is not _DONE:
+                    if batch is None:
+                        batch = records
+                    else:
+                        batch.extend(records)
+                    while len(batch) >= self.write_batch_size:
+                        await self._flush(batch[:self.write_batch_size], stats)
+                        batch = batch[self.write_batch_size:]
+                if batch:
+                    await self._flush(batch, stats)
+
+            async def close_after(tasks: List[asyncio.Task], queue: asyncio.Queue, count: int) -> None:
+                await asyncio.gather(*tasks)
+                for _ in range(count):
+                    await queue.put(_DONE)
+
+            fetchers = [asyncio.create_task(fetch_worker()) for _ in range(self.fetch_concurrency)]
+            parsers = [asyncio.create_task(parse_worker()) for _ in range(parse_concurrency)]
+            await asyncio.gather(
+                feed(),
+                close_after(fetchers, fetched_q, parse_concurrency),
+                close_after(parsers, parsed_q, 1),
+                writer(),
+            )
+
+        stats.elapsed = time.perf_counter() - started
+        logger.info("Pipeline finished in %.2fs: fetched=%d parsed=%d written=%d in %d batches, failed=%d.",
+                    stats.elapsed, stats.fetched, stats.parsed, stats.written, stats.batches, stats.failed)
+        if circuit_error:
+            raise circuit_error[0]
+        return stats
+
+    async def _flush(self, batch: List[Any], stats: PipelineStats) -> None:
+        try:
+            await asyncio.to_thread(self.write, batch)
+        except Exception as e:
+            self._record_failure(stats, "write", f"batch of {len(batch)}", e)
+            return
+        stats.written += len(batch)
+        stats.batches += 1
+
+    @staticmethod
+    def _record_failure(stats: PipelineStats, stage: str, item: Any, error: Exception) -> None:
+        stats.failed += 1
+        message = f"{stage} failed for {item}: {error}" if item is not None else f"{stage} failed: {error}"
+        stats.errors.append(message)
+        logger.warning(message)
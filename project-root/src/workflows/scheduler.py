@@ -0,0 +1,252 @@
+"""
+Yield-aware scheduling of scraper jobs under a daily compute budget.
+
+Personas and platform queries differ a lot in how many *new* leads a minute of browser
+or API time buys. `YieldScheduler` records every job run in the `job_stats` table: its
+duration, its requests and its new unique leads, i.e. spooled leads that were neither
+stored before nor seen earlier in the run. It then hands out the next slot (one
+`run()` of a job) with a UCB1 bandit over new leads per second:
+
+    score = rate / best_rate + exploration * sqrt(ln(total_runs) / runs)
+
+Jobs never run before go first. After that, high-yield jobs get most slots and the
+rest are still retried now and then. Each `run()` gives a job at most one slot, since
+re-running the same search straight away finds nothing new; the exception is a job
+deferred by an open circuit breaker, which keeps its slot. A deferred run is not a
+sample of the job's yield, so it is neither learned from nor saved to `job_stats` (and
+does not count toward its runs per day). A job is only eligible while
+these budgets have room left:
+- the daily budget (`SCHEDULER_DAILY_BUDGET` seconds),
+- its platform's daily budget (`SCHEDULER_PLATFORM_BUDGETS`),
+- its runs per day (`SCHEDULER_MAX_RUNS_PER_JOB`).
+
+Budgets are checked before a slot starts, so the last job of a budget may overrun it
+by one run. Jobs whose host has an open circuit breaker wait until it allows a trial
+call, for at most `max_wait` seconds.
+"""
+
+import math
+import time
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from src.config.config import Config
+from src.common.job_stats import JobRecorder
+from src.common.profiling import active_profiler
+from src.common.resilience import CircuitOpenError, host_available
+from src.database.db_manager import get_db_session
+from src.database.lead_writer import known_lead_keys, lead_key
+from src.database.models import JobStat
+
+logger = logging.getLogger(__name__)
+
+
+def job_name(scraper) -> str:
+    """Name a job by scraper class and persona or query, e.g. "ApolloScraper:AI Solutions"."""
+    persona = getattr(scraper, "persona", None)
+    label = persona.get("name") if isinstance(persona, dict) else getattr(scraper, "query", None)
+    return f"{type(scraper).__name__}:{label}" if label else type(scraper).__name__
+
+
+def job_platform(scraper) -> str:
+    return getattr(scraper, "HOST", None) or "local"
+
+
+@dataclass
+class JobArm:
+    """Yield history of one job, as seen by the bandit."""
+    runs: int = 0
+    duration: float = 0.0
+    new_leads: int = 0
+    requests: int = 0
+    runs_today: int = 0
+
+    @property
+    def rate(self) -> float:
+        """New leads per second of job time."""
+        return self.new_leads / self.duration if self.duration > 0 else 0.0
+
+    def add(self, recorder: JobRecorder, new_leads: int) -> None:
+        self.runs += 1
+        self.runs_today += 1
+        self.duration += recorder.duration
+        self.new_leads += new_leads
+        self.requests += recorder.requests
+
+
+class YieldScheduler:
+    """
+    Runs scraper jobs, favouring those with the most new leads per second.
+
+    Attributes:
+        daily_budget (float): Seconds of job time per UTC day, across all platforms.
+        platform_budgets (dict): Host -> seconds per UTC day.
+        max_runs_per_job (int): Runs of one job per UTC day.
+        exploration (float): Weight of the UCB exploration term.
+        history_days (int): Days of `job_stats` the policy learns from.
+        max_wait (float): Longest wait, in seconds, for circuit breakers to close.
+    """
+
+    def __init__(self,
+                 daily_budget: float = Config.SCHEDULER_DAILY_BUDGET,
+                 platform_budgets: Optional[Dict[str, float]] = None,
+                 max_runs_per_job: int = Config.SCHEDULER_MAX_RUNS_PER_JOB,
+                 exploration: float = Config.SCHEDULER_EXPLORATION,
+                 history_days: int = Config.SCHEDULER_HISTORY_DAYS,
+                 max_wait: float = 300):
+        self.daily_budget = daily_budget
+        self.platform_budgets = Config.SCHEDULER_PLATFORM_BUDGETS if platform_budgets is None else platform_budgets
+        self.max_runs_per_job = max_runs_per_job
+        self.exploration = exploration
+        self.history_days = history_days
+        self.max_wait = max_wait
+        self.arms: Dict[str, JobArm] = {}
+        self.spent: Dict[str, float] = {}  # Platform -> seconds used today
+        self.seen = set()  # Lead keys found earlier in this run
+        self.done = set()  # Jobs that have had their slot in this run
+
+    # -- history ------------------------------------------------------------------------
+
+    def load_history(self) -> None:
+        """Load per-job yield and today's spending from `job_stats`."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        session = get_db_session()
+        try:
+            rows = (session.query(JobStat.job, func.count(JobStat.id), func.sum(JobStat.duration),
+                                  func.sum(JobStat.new_leads), func.sum(JobStat.requests))
+                    .filter(JobStat.started_at >= now - timedelta(days=self.history_days))
+                    .group_by(JobStat.job).all())
+            for job, runs, duration, new_leads, requests in rows:
+                self.arms[job] = JobArm(runs, duration or 0.0, new_leads or 0, requests or 0)
+            for job, runs in (session.query(JobStat.job, func.count(JobStat.id))
+                              .filter(JobStat.started_at >= today).group_by(JobStat.job)):
+                self.arms.setdefault(job, JobArm()).runs_today = runs
+            for platform, duration in (session.query(JobStat.platform, func.sum(JobStat.duration))
+                                       .filter(JobStat.started_at >= today).group_by(JobStat.platform)):
+                self.spent[platform] = duration or 0.0
+        except Exception as e:
+            logger.warning("Job stats unavailable, scheduling without history: %s", e)
+        finally:
+            session.close()
+
+    def _save(self, name: str, platform: str, started_at: datetime, recorder: JobRecorder, new_leads: int) -> None:
+        session = get_db_session()
+        try:
+            session.add(JobStat(job=name, platform=platform, started_at=started_at, duration=recorder.duration,
+                                requests=recorder.requests, leads=recorder.leads, new_leads=new_leads))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning("Job stats for %s not saved: %s", name, e)
+        finally:
+            session.close()
+
+    # -- policy -------------------------------------------------------------------------
+
+    def score(self, name: str) -> float:
+        """UCB1 score of a job: normalised yield plus an exploration bonus."""
+        arm = self.arms.get(name)
+        if arm is None or arm.runs == 0:
+            return math.inf
+        total_runs = sum(a.runs for a in self.arms.values())
+        best_rate = max(a.rate for a in self.arms.values()) or 1.0
+        return arm.rate / best_rate + self.exploration * math.sqrt(math.log(total_runs) / arm.runs)
+
+    def eligible(self, scraper) -> bool:
+        """Whether the job's run and platform budgets still have room."""
+        platform = job_platform(scraper)
+        arm = self.arms.get(job_name(scraper))
+        if arm is not None and arm.runs_today >= self.max_runs_per_job:
+            return False
+        budget = self.platform_budgets.get(platform)
+        return budget is None or self.spent.get(platform, 0.0) < budget
+
+    def choose(self, scrapers: List) -> Optional[object]:
+        """Pick the ready job with the best score; ties go to the earliest listed."""
+        ready = [scraper for scraper in scrapers if host_available(job_platform(scraper))]
+        if not ready:
+            return None
+        return max(ready, key=lambda scraper: self.score(job_name(scraper)))
+
+    # -- running ------------------------------------------------------------------------
+
+    def _new_leads(self, recorder: JobRecorder) -> int:
+        keys = {lead_key(lead) for batch in recorder.batches for lead in batch}
+        fresh = keys - self.seen
+        self.seen |= keys
+        if fresh:
+            try:
+                fresh -= known_lead_keys(fresh)
+            except Exception as e:
+                logger.warning("Could not check stored leads, counting %d unseen as new: %s", len(fresh), e)
+        return len(fresh)
+
+    def run_job(self, scraper) -> int:
+        """
+        Run one slot of a job, record its yield and return its new leads. The job is
+        marked done for this run unless a circuit breaker deferred it; a deferred run
+        only counts toward the platform's time spent.
+        """
+        name, platform = job_name(scraper), job_platform(scraper)
+        self.done.add(name)
+        started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        deferred = False
+        with JobRecorder(name) as recorder:
+            try:
+                profiler = active_profiler()
+                if profiler:
+                    runs = sum(arm.runs for arm in self.arms.values()) + 1
+                    profiler.profile_call(f"{runs:02d}-{type(scraper).__name__}", scraper.run)
+                else:
+                    scraper.run()
+            except CircuitOpenError as e:
+                logger.warning("%s deferred: %s", name, e)
+                self.done.discard(name)
+                deferred = True
+        new_leads = self._new_leads(recorder)
+        self.spent[platform] = self.spent.get(platform, 0.0) + recorder.duration
+        if deferred:
+            return new_leads
+        self.arms.setdefault(name, JobArm()).add(recorder, new_leads)
+        self._save(name, platform, started_at, recorder, new_leads)
+        per_request = new_leads / recorder.requests if recorder.requests else 0.0
+        logger.info("%s: %d new of %d leads in %.1fs (%.2f/s, %.2f/request).", name, new_leads,
+                    recorder.leads, recorder.duration, new_leads / max(recorder.duration, 1e-9), per_request)
+        return new_leads
+
+    def run(self, scrapers: Iterable) -> int:
+        """
+        Give each of `scrapers` one slot, best score first, until the daily budget is spent
+        or no job is eligible.
+
+        Returns:
+            int: New leads found in this run.
+        """
+        scrapers = list(scrapers)
+        self.done = set()
+        self.load_history()
+        new_leads = 0
+        blocked_since = None
+        while sum(self.spent.values()) < self.daily_budget:
+            candidates = [scraper for scraper in scrapers
+                          if job_name(scraper) not in self.done and self.eligible(scraper)]
+            if not candidates:
+                break
+            scraper = self.choose(candidates)
+            if scraper is None:
+                # Every eligible job's host is shedding load; wait for the first breaker.
+                blocked_since = blocked_since or time.monotonic()
+                if time.monotonic() - blocked_since > self.max_wait:
+                    logger.error("Stopping: every eligible platform unavailable for over %ss.", self.max_wait)
+                    break
+                time.sleep(1)
+                continue
+            blocked_since = None
+            new_leads += self.run_job(scraper)
+        logger.info("Scheduler finished: %d new leads, %.0fs of %.0fs daily budget used.",
+                    new_leads, sum(self.spent.values()), self.daily_budget)
+        return new_leads
@@ -0,0 +1,262 @@
+"""
+Batched delivery of new and changed leads to downstream webhooks (n8n, Zapier, ...).
+
+`save_leads` queues every lead it writes in `webhook_outbox`, once per URL in
+`WEBHOOK_URLS`, in the same transaction as the write (a transactional outbox). This
+stage drains the outbox:
+
+- Due leads are packed into batches of at most `WEBHOOK_MAX_BATCH_LEADS` leads and
+  `WEBHOOK_MAX_BATCH_BYTES` of JSON, and each batch is POSTed gzip-compressed as
+  `{"batch_id": ..., "leads": [...]}`.
+- A batch's id is stored before the first attempt and sent as the `Idempotency-Key`
+  header on every attempt, so the receiver can drop a batch it has already processed.
+- At most `WEBHOOK_MAX_IN_FLIGHT` requests are in flight. Transient failures are retried
+  by `HttpClient`. A batch that still fails is rescheduled with exponential backoff,
+  up to `WEBHOOK_MAX_ATTEMPTS` times.
+- Claimed batches are leased (their `next_attempt_at` is pushed into the future), so a
+  crash mid-send only delays them, and two delivery workers never send the same batch
+  at once.
+
+Run it after loading the spool, or continuously with `python -m src.workflows.webhook_delivery`.
+Point `WEBHOOK_URLS` at a local HTTP server to test it.
+"""
+
+import gzip
+import json
+import time
+import uuid
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.config.config import Config
+from src.common.http_client import HttpClient
+from src.common.resilience import RetryPolicy
+from src.database.db_manager import get_db_session
+from src.database.models import WebhookOutbox
+
+logger = logging.getLogger(__name__)
+
+LEASE = timedelta(minutes=5)  # How long a claimed batch is hidden from other workers
+RETENTION = timedelta(days=7)  # Delivered outbox rows are purged after this
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Batch:
+    """
+    Outbox rows for one webhook request.
+
+    Attributes:
+        webhook (str): Destination URL.
+        batch_id (str): Idempotency key.
+        ids (list): Outbox row ids.
+        payloads (list): JSON text of each lead.
+        attempts (int): Failed attempts so far.
+    """
+
+    def __init__(self, webhook: str, batch_id: str, attempts: int = 0):
+        self.webhook = webhook
+        self.batch_id = batch_id
+        self.attempts = attempts
+        self.ids: List[int] = []
+        self.payloads: List[str] = []
+        self.size = 0
+
+    def add(self, row: WebhookOutbox) -> None:
+        self.ids.append(row.id)
+        self.payloads.append(row.payload)
+        self.size += len(row.payload) + 1
+
+    def body(self) -> bytes:
+        # The payloads are JSON already; splice them in rather than re-encoding each lead.
+        document = f'{{"batch_id": {json.dumps(self.batch_id)}, "leads": [{",".join(self.payloads)}]}}'
+        return gzip.compress(document.encode("utf-8"))
+
+
+class WebhookDelivery:
+    """
+    Drains `webhook_outbox` to the configured webhooks.
+
+    Attributes:
+        urls (list): Webhooks delivered to; rows for other URLs are left alone.
+        max_batch_leads (int): Most leads per request.
+        max_batch_bytes (int): Most uncompressed JSON bytes per request.
+        max_in_flight (int): Concurrent requests.
+        max_attempts (int): Failed attempts after which a batch is no longer retried.
+        http (HttpClient): Client used for the requests. Without one, a new client is
+            created for every `run_once`, so each pass gets a fresh retry budget.
+    """
+
+    def __init__(self,
+                 urls: Optional[Sequence[str]] = None,
+                 max_batch_leads: int = Config.WEBHOOK_MAX_BATCH_LEADS,
+                 max_batch_bytes: int = Config.WEBHOOK_MAX_BATCH_BYTES,
+                 max_in_flight: int = Config.WEBHOOK_MAX_IN_FLIGHT,
+                 max_attempts: int = Config.WEBHOOK_MAX_ATTEMPTS,
+                 http: Optional[HttpClient] = None):
+        self.urls = list(Config.WEBHOOK_URLS if urls is None else urls)
+        self.max_batch_leads = max_batch_leads
+        self.max_batch_bytes = max_batch_bytes
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.http = http
+        self.redelivery = RetryPolicy(base_delay=30, max_delay=3600)
+
+    # -- claiming -----------------------------------------------------------------------
+
+    def _due(self, session, now: datetime):
+        return (session.query(WebhookOutbox)
+                .filter(WebhookOutbox.delivered_at.is_(None),
+                        WebhookOutbox.attempts < self.max_attempts,
+                        WebhookOutbox.next_attempt_at <= now,
+                        WebhookOutbox.webhook.in_(self.urls)))
+
+    def claim(self, max_batches: int) -> List[Batch]:
+        """
+        Lease up to `max_batches` due batches: retries of earlier batches first (resent
+        unchanged, under the same id), then new batches packed from unbatched leads.
+        """
+        now = _now()
+        session = get_db_session()
+        try:
+            batches: List[Batch] = []
+            retry_ids = [batch_id for (batch_id,) in
+                         self._due(session, now).filter(WebhookOutbox.batch_id.isnot(None))
+                         .with_entities(WebhookOutbox.batch_id).distinct().limit(max_batches)]
+            if retry_ids:
+                by_id: Dict[str, Batch] = {}
+                # The ids were read unlocked; re-check that the rows are still due under the
+                # lock, so a batch another worker has just leased is skipped, not resent.
+                rows = (self._due(session, now).filter(WebhookOutbox.batch_id.in_(retry_ids))
+                        .order_by(WebhookOutbox.id).with_for_update(skip_locked=True))
+                for row in rows:
+                    batch = by_id.setdefault(row.batch_id, Batch(row.webhook, row.batch_id, row.attempts))
+                    batch.add(row)
+                    row.next_attempt_at = now + LEASE
+                batches.extend(by_id.values())
+
+            room = max_batches - len(batches)
+            if room > 0:
+                rows = (self._due(session, now).filter(WebhookOutbox.batch_id.is_(None))
+                        .order_by(WebhookOutbox.id).limit(room * self.max_batch_leads)
+                        .with_for_update(skip_locked=True).all())
+                open_batches: Dict[str, Batch] = {}
+                for row in rows:
+                    batch = open_batches.get(row.webhook)
+                    if batch is None or len(batch.ids) >= self.max_batch_leads or \
+                            batch.size + len(row.payload) > self.max_batch_bytes:
+                        if len(batches) >= max_batches:
+                            break
+                        batch = open_batches[row.webhook] = Batch(row.webhook, uuid.uuid4().hex)
+                        batches.append(batch)
+                    batch.add(row)
+                    row.batch_id = batch.batch_id
+                    row.next_attempt_at = now + LEASE
+            session.commit()
+            return batches
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # -- sending ------------------------------------------------------------------------
+
+    def send(self, http: HttpClient, batch: Batch) -> Optional[str]:
+        """POST one batch. Returns None on success, or the error message."""
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Encoding": "gzip",
+            "Idempotency-Key": batch.batch_id,
+        }
+        if Config.WEBHOOK_SECRET:
+            headers["Authorization"] = f"Bearer {Config.WEBHOOK_SECRET}"
+        try:
+            http.post(batch.webhook, data=batch.body(), headers=headers)
+            return None
+        except Exception as e:
+            return str(e) or type(e).__name__
+
+    def _record(self, outcomes: List[Tuple[Batch, Optional[str]]]) -> None:
+        now = _now()
+        session = get_db_session()
+        try:
+            for batch, error in outcomes:
+                rows = session.query(WebhookOutbox).filter(WebhookOutbox.batch_id == batch.batch_id)
+                if error is None:
+                    rows.update({"delivered_at": now, "last_error": None}, synchronize_session=False)
+                    continue
+                delay = self.redelivery.backoff(batch.attempts)
+                rows.update({"attempts": batch.attempts + 1, "last_error": error[:500],
+                             "next_attempt_at": now + timedelta(seconds=delay)}, synchronize_session=False)
+                level = logging.ERROR if batch.attempts + 1 >= self.max_attempts else logging.WARNING
+                logger.log(level, f"Webhook batch {batch.batch_id} ({len(batch.ids)} leads) to {batch.webhook} "
+                                  f"failed, attempt {batch.attempts + 1}/{self.max_attempts}: {error}")
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def run_once(self) -> int:
+        """
+        Deliver everything currently due.
+
+        Returns:
+            The number of leads delivered.
+        """
+        if not self.urls:
+            return 0
+        delivered, failed = 0, 0
+        client = nullcontext(self.http) if self.http is not None else HttpClient(use_proxies=False)
+        with client as http, ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            while True:
+                batches = self.claim(self.max_in_flight * 2)
+                if not batches:
+                    break
+                outcomes = list(zip(batches, executor.map(lambda batch: self.send(http, batch), batches)))
+                self._record(outcomes)
+                delivered += sum(len(batch.ids) for batch, error in outcomes if error is None)
+                failed += sum(1 for _, error in outcomes if error is not None)
+                if failed:
+                    # Failed batches are rescheduled; stop hammering the endpoint this pass
+                    break
+        self.purge()
+        if delivered or failed:
+            logger.info("Delivered %d leads to webhooks (%d batches rescheduled).", delivered, failed)
+        return delivered
+
+    def purge(self) -> None:
+        """Delete delivered outbox rows older than `RETENTION`."""
+        session = get_db_session()
+        try:
+            (session.query(WebhookOutbox)
+             .filter(WebhookOutbox.delivered_at < _now() - RETENTION)
+             .delete(synchronize_session=False))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            logger.warning("Could not purge delivered webhook outbox rows: %s", e)
+        finally:
+            session.close()
+
+    def run_forever(self, poll_interval: float = 10.0) -> None:
+        """Keep delivering as leads arrive."""
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Webhook delivery pass failed: %s", e)
+            time.sleep(poll_interval)
+
+
+if __name__ == "__main__":
+    from src.common.logging_setup import setup_logging
+    setup_logging()
+    WebhookDelivery().run_forever()